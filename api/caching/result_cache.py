@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Cache of endpoint results.
+
+Results are kept under hash of canonical form of validated request (sorted keys, numbers as floats),
+so the same calculation sent again isn't repeated. Responses get ETag, request with matching If-None-Match
+gets 304 Not Modified. Settings are taken from optional CACHE class in configuration:
+ENABLED, BACKEND ('memory' of every process or 'sqlite' file shared by all processes on host), PATH of sqlite file,
+MAX_SIZE, TTL [s], DISABLED_ENDPOINTS (names of endpoint functions) and VERSION (e.g. release name).
+Every backend has methods get(key), set(key, value), clear() and stats().
+Keys contain version of results: hash of code and csv data of calculations (and VERSION), so results of
+previous deployment kept in shared SQLite file aren't returned after code or data is changed.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+
+from flask import current_app, g, request
+
+import config
+from caching.sqlite_cache import SQLiteCache
+from response_tools.columnar import response_format
+
+CACHE_CONFIG = getattr(config, 'CACHE', None)
+CACHE_ENABLED = getattr(CACHE_CONFIG, 'ENABLED', True)
+# names of endpoint functions which results are always calculated
+DISABLED_ENDPOINTS = set(getattr(CACHE_CONFIG, 'DISABLED_ENDPOINTS', ()))
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+# directories and files of api/ which change results
+RESULT_SOURCES = ('calculations', 'csv_data', 'endpoints.py', 'response_tools', 'validations')
+
+
+class ResultCache:
+    """Least recently used cache with limited lifetime of entries, it counts hits and misses.
+
+    :param max_size: maximum number of entries, the least recently used one is removed when it's exceeded
+    :param ttl: lifetime of entry in seconds
+    :param clock: function returning current time in seconds
+    """
+
+    def __init__(self, max_size=1024, ttl=3600, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(self, key):
+        """Returns cached value or None if it's missing or expired.
+
+        :param key: key of entry
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expiration, value = entry
+                if expiration > self.clock():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Save value in cache.
+
+        :param key: key of entry
+        :param value: cached value
+        """
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns counters of cache as dict."""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'max_size': self.max_size}
+
+
+def create_cache(cache_config):
+    """Returns cache backend selected in configuration.
+
+    :param cache_config: CACHE class from configuration or None for defaults
+    """
+    max_size = getattr(cache_config, 'MAX_SIZE', 1024)
+    ttl = getattr(cache_config, 'TTL', 3600)
+    backend = getattr(cache_config, 'BACKEND', 'memory')
+    if backend == 'sqlite':
+        path = getattr(cache_config, 'PATH', None)
+        if not path:
+            path = os.path.join(tempfile.gettempdir(), 'fluid_mechanics_api.sqlite3')
+        return SQLiteCache(path, max_size, ttl)
+    if backend == 'memory':
+        return ResultCache(max_size, ttl)
+    raise ValueError(f'Unknown cache backend: {backend}.')
+
+
+RESULT_CACHE = create_cache(CACHE_CONFIG)
+
+
+def results_version(api_dir=API_DIR, version=None):
+    """Returns hash of python and csv files which change results, with optional version from configuration.
+
+    :param api_dir: path of api/ directory
+    :param version: additional version e.g. name of release
+    """
+    digest = hashlib.sha256(str(version).encode())
+    for source in RESULT_SOURCES:
+        path = os.path.join(api_dir, source)
+        paths = [path] if os.path.isfile(path) else []
+        for directory, directories, files in os.walk(path):
+            directories.sort()
+            paths.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith(('.py', '.csv')))
+        for file_path in paths:
+            with open(file_path, 'rb') as source_file:
+                digest.update(os.path.relpath(file_path, api_dir).encode() + b'\0' + source_file.read() + b'\0')
+    return digest.hexdigest()[:16]
+
+
+RESULTS_VERSION = results_version(version=getattr(CACHE_CONFIG, 'VERSION', None))
+
+
+def canonical(value):
+    """Returns json value with every number as float, so 1 and 1.0 have the same canonical form.
+
+    :param value: json value (dict, list, number, string, boolean or None)
+    """
+    if isinstance(value, dict):
+        return {key: canonical(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [canonical(item) for item in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def request_key(endpoint, req, mimetype='application/json', version=None):
+    """Returns key of result in cache, hash of version, endpoint name, response format and canonical form of request.
+
+    :param endpoint: name of endpoint function
+    :param req: validated json from user
+    :param mimetype: format of response selected by Accept header
+    :param version: version of results, default RESULTS_VERSION
+    """
+    canonical_json = json.dumps(canonical(req), sort_keys=True, separators=(',', ':'))
+    key = f'{version or RESULTS_VERSION}:{endpoint}:{mimetype}:{canonical_json}'
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def cached_result(func):
+    """Return cached response of endpoint if the same request was already calculated.
+
+    Only successful responses are cached, separately for every response format. Decorator has to be used
+    directly after json_validate, before request is updated with calculated parameters. Request with
+    If-None-Match equal to ETag of result gets empty response 304 (also for POST, calculations don't change
+    any resource).
+    """
+
+    @wraps(func)
+    def wrapper(req, *args, **kwargs):
+        if not CACHE_ENABLED or func.__name__ in DISABLED_ENDPOINTS:
+            return func(*args, req=req, **kwargs)
+        key = request_key(func.__name__, req, response_format())
+        cached = RESULT_CACHE.get(key)
+        g.cache_result = 'miss' if cached is None else 'hit'
+        if cached is None:
+            response = func(*args, req=req, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.add_etag()
+            etag, _ = response.get_etag()
+            RESULT_CACHE.set(key, (response.get_data(), response.mimetype, etag))
+        else:
+            body, mimetype, etag = cached
+            response = current_app.response_class(body, mimetype=mimetype)
+            response.set_etag(etag)
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+        # cached result depends on format selected by Accept header
+        response.vary.add('Accept')
+        return response
+
+    return wrapper
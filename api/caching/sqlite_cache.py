@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Result cache shared by all processes on host, stored in local SQLite database in WAL mode.
+
+It has the same interface as caching.result_cache.ResultCache, so result cached by one gunicorn worker
+is served by every other one. Cached values are responses as tuples (body, mimetype, etag).
+"""
+import os
+import sqlite3
+import threading
+import time
+
+CREATE_TABLE = (
+    'CREATE TABLE IF NOT EXISTS results ('
+    'key TEXT PRIMARY KEY, expiration REAL, used REAL, body BLOB, mimetype TEXT, etag TEXT)'
+)
+# part of lifetime of entry after which its time of the last use is updated by get
+USED_INTERVAL = 0.1
+
+
+class SQLiteCache:
+    """Least recently used cache with limited lifetime of entries kept in SQLite file.
+
+    Every thread of every process has own connection. Database errors (e.g. locked database) don't break
+    requests, value is just not found or not saved. Hits and misses are counted by each process.
+    Hits only read database, time of the last use is saved when it's older than USED_INTERVAL of ttl,
+    so least recently used entries are found with this precision.
+    :param path: path of database file, it's created if it doesn't exist
+    :param max_size: maximum number of entries, the least recently used ones are removed when it's exceeded
+    :param ttl: lifetime of entry in seconds
+    :param clock: function returning current time in seconds, the same for all processes
+    :param timeout: time of waiting for locked database in seconds
+    """
+
+    def __init__(self, path, max_size=1024, ttl=3600, clock=time.time, timeout=5):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def connection(self):
+        """Returns connection of current thread, new one is opened after fork."""
+        if getattr(self.local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(CREATE_TABLE)
+            self.local.connection, self.local.pid = connection, os.getpid()
+        return self.local.connection
+
+    def get(self, key):
+        """Returns cached value or None if it's missing or expired.
+
+        :param key: key of entry
+        """
+        now = self.clock()
+        try:
+            connection = self.connection()
+            row = connection.execute(
+                'SELECT body, mimetype, etag, used FROM results WHERE key = ? AND expiration > ?', (key, now)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is not None and now - row[3] >= self.ttl * USED_INTERVAL:
+            try:
+                connection.execute('UPDATE results SET used = ? WHERE key = ?', (now, key))
+            except sqlite3.Error:
+                # value is returned even if database is locked by other writer
+                pass
+        with self.lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[:3]
+
+    def set(self, key, value):
+        """Save value in cache, expired and the least recently used entries over limit are removed.
+
+        :param key: key of entry
+        :param value: cached response as tuple (body, mimetype, etag)
+        """
+        now = self.clock()
+        try:
+            with self.connection() as connection:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)', (key, now + self.ttl, now, *value)
+                )
+                connection.execute('DELETE FROM results WHERE expiration <= ?', (now,))
+                connection.execute(
+                    'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                    (self.max_size,),
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        """Remove all entries and reset counters of this process."""
+        try:
+            self.connection().execute('DELETE FROM results')
+        except sqlite3.Error:
+            pass
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns counters of cache as dict (hits and misses of this process), size is None if database fails."""
+        try:
+            size, = self.connection().execute('SELECT COUNT(*) FROM results').fetchone()
+        except sqlite3.Error:
+            size = None
+        return {'hits': self.hits, 'misses': self.misses, 'size': size, 'max_size': self.max_size}
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Binary bundle of all csv data, build it with: python3 api/calculations/data_bundle.py (or make data_bundle).
+
+Csv files from csv_data/fluids/, csv_data/pipes/ and csv_data/unit_convertion/ are still the source of data,
+bundle is only their compiled copy: numeric columns as packed float64 arrays and text columns in header.
+Bundle is opened with mmap, so all processes use the same memory pages and csv files aren't parsed on start.
+
+File structure: MAGIC, BUNDLE_VERSION and header size (struct HEADER_FORMAT), json header padded
+to 8 bytes, float64 data. Header contains sizes and modification times of csv files, bundle is ignored
+(and csv files are loaded) when any csv file is added, removed or changed after bundle was built.
+"""
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+script_dir = os.path.dirname(__file__)
+CSV_DIR = os.path.join(script_dir, '../csv_data/')
+BUNDLE_PATH = os.path.join(CSV_DIR, 'data_bundle.bin')
+DIRECTORIES = ('fluids', 'pipes', 'unit_convertion')
+
+MAGIC = b'FMAPIDB\0'
+BUNDLE_VERSION = 1
+HEADER_FORMAT = '<8sII'
+
+
+def csv_sources(csv_dir=CSV_DIR):
+    """Returns {relative path: [size, modification time in ns]} of every csv file compiled into bundle.
+
+    :param csv_dir: directory with csv data
+    """
+    sources = {}
+    for directory in DIRECTORIES:
+        for file_name in sorted(os.listdir(os.path.join(csv_dir, directory))):
+            if os.path.splitext(file_name)[1] == '.csv':
+                stat = os.stat(os.path.join(csv_dir, directory, file_name))
+                sources[f'{directory}/{file_name}'] = [stat.st_size, stat.st_mtime_ns]
+    return sources
+
+
+def read_csv_columns(path):
+    """Returns columns of csv file as {column: list of floats} for numeric columns and {column: list of strings}.
+
+    :param path: path of csv file
+    """
+    with open(path, 'r') as csv_file:
+        data = csv.reader(csv_file)
+        columns = next(data)
+        rows = list(data)
+    numbers, strings = {}, {}
+    for index, column in enumerate(columns):
+        values = [row[index] for row in rows]
+        try:
+            numbers[column] = [float(value) for value in values]
+        except ValueError:
+            strings[column] = values
+    return numbers, strings
+
+
+def build_bundle(path=BUNDLE_PATH, csv_dir=CSV_DIR):
+    """Compile all csv files into binary bundle, existing bundle is replaced atomically.
+
+    :param path: path of bundle
+    :param csv_dir: directory with csv data
+    """
+    sources = csv_sources(csv_dir)
+    tables = {}
+    data = array('d')
+    for source in sources:
+        numbers, strings = read_csv_columns(os.path.join(csv_dir, source))
+        offsets = {}
+        for column, values in numbers.items():
+            offsets[column] = [len(data), len(values)]
+            data.extend(values)
+        tables[os.path.splitext(source)[0]] = {'numbers': offsets, 'strings': strings}
+    header = json.dumps({'byteorder': sys.byteorder, 'sources': sources, 'tables': tables}).encode()
+    header += b' ' * (-len(header) % 8)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as bundle_file:
+        bundle_file.write(struct.pack(HEADER_FORMAT, MAGIC, BUNDLE_VERSION, len(header)))
+        bundle_file.write(header)
+        bundle_file.write(data.tobytes())
+    os.replace(temporary_path, path)
+
+
+def open_bundle(path=BUNDLE_PATH, csv_dir=CSV_DIR):
+    """Returns all tables from bundle as {'<directory>/<name>': {column: values}}.
+
+    Numeric columns are read-only memoryviews of floats mapped from file, text columns are lists of strings.
+    None is returned if bundle doesn't exist, has other version, it's older than csv files or it's corrupted.
+    :param path: path of bundle
+    :param csv_dir: directory with csv data
+    """
+    try:
+        with open(path, 'rb') as bundle_file:
+            data = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header_start = struct.calcsize(HEADER_FORMAT)
+    if len(data) < header_start:
+        return None
+    magic, version, header_size = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MAGIC or version != BUNDLE_VERSION:
+        return None
+    try:
+        header = json.loads(data[header_start : header_start + header_size].decode())
+        if header['byteorder'] != sys.byteorder or header['sources'] != csv_sources(csv_dir):
+            return None
+        numbers = memoryview(data)[header_start + header_size :].cast('d')
+        tables = {}
+        for name, table in header['tables'].items():
+            columns = {}
+            for column, (offset, length) in table['numbers'].items():
+                if offset < 0 or length < 0 or offset + length > len(numbers):
+                    raise ValueError(f'Column {column} of {name} is out of bundle data.')
+                columns[column] = numbers[offset : offset + length]
+            columns.update(table['strings'])
+            tables[name] = columns
+    except (ValueError, UnicodeDecodeError, KeyError, TypeError, struct.error):
+        # truncated or corrupted bundle, csv files are loaded instead
+        return None
+    return tables
+
+
+def bundle_tables(directory, path=BUNDLE_PATH):
+    """Returns tables of one csv directory from bundle as {name: {column: values}} or None without valid bundle.
+
+    :param directory: one of DIRECTORIES
+    :param path: path of bundle
+    """
+    tables = open_bundle(path)
+    if tables is None:
+        return None
+    prefix = f'{directory}/'
+    return {name[len(prefix) :]: table for name, table in tables.items() if name.startswith(prefix)}
+
+
+if __name__ == '__main__':
+    build_bundle()
+    print(f'Data bundle saved in {os.path.abspath(BUNDLE_PATH)}.')
@@ -14,16 +14,19 @@ def manning_equation(hydraulic_radius, manning_coefficient, slope):
     return math.pow(hydraulic_radius, 2 / 3) * math.pow(slope, 0.5) / manning_coefficient
 
 
-def velocity_equation(flow, flow_unit, area):
+def velocity_equation(flow, flow_unit, area, rounded=True):
     """Calculate average velocity.
 
     :param flow: volume flow rate
     :param flow_unit: flow unit e.g.: [m3/h], [m3/s]
-    :param area: area of pipe's cross section [m2]"""
+    :param area: area of pipe's cross section [m2]
+    :param rounded: round result as before, False keeps full float precision
+    """
     try:
         volume_unit, time_unit = flow_unit.split('/')
-        volume_convertion = unit_convertion(1, volume_unit, 'm3', 'volume')
-        time_convertion = unit_convertion(1, time_unit, 's', 'time')
-        return round_units((flow * volume_convertion / time_convertion) / area, 3)
+        volume_convertion = unit_convertion(1, volume_unit, 'm3', 'volume', rounded)
+        time_convertion = unit_convertion(1, time_unit, 's', 'time', rounded)
+        velocity = (flow * volume_convertion / time_convertion) / area
+        return round_units(velocity, 3) if rounded else velocity
     except (ValueError, TypeError):
         return 'Wrong volume flow rate!'
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 import csv
 import os
+from array import array
+from bisect import bisect_left
+
+from calculations.data_bundle import bundle_tables
 
 script_dir = os.path.dirname(__file__)
 rel_path = "../csv_data/fluids/"
 
+# tables of all fluids: {fluid: {column: array('d') or read-only memoryview of floats from data bundle}}
+FLUID_TABLES = {}
+
 
 def interpolate_data(diff, prev_value, current_value):
     """Returns interpolated value.
@@ -20,37 +27,57 @@ def interpolate_data(diff, prev_value, current_value):
     return prev_value + diff * (current_value - prev_value)
 
 
-def dict_values_convert_to_float(dict_to_convert):
-    """Simple converting dict values from string to float.
+def load_fluid(fluid):
+    """Returns fluid table from csv file as columns of floats {column: array('d')}.
+
+    :param fluid: fluid which exist in csv_data/fluids/
+    """
+    with open(os.path.join(script_dir, rel_path, f'{fluid}.csv'), 'r') as csv_file:
+        data = csv.reader(csv_file)
+        columns = next(data)
+        table = {column: array('d') for column in columns}
+        for row in data:
+            for column, value in zip(columns, row):
+                table[column].append(float(value))
+        return table
+
+
+def reload_fluids():
+    """(Re)load all fluid tables, required after csv_data/fluids/ changes.
 
-    :param dict_to_convert: dict from csv file with string values.
+    Tables are mapped from data bundle, csv files are loaded when bundle is missing or outdated.
     """
-    return {key: float(value) for key, value in dict_to_convert.items()}
+    FLUID_TABLES.clear()
+    tables = bundle_tables('fluids')
+    if tables is not None:
+        FLUID_TABLES.update(tables)
+        return
+    for file_name in sorted(os.listdir(os.path.join(script_dir, rel_path))):
+        fluid, extension = os.path.splitext(file_name)
+        if extension == '.csv':
+            FLUID_TABLES[fluid] = load_fluid(fluid)
 
 
 def fluid_params(fluid, temperature):
     """Returns fluid parameters in requested temperature.
 
+    Parameters between table temperatures are linearly interpolated.
     :param fluid: requested fluid which exist in csv_data/fluids/
     :param temperature: requested temperature of fluid
     """
-    with open(os.path.join(script_dir, rel_path, f'{fluid}.csv'), 'r') as csv_file:
-        data = csv.DictReader(csv_file)
-        prev_row = None
-        for row in data:
-            current_row_temp = int(row['temperature'])
-            if current_row_temp == temperature:
-                return dict_values_convert_to_float(row)
-            elif prev_row and current_row_temp > temperature:
-                prev_row = dict_values_convert_to_float(prev_row)
-                current_row = dict_values_convert_to_float(row)
-                diff = (temperature - prev_row['temperature']) / (current_row['temperature'] - prev_row['temperature'])
-                return {
-                    'temperature': temperature,
-                    'density': interpolate_data(diff, prev_row['density'], current_row['density']),
-                    'specific_heat': interpolate_data(diff, prev_row['specific_heat'], current_row['specific_heat']),
-                    'kinematic_viscosity': interpolate_data(
-                        diff, prev_row['kinematic_viscosity'], current_row['kinematic_viscosity']
-                    ),
-                }
-            prev_row = row
+    table = FLUID_TABLES[fluid]
+    temperatures = table['temperature']
+    index = bisect_left(temperatures, temperature)
+    if index < len(temperatures) and temperatures[index] == temperature:
+        return {column: values[index] for column, values in table.items()}
+    if index == len(temperatures):
+        return None
+    # temperature below the first row is extrapolated from two first rows
+    index = max(index, 1)
+    diff = (temperature - temperatures[index - 1]) / (temperatures[index] - temperatures[index - 1])
+    params = {column: interpolate_data(diff, values[index - 1], values[index]) for column, values in table.items()}
+    params['temperature'] = temperature
+    return params
+
+
+reload_fluids()
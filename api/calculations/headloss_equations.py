@@ -3,51 +3,86 @@ import math
 
 from calculations.unit_convertion import round_units
 
+LN_10 = math.log(10)
 
-def colebrook_equation(reynold, rel_roughness):
-    """Returns darcy friction coefficient (dfc) for turbulent flow.
 
+def churchill_equation(reynold, rel_roughness, rounded=True):
+    """Returns darcy friction coefficient with Churchill equation.
+
+    Explicit equation valid for laminar, transitional and turbulent flow.
     :param reynold: reynold number [-]
     :param rel_roughness: relative roughness [-]
+    :param rounded: round result as before, False keeps full float precision
     """
+    a = math.pow(2.457 * math.log(1 / (math.pow(7 / reynold, 0.9) + 0.27 * rel_roughness)), 16)
+    b = math.pow(37530 / reynold, 16)
+    dfc = 8 * math.pow(math.pow(8 / reynold, 12) + 1 / math.pow(a + b, 1.5), 1 / 12)
+    return round(dfc, 3) if rounded else dfc
 
-    def left_side(dfc):
-        return 1 / math.sqrt(dfc)
 
-    def right_side(dfc, reynold, rel_roughness):
-        return -2 * math.log10((2.51 / (reynold * math.sqrt(dfc)) + (rel_roughness / 3.71)))
+def colebrook_equation(reynold, rel_roughness, rounded=True, counts=None):
+    """Returns darcy friction coefficient (dfc) for turbulent flow.
+
+    :param reynold: reynold number [-]
+    :param rel_roughness: relative roughness [-]
+    :param rounded: round result as before, False keeps full float precision
+    :param counts: optional dict, number of iterations is added to its 'colebrook_iterations'
+    """
+    dfc, iterations = colebrook_solver(reynold, rel_roughness)
+    if counts is not None:
+        counts['colebrook_iterations'] = counts.get('colebrook_iterations', 0) + iterations
+    return round(dfc, 3) if rounded else dfc
 
-    dfc = 20
-    prev_dfc = 0
-    while True:
-        left_side_value = left_side(dfc)
-        right_side_value = right_side(dfc, reynold, rel_roughness)
-        diff = abs(dfc - prev_dfc) / 2
-        prev_dfc = dfc
-        if left_side_value - right_side_value < -0.001:
-            dfc -= diff
-        elif left_side_value - right_side_value > 0.001:
-            dfc += diff
-        else:
-            return round(dfc, 3)
 
+def colebrook_solver(reynold, rel_roughness, tolerance=1e-10, max_iterations=20):
+    """Solves colebrook equation with Newton-Raphson method.
 
-def darcy_friction_coefficient(reynolds, internal_dimension, roughness):
+    Equation is solved for x = 1 / sqrt(dfc): x + 2 * log10(rel_roughness / 3.71 + 2.51 * x / reynold) = 0,
+    starting from Swamee-Jain approximation. Returns tuple (dfc, number of iterations).
+    :param reynold: reynold number [-]
+    :param rel_roughness: relative roughness [-]
+    :param tolerance: required accuracy of x = 1 / sqrt(dfc)
+    :param max_iterations: iterations limit, the last approximation is returned when it's reached
+    """
+    roughness_term = rel_roughness / 3.71
+    reynold_term = 2.51 / reynold
+    x = -2 * math.log10(rel_roughness / 3.7 + 5.74 / math.pow(reynold, 0.9))
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        argument = roughness_term + reynold_term * x
+        step = (x + 2 * math.log10(argument)) / (1 + 2 * reynold_term / (argument * LN_10))
+        x -= step
+        if abs(step) < tolerance:
+            break
+    return 1 / (x * x), iteration
+
+
+def darcy_friction_coefficient(
+    reynolds, internal_dimension, roughness, friction_model='colebrook', rounded=True, counts=None
+):
     """Returns dfc depends on flow laminar or turbulent.
 
     :param reynolds: reynolds number
     :param internal_dimension: internal dimension of pipe
     :param roughness: roughness of pipe
+    :param friction_model: name of equation for turbulent flow from FRICTION_MODELS,
+    churchill equation is used for every flow regime
+    :param rounded: round result as before, False keeps full float precision
+    :param counts: optional dict for iterations of colebrook equation (see colebrook_equation)
     """
+    if friction_model == 'churchill' and reynolds > 0:
+        return churchill_equation(reynolds, relative_roughness(roughness, internal_dimension, rounded), rounded)
     if reynolds > 2100:
-        rel_roughness = relative_roughness(roughness, internal_dimension)
-        return colebrook_equation(reynolds, rel_roughness)
+        rel_roughness = relative_roughness(roughness, internal_dimension, rounded)
+        if friction_model == 'colebrook':
+            return colebrook_equation(reynolds, rel_roughness, rounded, counts)
+        return FRICTION_MODELS[friction_model](reynolds, rel_roughness, rounded)
     elif reynolds > 0:
-        return hagen_poiseuille_equation(reynolds)
+        return hagen_poiseuille_equation(reynolds, rounded)
     return 0
 
 
-def darcy_weisbach_equation(dfc, llc, length, diameter, density, velocity):
+def darcy_weisbach_equation(dfc, llc, length, diameter, density, velocity, rounded=True):
     """Headloss equation.
 
     Returns pressure loss in Pascals [Pa].
@@ -57,32 +92,86 @@ def darcy_weisbach_equation(dfc, llc, length, diameter, density, velocity):
     :param diameter: hydraulic diameter of duct or pipe [m]
     :param density: density of fluid [kg/m3]
     :param velocity: average velocity of fluid [m/s]
+    :param rounded: round result as before, False keeps full float precision
     """
-    return round_units((llc + dfc * length / diameter) * density * math.pow(velocity, 2) / 2, 5)
+    loss = (llc + dfc * length / diameter) * density * math.pow(velocity, 2) / 2
+    return round_units(loss, 5) if rounded else loss
 
 
-def hagen_poiseuille_equation(reynold):
+def hagen_poiseuille_equation(reynold, rounded=True):
     """Returns darcy friction coefficient for laminar flow.
 
     :param reynold: reynold number [-]
+    :param rounded: round result as before, False keeps full float precision
+    """
+    dfc = 64 / reynold
+    return round(dfc, 3) if rounded else dfc
+
+
+def haaland_equation(reynold, rel_roughness, rounded=True):
+    """Returns darcy friction coefficient for turbulent flow with explicit Haaland equation.
+
+    :param reynold: reynold number [-]
+    :param rel_roughness: relative roughness [-]
+    :param rounded: round result as before, False keeps full float precision
     """
-    return round(64 / reynold, 3)
+    dfc = math.pow(-1.8 * math.log10(math.pow(rel_roughness / 3.7, 1.11) + 6.9 / reynold), -2)
+    return round(dfc, 3) if rounded else dfc
 
 
-def relative_roughness(roughness, diameter):
+def relative_roughness(roughness, diameter, rounded=True):
     """Returns relative roughness.
 
     :param roughness: roughness of pipe [mm] or [m] (but the same as diameter)
     :param diameter: diameter of duct or pipe [mm] or [m]
+    :param rounded: round result as before, False keeps full float precision
     """
-    return round(roughness / diameter, 8)
+    rel_roughness = roughness / diameter
+    return round(rel_roughness, 8) if rounded else rel_roughness
 
 
-def reynolds_equation(velocity, diameter, viscosity):
+def reynolds_equation(velocity, diameter, viscosity, rounded=True):
     """Reynolds number equation.
 
     :param velocity: average velocity of fluid [m/s]
     :param diameter: hydraulic diameter of duct or pipe [m]
     :param viscosity: kinematic viscosity [s/m2]
+    :param rounded: round result as before, False keeps full float precision
+    """
+    reynolds = velocity * diameter / viscosity
+    return round(reynolds, 0) if rounded else reynolds
+
+
+def serghides_equation(reynold, rel_roughness, rounded=True):
+    """Returns darcy friction coefficient for turbulent flow with explicit Serghides equation.
+
+    :param reynold: reynold number [-]
+    :param rel_roughness: relative roughness [-]
+    :param rounded: round result as before, False keeps full float precision
+    """
+    a = -2 * math.log10(rel_roughness / 3.7 + 12 / reynold)
+    b = -2 * math.log10(rel_roughness / 3.7 + 2.51 * a / reynold)
+    c = -2 * math.log10(rel_roughness / 3.7 + 2.51 * b / reynold)
+    dfc = math.pow(a - math.pow(b - a, 2) / (c - 2 * b + a), -2)
+    return round(dfc, 3) if rounded else dfc
+
+
+def swamee_jain_equation(reynold, rel_roughness, rounded=True):
+    """Returns darcy friction coefficient for turbulent flow with explicit Swamee-Jain equation.
+
+    :param reynold: reynold number [-]
+    :param rel_roughness: relative roughness [-]
+    :param rounded: round result as before, False keeps full float precision
     """
-    return round(velocity * diameter / viscosity, 0)
+    dfc = 0.25 / math.pow(math.log10(rel_roughness / 3.7 + 5.74 / math.pow(reynold, 0.9)), 2)
+    return round(dfc, 3) if rounded else dfc
+
+
+# equations of darcy friction coefficient for turbulent flow available in requests
+FRICTION_MODELS = {
+    'colebrook': colebrook_equation,
+    'churchill': churchill_equation,
+    'haaland': haaland_equation,
+    'serghides': serghides_equation,
+    'swamee_jain': swamee_jain_equation,
+}
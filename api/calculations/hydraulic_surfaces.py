@@ -3,20 +3,97 @@
 import csv
 import math
 import os
+from bisect import bisect_left
 
+from calculations.data_bundle import bundle_tables
 from calculations.unit_convertion import unit_convertion
 
 script_dir = os.path.dirname(__file__)
 rel_path = "../csv_data/pipes/"
 
+# catalogues of all materials: {material: PipeCatalogue}
+PIPE_CATALOGUES = {}
 
-def circular_pipe(diameter, unit):
+
+def circular_pipe(diameter, unit, rounded=True):
     """Circular area in [m2].
     :param diameter: value of internal diameter
     :param unit: unit of diameter e.g.: [mm] or [m]
+    :param rounded: round result as before, False keeps full float precision
+    """
+    converted_diameter = unit_convertion(diameter, unit, 'm', 'lenght', rounded)
+    area = math.pow(converted_diameter, 2) * math.pi / 4
+    return round(area, 10) if rounded else area
+
+
+class PipeCatalogue:
+    """Pipe sizes of one material from csv_data/pipes/<material>.csv.
+
+    Pipes are kept as immutable tuple of (nominal diameter, internal diameter) pairs in csv order,
+    with index of internal diameters by nominal diameter and sorted internal diameters.
+    :param material: material of pipe in csv_data/pipes/
+    :param pipes: (nominal diameter, internal diameter) pairs, csv file is loaded if they aren't given
     """
-    converted_diameter = unit_convertion(diameter, unit, 'm', 'lenght')
-    return round(math.pow(converted_diameter, 2) * math.pi / 4, 10)
+
+    def __init__(self, material, pipes=None):
+        if pipes is None:
+            with open(os.path.join(script_dir, rel_path, f'{material}.csv')) as csv_file:
+                pipes = tuple((int(row['DN']), float(row['internal'])) for row in csv.DictReader(csv_file))
+        self.pipes = tuple(pipes)
+        self.material = material
+        self.internal_by_nominal = dict(self.pipes)
+        self.sorted_pipes = tuple(sorted(self.pipes, key=lambda pipe: pipe[1]))
+        self.sorted_internals = tuple(internal for _, internal in self.sorted_pipes)
+
+    def __iter__(self):
+        return iter(self.pipes)
+
+    def __len__(self):
+        return len(self.pipes)
+
+    def internal_diameter(self, nominal):
+        """Returns internal diameter of pipe or None if nominal diameter doesn't exist.
+
+        :param nominal: nominal diameter of pipe
+        """
+        return self.internal_by_nominal.get(nominal)
+
+    def nearest(self, internal):
+        """Returns (nominal, internal) diameters of pipe with the closest internal diameter.
+
+        :param internal: required internal diameter
+        """
+        index = bisect_left(self.sorted_internals, internal)
+        candidates = self.sorted_pipes[max(index - 1, 0) : index + 1]
+        return min(candidates, key=lambda pipe: abs(pipe[1] - internal))
+
+    def smallest_fitting(self, internal):
+        """Returns (nominal, internal) diameters of the smallest pipe with internal diameter >= required value.
+
+        None is returned when every pipe is too small.
+        :param internal: required internal diameter
+        """
+        index = bisect_left(self.sorted_internals, internal)
+        if index < len(self.sorted_pipes):
+            return self.sorted_pipes[index]
+
+
+def reload_pipes():
+    """(Re)load catalogues of all materials, required after csv_data/pipes/ changes.
+
+    Catalogues are created from data bundle, csv files are loaded when bundle is missing or outdated.
+    """
+    PIPE_CATALOGUES.clear()
+    tables = bundle_tables('pipes')
+    if tables is not None:
+        for material, table in tables.items():
+            pipes = ((int(nominal), internal) for nominal, internal in zip(table['DN'], table['internal']))
+            PIPE_CATALOGUES[material] = PipeCatalogue(material, pipes)
+        return
+    for file_name in sorted(os.listdir(os.path.join(script_dir, rel_path))):
+        material, extension = os.path.splitext(file_name)
+        if extension == '.csv':
+            PIPE_CATALOGUES[material] = PipeCatalogue(material)
 
 
 def get_internal_diameter(nominal, material):
@@ -25,23 +102,15 @@ def get_internal_diameter(nominal, material):
     :param nominal: nominal diameter of pipe e.g.: for steel it's DN
     :param material: material of pipe in csv_data/pipes/
     """
-    with open(os.path.join(script_dir, rel_path, f'{material}.csv')) as csv_file:
-        data = csv.DictReader(csv_file)
-        nominal = str(nominal)
-        for row in data:
-            if row['DN'] == nominal:
-                return float(row['internal'])
+    return PIPE_CATALOGUES[material].internal_diameter(nominal)
 
 
 def get_internal_diameters(material):
-    """Get internal dimension (diameter) of all pipes.
+    """Get internal dimension (diameter) of all pipes as tuple of (nominal, internal) pairs.
 
     :param material: material of pipe in csv_data/pipes/
     """
-    with open(os.path.join(script_dir, rel_path, f'{material}.csv')) as csv_file:
-        data = csv.DictReader(csv_file)
-        for row in data:
-            yield int(row['DN']), float(row['internal'])
+    return PIPE_CATALOGUES[material].pipes
 
 
 def rectangular_dict(width, height, unit):
@@ -100,3 +169,6 @@ def hydraulic_radius(area, perimeter):
     :param perimeter: wetted perimeter [m]
     """
     return area / perimeter
+
+
+reload_pipes()
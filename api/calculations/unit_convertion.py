@@ -2,68 +2,102 @@
 """Convert units.
 
 Configuration files are in ./csv_data/unit_convertion/<data_type>.csv
-Available types: lenght.csv, pressure.csv, volume.csv, time.csv
+Available types: lenght.csv, power.csv, pressure.csv, volume.csv, time.csv
+All files are loaded once into UNIT_REGISTRY (from data bundle if it's up to date),
+call reload_units() after changing them.
 """
 import csv
 import math
 import os
 
+from calculations.data_bundle import bundle_tables
+
 script_dir = os.path.dirname(__file__)
 rel_path = "../csv_data/unit_convertion/"
 
+# converters of every unit grouped by data type: {data_type: {unit: converter}}
+UNIT_REGISTRY = {}
+
 
 def round_units(number, significant):
     """Round-off a number to a given number of significant digits.
 
+    Numbers lower than 1 keep significant digits of decimal part (for negative numbers it's number - floor(number)).
     :param number: given number
     :param significant: significant digits
     """
-    number_integer_part = math.floor(number)
-    number_decimal_part = number - number_integer_part
     if number == 0:
         return 0
-    int_precision = 0
-    while number_integer_part >= 1:
-        int_precision += 1
-        number_integer_part /= 10
-    digits = significant - int_precision
-    if digits <= 0:
-        # result is integer > 0
-        return int(round(number * pow(10, digits)) / pow(10, digits))
-    elif digits == significant:
-        # float < 0
-        float_precision = significant
-        while number_decimal_part <= 0.1:
-            float_precision += 1
-            number_decimal_part *= 10
-        return round(number, float_precision)
-    # float > 0 but with decimal part
-    return round(number, digits)
-
-
-def unit_convertion(value, unit_from, unit_to, data_type):
+    number_integer_part = math.floor(number)
+    if number_integer_part >= 1:
+        # log10 isn't exact for some big integers
+        int_precision = int(math.log10(number_integer_part)) + 1
+        if 10 ** int_precision <= number_integer_part:
+            int_precision += 1
+        elif 10 ** (int_precision - 1) > number_integer_part:
+            int_precision -= 1
+        digits = significant - int_precision
+        if digits <= 0:
+            # result is integer > 0
+            return int(round(number * pow(10, digits)) / pow(10, digits))
+        # float > 0 but with decimal part
+        return round(number, digits)
+    number_decimal_part = number - number_integer_part
+    if number_decimal_part == 0:
+        # negative integer
+        return number
+    # float < 1, every leading zero of decimal part adds one digit
+    return round(number, significant + math.floor(-math.log10(number_decimal_part)))
+
+
+def load_units(data_type):
+    """Returns converters of all units from csv file as dict {unit: converter}.
+
+    :param data_type: values are taken from csv_data/unit_convertion/<data_type>.csv
+    """
+    with open(os.path.join(script_dir, rel_path, f'{data_type}.csv'), 'r') as csv_file:
+        return {row['unit']: float(row['converter']) for row in csv.DictReader(csv_file)}
+
+
+def reload_units():
+    """(Re)build unit registry, required after csv_data/unit_convertion/ changes.
+
+    Converters are taken from data bundle, csv files are loaded when bundle is missing or outdated.
+    """
+    UNIT_REGISTRY.clear()
+    tables = bundle_tables('unit_convertion')
+    if tables is not None:
+        for data_type, table in tables.items():
+            UNIT_REGISTRY[data_type] = dict(zip(table['unit'], table['converter']))
+        return
+    for file_name in sorted(os.listdir(os.path.join(script_dir, rel_path))):
+        data_type, extension = os.path.splitext(file_name)
+        if extension == '.csv':
+            UNIT_REGISTRY[data_type] = load_units(data_type)
+
+
+def unit_convertion(value, unit_from, unit_to, data_type, rounded=True):
     """Unit converion.
 
     :param value: input value to convert
     :param unit_from: input unit
     :param unit_to: output unit with new value
     :param data_type: values are taken from csv_data/unit_convertion/<data_type>.csv
+    :param rounded: round result as before, False keeps full float precision
     """
-    with open(os.path.join(script_dir, rel_path, f'{data_type}.csv'), 'r') as csv_file:
-        csv_lenghts = csv.DictReader(csv_file)
-        required_matches = 0
-        for row in csv_lenghts:
-            if row['unit'] == unit_from:
-                converter_from = float(row['converter'])
-                required_matches += 1
-            if row['unit'] == unit_to:
-                converter_to = float(row['converter'])
-                required_matches += 2
-            if required_matches == 3:
-                return round_units(value * converter_from / converter_to, 5)
+    converters = UNIT_REGISTRY[data_type]
+    converter_from = converters.get(unit_from)
+    converter_to = converters.get(unit_to)
+    if converter_from is None or converter_to is None:
+        required_matches = (converter_from is not None) + 2 * (converter_to is not None)
         return unit_not_found_message(required_matches, unit_from, unit_to)
+    converted = value * converter_from / converter_to
+    return round_units(converted, 5) if rounded else converted
 
 
 def unit_not_found_message(required_matches, unit_from, unit_to):
     NOT_FOUND_MESSAGES = [f'Not found {unit_from} and {unit_to}.', f'Not found {unit_to}.', f'Not found {unit_from}.']
     return NOT_FOUND_MESSAGES[required_matches]
+
+
+reload_units()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Headloss equations for arrays of pipes computed at once with NumPy.
+
+Functions mirror calculations.headloss_equations (the same formulas and rounding of intermediate results),
+but every argument can be an array, e.g. internal diameters of all pipes in catalogue.
+"""
+from functools import lru_cache
+from time import perf_counter
+
+import numpy as np
+
+from calculations.hydraulic_surfaces import circular_pipe
+from calculations.unit_convertion import UNIT_REGISTRY, unit_convertion
+
+
+def churchill_equation(reynolds, rel_roughness):
+    """Returns array of darcy friction coefficients with Churchill equation (every flow regime).
+
+    :param reynolds: array of reynolds numbers [-]
+    :param rel_roughness: array of relative roughness [-]
+    """
+    a = np.power(2.457 * np.log(1 / (np.power(7 / reynolds, 0.9) + 0.27 * rel_roughness)), 16)
+    b = np.power(37530 / reynolds, 16)
+    return 8 * np.power(np.power(8 / reynolds, 12) + 1 / np.power(a + b, 1.5), 1 / 12)
+
+
+def colebrook_solver(reynolds, rel_roughness, tolerance=1e-10, max_iterations=20):
+    """Solves colebrook equation for arrays with Newton-Raphson method.
+
+    The same method as calculations.headloss_equations.colebrook_solver, iterations are repeated
+    until every value is accurate enough. Returns tuple (array of dfc, number of iterations).
+    :param reynolds: array of reynolds numbers [-]
+    :param rel_roughness: array of relative roughness [-]
+    :param tolerance: required accuracy of x = 1 / sqrt(dfc)
+    :param max_iterations: iterations limit, the last approximation is returned when it's reached
+    """
+    roughness_term = rel_roughness / 3.71
+    reynolds_term = 2.51 / reynolds
+    x = -2 * np.log10(rel_roughness / 3.7 + 5.74 / np.power(reynolds, 0.9))
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        argument = roughness_term + reynolds_term * x
+        step = (x + 2 * np.log10(argument)) / (1 + 2 * reynolds_term / (argument * np.log(10)))
+        x = x - step
+        if not step.size or np.max(np.abs(step)) < tolerance:
+            break
+    return 1 / (x * x), iteration
+
+
+def colebrook_equation(reynolds, rel_roughness, counts=None):
+    """Returns array of darcy friction coefficients for turbulent flow.
+
+    :param reynolds: array of reynolds numbers [-]
+    :param rel_roughness: array of relative roughness [-]
+    :param counts: optional dict, number of iterations is added to its 'colebrook_iterations'
+    """
+    dfc, iterations = colebrook_solver(reynolds, rel_roughness)
+    if counts is not None:
+        counts['colebrook_iterations'] = counts.get('colebrook_iterations', 0) + iterations
+    return dfc
+
+
+def haaland_equation(reynolds, rel_roughness):
+    """Returns array of darcy friction coefficients for turbulent flow with Haaland equation.
+
+    :param reynolds: array of reynolds numbers [-]
+    :param rel_roughness: array of relative roughness [-]
+    """
+    return np.power(-1.8 * np.log10(np.power(rel_roughness / 3.7, 1.11) + 6.9 / reynolds), -2)
+
+
+def serghides_equation(reynolds, rel_roughness):
+    """Returns array of darcy friction coefficients for turbulent flow with Serghides equation.
+
+    :param reynolds: array of reynolds numbers [-]
+    :param rel_roughness: array of relative roughness [-]
+    """
+    a = -2 * np.log10(rel_roughness / 3.7 + 12 / reynolds)
+    b = -2 * np.log10(rel_roughness / 3.7 + 2.51 * a / reynolds)
+    c = -2 * np.log10(rel_roughness / 3.7 + 2.51 * b / reynolds)
+    return np.power(a - np.power(b - a, 2) / (c - 2 * b + a), -2)
+
+
+def swamee_jain_equation(reynolds, rel_roughness):
+    """Returns array of darcy friction coefficients for turbulent flow with Swamee-Jain equation.
+
+    :param reynolds: array of reynolds numbers [-]
+    :param rel_roughness: array of relative roughness [-]
+    """
+    return 0.25 / np.power(np.log10(rel_roughness / 3.7 + 5.74 / np.power(reynolds, 0.9)), 2)
+
+
+FRICTION_MODELS = {
+    'colebrook': colebrook_equation,
+    'churchill': churchill_equation,
+    'haaland': haaland_equation,
+    'serghides': serghides_equation,
+    'swamee_jain': swamee_jain_equation,
+}
+
+
+def darcy_friction_coefficients(
+    reynolds, internal_dimensions, roughness, friction_model='colebrook', rounded=True, counts=None
+):
+    """Returns array of dfc depends on flow laminar or turbulent.
+
+    :param reynolds: array of reynolds numbers
+    :param internal_dimensions: array of internal dimensions of pipes
+    :param roughness: roughness of pipes (number or array)
+    :param friction_model: name of equation for turbulent flow from FRICTION_MODELS,
+    churchill equation is used for every flow regime
+    :param rounded: round results as scalar functions do, False keeps full float precision
+    :param counts: optional dict for iterations of colebrook equation (see colebrook_equation)
+    """
+    reynolds, internal_dimensions, roughness = np.broadcast_arrays(reynolds, internal_dimensions, roughness)
+    rel_roughness = roughness / internal_dimensions
+    if rounded:
+        rel_roughness = np.round(rel_roughness, 8)
+    dfc = np.zeros(reynolds.shape)
+    if friction_model == 'churchill':
+        flowing = reynolds > 0
+        dfc[flowing] = churchill_equation(reynolds[flowing], rel_roughness[flowing])
+    else:
+        turbulent = reynolds > 2100
+        laminar = (reynolds > 0) & ~turbulent
+        if friction_model == 'colebrook':
+            dfc[turbulent] = colebrook_equation(reynolds[turbulent], rel_roughness[turbulent], counts)
+        else:
+            dfc[turbulent] = FRICTION_MODELS[friction_model](reynolds[turbulent], rel_roughness[turbulent])
+        dfc[laminar] = 64 / reynolds[laminar]
+    return np.round(dfc, 3) if rounded else dfc
+
+
+# powers of ten from pow(10, -MAX_DIGITS) to pow(10, MAX_DIGITS), equal to these computed by python
+MAX_DIGITS = 308
+POWERS_OF_TEN = np.array([float(pow(10, digits)) for digits in range(-MAX_DIGITS, MAX_DIGITS + 1)])
+
+
+def round_units(values, significant):
+    """Round-off array of numbers to a given number of significant digits.
+
+    Array version of calculations.unit_convertion.round_units with equal results, returns array of floats.
+    :param values: array of numbers
+    :param significant: significant digits
+    """
+    values = np.asarray(values, dtype=float)
+    integer_parts = np.floor(values)
+    decimal_parts = values - integer_parts
+    # zero and negative integers are returned without changes (they overflow below)
+    unchanged = (values == 0) | (decimal_parts == 0) & (integer_parts < 1)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        int_precision = np.floor(np.log10(integer_parts)) + 1
+        # log10 isn't exact for some big integers
+        int_precision += np.power(10.0, int_precision) <= integer_parts
+        int_precision -= np.power(10.0, int_precision - 1) > integer_parts
+        float_precision = significant + np.floor(-np.log10(decimal_parts))
+        digits = np.where(integer_parts >= 1, significant - int_precision, float_precision)
+        digits = np.nan_to_num(digits).clip(-MAX_DIGITS, MAX_DIGITS).astype(int)
+        scale = POWERS_OF_TEN[digits + MAX_DIGITS]
+        scaled = values * scale
+        rounded = np.rint(scaled) / scale
+        # python's round(number, digits) rounds exact decimal value of number, so values close to half of the last
+        # digit (or too big or small to be scaled exactly) are rounded one by one to get the same results
+        inexact = (digits > 0) & ~unchanged & (
+            (np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < np.abs(scaled) * 1e-12 + 1e-9)
+            | (np.abs(scaled) >= 2 ** 52)
+            | (digits > 22)
+        )
+    rounded = np.where(digits <= 0, np.trunc(rounded), rounded)
+    for index in np.flatnonzero(inexact):
+        rounded.flat[index] = round(float(values.flat[index]), int(digits.flat[index]))
+    return np.where(unchanged, values, rounded)
+
+
+def units_list(rounded, values, significant):
+    """Returns list of numbers rounded with round_units.
+
+    Like in calculations.unit_convertion.round_units numbers rounded to integer part and zeros are int.
+    :param rounded: array of numbers rounded with round_units
+    :param values: array of numbers before rounding
+    :param significant: significant digits
+    """
+    integers = (values == 0) | (values >= 10 ** (significant - 1))
+    return [
+        int(value) if integer else value for value, integer in zip(rounded.ravel().tolist(), integers.ravel().tolist())
+    ]
+
+
+def round_units_list(values, significant):
+    """Returns list of numbers rounded with round_units (see units_list).
+
+    :param values: array of numbers
+    :param significant: significant digits
+    """
+    values = np.asarray(values, dtype=float)
+    return units_list(round_units(values, significant), values, significant)
+
+
+@lru_cache(maxsize=32)
+def catalogue_arrays(catalogue, rounded=True):
+    """Returns arrays of pipes in catalogue: (nominal diameters, internal diameters [mm], [m], areas [m2]).
+
+    Arrays are computed once per catalogue object with the same unit conversion and rounding as
+    calculations.hydraulic_surfaces.circular_pipe.
+    :param catalogue: calculations.hydraulic_surfaces.PipeCatalogue
+    :param rounded: round results as scalar functions do, False keeps full float precision
+    """
+    nominals = np.array([nominal for nominal, _ in catalogue.pipes], dtype=np.int64)
+    internals = np.array([internal for _, internal in catalogue.pipes])
+    internals_m = np.array(
+        [unit_convertion(internal, 'mm', 'm', 'lenght', rounded) for _, internal in catalogue.pipes]
+    )
+    areas = np.array([circular_pipe(internal, 'mm', rounded) for _, internal in catalogue.pipes])
+    for array in (nominals, internals, internals_m, areas):
+        array.setflags(write=False)
+    return nominals, internals, internals_m, areas
+
+
+def headloss_grid(
+    internals,
+    internals_m,
+    areas,
+    flows,
+    flow_unit,
+    density,
+    viscosity,
+    roughness,
+    length=1,
+    headloss_unit=None,
+    friction_model='colebrook',
+    rounded=True,
+    counts=None,
+    timings=None,
+):
+    """Calculate velocity and headloss for arrays of pipes, flows and fluid parameters in one pass.
+
+    Arguments are broadcast together (e.g. pipes as column and flows as row), returns tuple of flat lists
+    (velocities [m/s], headlosses) with values equal to these calculated one by one with scalar functions.
+    :param internals: array of internal diameters [mm]
+    :param internals_m: array of internal diameters [m]
+    :param areas: array of areas of pipes [m2]
+    :param flows: array of volume flow rates
+    :param flow_unit: flow unit e.g.: [m3/h], [m3/s]
+    :param density: density of fluid [kg/m3] (number or array)
+    :param viscosity: kinematic viscosity [s/m2] (number or array)
+    :param roughness: roughness of pipe in [mm] (number or array)
+    :param length: length of pipe [m]
+    :param headloss_unit: unit of headloss e.g. [Pa], [kPa], None returns not converted [Pa]
+    :param friction_model: name of equation for turbulent flow
+    :param rounded: round results as scalar functions do, False keeps full float precision
+    :param counts: optional dict for iterations of colebrook equation (see colebrook_equation)
+    :param timings: optional dict, time of friction factor calculation [s] is added to its 'friction_factor'
+    """
+    volume_unit, time_unit = flow_unit.split('/')
+    volume_convertion = unit_convertion(1, volume_unit, 'm3', 'volume', rounded)
+    time_convertion = unit_convertion(1, time_unit, 's', 'time', rounded)
+    flows = np.asarray(flows) * volume_convertion / time_convertion
+    shape = np.broadcast(flows, areas, internals, internals_m, density, viscosity, roughness).shape
+    velocity = np.broadcast_to(flows / areas, shape)
+    if rounded:
+        velocities = units_list(round_units(velocity, 3), velocity, 3)
+        velocity = np.array(velocities, dtype=float).reshape(shape)
+        reynolds = np.round(velocity * internals / viscosity, 0)
+    else:
+        reynolds = velocity * internals / viscosity
+    start = perf_counter()
+    dfc = darcy_friction_coefficients(reynolds, internals, roughness, friction_model, rounded, counts)
+    if timings is not None:
+        timings['friction_factor'] = timings.get('friction_factor', 0) + perf_counter() - start
+    losses = dfc * length / internals_m * density * np.power(velocity, 2) / 2
+    if rounded and headloss_unit is not None:
+        losses = round_units(losses, 5)
+    if headloss_unit is not None:
+        losses = losses * UNIT_REGISTRY['pressure']['Pa'] / UNIT_REGISTRY['pressure'][headloss_unit]
+    if rounded:
+        return velocities, round_units_list(losses.ravel(), 5)
+    return velocity.ravel().tolist(), losses.ravel().tolist()
+
+
+def pipes_headloss(
+    catalogue,
+    flow,
+    flow_unit,
+    density,
+    viscosity,
+    roughness,
+    friction_model='colebrook',
+    rounded=True,
+    counts=None,
+    timings=None,
+):
+    """Calculate velocity and headloss per meter for every pipe in catalogue in one pass.
+
+    Returns tuple of lists (nominal diameters, velocities [m/s], headlosses [Pa/m]),
+    values are equal to these calculated pipe by pipe with headloss_equations functions.
+    :param catalogue: calculations.hydraulic_surfaces.PipeCatalogue
+    :param flow: volume flow rate
+    :param flow_unit: flow unit e.g.: [m3/h], [m3/s]
+    :param density: density of fluid [kg/m3]
+    :param viscosity: kinematic viscosity [s/m2]
+    :param roughness: roughness of pipe in [mm]
+    :param friction_model: name of equation for turbulent flow
+    :param rounded: round results as scalar functions do, False keeps full float precision
+    :param counts: optional dict for iterations of colebrook equation (see colebrook_equation)
+    :param timings: optional dict for time of friction factor calculation (see headloss_grid)
+    """
+    nominals, internals, internals_m, areas = catalogue_arrays(catalogue, rounded)
+    velocities, losses = headloss_grid(
+        internals,
+        internals_m,
+        areas,
+        flow,
+        flow_unit,
+        density,
+        viscosity,
+        roughness,
+        friction_model=friction_model,
+        rounded=rounded,
+        counts=counts,
+        timings=timings,
+    )
+    return nominals.tolist(), velocities, losses
@@ -7,3 +7,33 @@ class API:
     IP = "0.0.0.0"
     PORT = os.environ.get('API_PORT')
     CORS_ORIGIN = os.environ.get('CORS_ORIGIN')
+
+
+class CACHE:
+    ENABLED = os.environ.get('CACHE_ENABLED', '1') == '1'
+    BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite')
+    PATH = os.environ.get('CACHE_PATH')
+    MAX_SIZE = int(os.environ.get('CACHE_MAX_SIZE', 1024))
+    TTL = int(os.environ.get('CACHE_TTL', 3600))
+    DISABLED_ENDPOINTS = tuple(filter(None, os.environ.get('CACHE_DISABLED_ENDPOINTS', '').split(',')))
+    VERSION = os.environ.get('CACHE_VERSION')
+
+
+class JOBS:
+    WORKERS = int(os.environ.get('JOBS_WORKERS', 0)) or None
+    MAX_QUEUE = int(os.environ.get('JOBS_MAX_QUEUE', 16))
+    TIMEOUT = float(os.environ.get('JOBS_TIMEOUT', 300))
+    TTL = int(os.environ.get('JOBS_TTL', 3600))
+    PATH = os.environ.get('JOBS_PATH')
+
+
+class SERVER_TIMING:
+    ENABLED = os.environ.get('SERVER_TIMING_ENABLED', '0') == '1'
+    REQUEST_HEADER = os.environ.get('SERVER_TIMING_REQUEST_HEADER', 'X-Server-Timing') or None
+
+
+class PROFILING:
+    ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+    SECRET = os.environ.get('PROFILING_SECRET')
+    DIRECTORY = os.environ.get('PROFILING_DIRECTORY')
+    TOP = int(os.environ.get('PROFILING_TOP', 30))
@@ -1,25 +1,62 @@
 #!/usr/bin/env python3
-from flask import Blueprint
+from functools import lru_cache
 
+import numpy as np
+from flask import Blueprint, Response, url_for
+
+import config
+
+from caching.result_cache import cached_result
 from calculations.flow_equations import manning_equation, velocity_equation
+from calculations.fluid_parameters import fluid_params
 from calculations.headloss_equations import darcy_friction_coefficient, darcy_weisbach_equation, reynolds_equation
 from calculations.hydraulic_surfaces import (
+    PIPE_CATALOGUES,
     angle_in_partial_filled_pipe,
     circular_pipe,
     circular_water_cross_sectional_area,
     circular_wetted_perimeter,
-    get_internal_diameters,
     hydraulic_radius,
     rectangular_dict,
     rectangular_wetted_perimeter,
 )
-from calculations.unit_convertion import unit_convertion
-from response_tools.response_tools import api_response, error_response
-from validations.decorators import check_pipe_parameters, get_fluid_parameters, json_validate, power_to_flow
-from validations.json_validation_schemas import headloss_all_pipes, headloss_selected_pipe, manning_schema
+from calculations.unit_convertion import round_units, unit_convertion
+from calculations.vectorized import catalogue_arrays, headloss_grid, pipes_headloss, round_units_list
+from jobs.job_queue import JOB_QUEUE, QueueFull
+from monitoring.metrics import init_metrics, metrics_response
+from monitoring.profiling import init_profiling
+from monitoring.server_timing import init_server_timing
+from monitoring.stages import record_calculation, stage_timer
+from response_tools.columnar import TABLE_FORMATS, response_format, table_response
+from response_tools.response_tools import api_response, dumps, error_response, stream_response
+from validations.decorators import (
+    ParameterError,
+    check_pipe_parameters,
+    flow_from_power,
+    fluid_parameters,
+    get_fluid_parameters,
+    json_validate,
+    pipe_parameters,
+    power_to_flow,
+    sweep_parameters,
+    validate,
+)
+from validations.json_validation_schemas import (
+    headloss_all_pipes,
+    headloss_batch_schema,
+    headloss_selected_pipe,
+    job_schema,
+    manning_schema,
+    sweep_schema,
+)
 
 
 api = Blueprint('api', __name__)
+init_metrics(api)
+init_server_timing(api)
+
+# maximum number of results of one sweep, MAX_GRID_SIZE of optional SWEEP class in configuration
+MAX_SWEEP_SIZE = getattr(getattr(config, 'SWEEP', None), 'MAX_GRID_SIZE', 100000)
 
 
 @api.route('/health', methods=['GET'])
@@ -28,8 +65,15 @@ def health():
     return api_response({'status': 'everything is ok :)'})
 
 
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Metrics of requests in Prometheus text format."""
+    return metrics_response()
+
+
 @api.route('/calculate/headloss', methods=['POST'])
 @json_validate(headloss_selected_pipe)
+@cached_result
 @check_pipe_parameters
 @get_fluid_parameters
 @power_to_flow
@@ -40,54 +84,234 @@ def headloss(req, roughness, internal_dimension):
     :param roughness: roughness of pipe in [mm]
     :param internal_dimension: internal dimension of pipe depends on nominal diameter
     """
+    with stage_timer('calculation'):
+        result = calculate_headloss(req, roughness, internal_dimension)
+    return api_response(result)
+
+
+@api.route('/calculate/headloss/batch', methods=['POST'])
+@json_validate(headloss_batch_schema)
+def headloss_batch(req):
+    """Calculate velocity and headloss for many pipe segments.
+
+    Every segment has the same structure as json for /calculate/headloss and gets its own result or error.
+    Results are streamed as they are calculated (as NDJSON with "Accept: application/x-ndjson" header).
+    :param req: request.get_json() flask's method to get json from user
+    """
+    fluid_lookup = lru_cache(maxsize=None)(fluid_params)
+    return stream_response(calculate_segment(segment, fluid_lookup) for segment in req['segments'])
+
+
+def calculate_headloss(req, roughness, internal_dimension):
+    """Returns velocity and headloss for selected dimension.
+
+    With full_precision in request intermediate results aren't rounded, only the final ones.
+    :param req: validated json from user with fluid parameters and flow
+    :param roughness: roughness of pipe in [mm]
+    :param internal_dimension: internal dimension of pipe depends on nominal diameter
+    """
+    rounded = not req.get('full_precision', False)
     density = req['density']
     viscosity = req['viscosity']
     # pipe
-    area = circular_pipe(internal_dimension, 'mm')
+    area = circular_pipe(internal_dimension, 'mm', rounded)
     length = req['length']
     llc = req.get('local_loss_coefficient', 0)
     # flow
-    velocity = velocity_equation(req['flow'], req['flow_unit'], area)
-    reynolds = reynolds_equation(velocity, internal_dimension, viscosity)
+    velocity = velocity_equation(req['flow'], req['flow_unit'], area, rounded)
+    reynolds = reynolds_equation(velocity, internal_dimension, viscosity, rounded)
     # headloss
     headloss_unit = req.get('headloss_unit', 'Pa')
-    dfc = darcy_friction_coefficient(reynolds, internal_dimension, roughness)
-    loss = darcy_weisbach_equation(
-        dfc, llc, length, unit_convertion(internal_dimension, 'mm', 'm', 'lenght'), density, velocity
-    )
-    return api_response(
-        {
-            'velocity': velocity,
-            'velocity_unit': 'm/s',
-            'headloss': unit_convertion(loss, 'Pa', headloss_unit, 'pressure'),
-            'headloss_unit': headloss_unit,
-        }
-    )
+    friction_model = req.get('friction_model', 'colebrook')
+    counts = {}
+    with stage_timer('friction_factor'):
+        dfc = darcy_friction_coefficient(reynolds, internal_dimension, roughness, friction_model, rounded, counts)
+    record_calculation(counts)
+    diameter = unit_convertion(internal_dimension, 'mm', 'm', 'lenght', rounded)
+    loss = darcy_weisbach_equation(dfc, llc, length, diameter, density, velocity, rounded)
+    loss = unit_convertion(loss, 'Pa', headloss_unit, 'pressure', rounded)
+    if not rounded:
+        velocity, loss = round_units(velocity, 3), round_units(loss, 5)
+    return {
+        'velocity': velocity,
+        'velocity_unit': 'm/s',
+        'headloss': loss,
+        'headloss_unit': headloss_unit,
+        'friction_model': friction_model,
+    }
+
+
+def calculate_segment(segment, fluid_lookup=fluid_params):
+    """Returns headloss of one segment from batch or error with status code and message.
+
+    :param segment: json of one segment with the same structure as json for /calculate/headloss
+    :param fluid_lookup: function returning fluid parameters, shared by segments of one batch
+    """
+    try:
+        validate(segment, headloss_selected_pipe)
+        roughness, internal_dimension = pipe_parameters(segment)
+        with stage_timer('fluid_parameters'):
+            fluid_parameters(segment, fluid_lookup)
+        flow_from_power(segment)
+    except ParameterError as exc:
+        return {'status': 400, 'message': str(exc)}
+    return calculate_headloss(segment, roughness, internal_dimension)
 
 
 @api.route('/calculate/pipes', methods=['POST'])
 @json_validate(headloss_all_pipes)
+@cached_result
 @get_fluid_parameters
 @power_to_flow
 def selecting_optimum_pipe_size(req):
     """Calculate velocity and headloss for every dimension.
 
+    Results are json rows by default or binary columns selected with Accept header (see response_tools.columnar).
     :param req: request.get_json() flask's method to get json from user
     """
     density = req['density']
     viscosity = req['viscosity']
     roughness = req.get('roughness', 1.5)
-    results = []
-    for nominal_diameter, internal_dimension in get_internal_diameters(req['material']):
-        area = circular_pipe(internal_dimension, 'mm')
-        velocity = velocity_equation(req['flow'], req['flow_unit'], area)
-        reynolds = reynolds_equation(velocity, internal_dimension, viscosity)
-        dfc = darcy_friction_coefficient(reynolds, internal_dimension, roughness)
-        loss = darcy_weisbach_equation(
-            dfc, 0, 1, unit_convertion(internal_dimension, 'mm', 'm', 'lenght'), density, velocity
+    friction_model = req.get('friction_model', 'colebrook')
+    rounded = not req.get('full_precision', False)
+    counts, timings = {}, {}
+    with stage_timer('calculation'):
+        nominal_diameters, velocities, losses = pipes_headloss(
+            PIPE_CATALOGUES[req['material']],
+            req['flow'],
+            req['flow_unit'],
+            density,
+            viscosity,
+            roughness,
+            friction_model,
+            rounded,
+            counts,
+            timings,
         )
-        results.append({'nominal_diameter': nominal_diameter, 'headloss': loss, 'velocity': velocity})
-    return api_response({'headloss_unit': 'Pa/m', 'velocity_unit': 'm/s', 'results': results})
+        if not rounded:
+            velocities = [round_units(velocity, 3) for velocity in velocities]
+            losses = [round_units(loss, 5) for loss in losses]
+    record_calculation(counts, timings)
+    return table_response(
+        {'headloss_unit': 'Pa/m', 'velocity_unit': 'm/s', 'friction_model': friction_model},
+        {'nominal_diameter': nominal_diameters, 'headloss': losses, 'velocity': velocities},
+    )
+
+
+@api.route('/calculate/sweep', methods=['POST'])
+@json_validate(sweep_schema)
+def sweep(req):
+    """Calculate velocity and headloss for every combination of flows, temperatures, roughnesses and diameters.
+
+    Results are streamed as they are calculated (as NDJSON with "Accept: application/x-ndjson" header)
+    or returned as binary columns selected with Accept header (see response_tools.columnar).
+    :param req: request.get_json() flask's method to get json from user
+    """
+    try:
+        parameters = sweep_parameters(req, MAX_SWEEP_SIZE)
+    except ParameterError as exc:
+        return error_response(400, str(exc))
+    metadata = {
+        'flow_unit': req['flow_unit'],
+        'velocity_unit': 'm/s',
+        'headloss_unit': req.get('headloss_unit', 'Pa'),
+        'friction_model': req.get('friction_model', 'colebrook'),
+    }
+    chunks = sweep_chunks(req, parameters)
+    if response_format() in TABLE_FORMATS:
+        columns = {}
+        for chunk in chunks:
+            for column, values in chunk.items():
+                columns.setdefault(column, []).extend(values)
+        return table_response(metadata, columns)
+    rows = (dict(zip(chunk, row)) for chunk in chunks for row in zip(*chunk.values()))
+    return stream_response(rows, metadata)
+
+
+def sweep_chunks(req, parameters):
+    """Yields results of sweep as dicts of columns, one chunk for every temperature and roughness.
+
+    Chunk has results for every nominal diameter and flow, they are calculated at once with array math.
+    :param req: validated json from user
+    :param parameters: lists of values from validations.decorators.sweep_parameters
+    """
+    rounded = not req.get('full_precision', False)
+    headloss_unit = req.get('headloss_unit', 'Pa')
+    friction_model = req.get('friction_model', 'colebrook')
+    nominals, internals, internals_m, areas = catalogue_arrays(PIPE_CATALOGUES[req['material']], rounded)
+    indexes = {nominal: index for index, nominal in enumerate(nominals.tolist())}
+    # pipes in rows and flows in columns of grid
+    selected = [[indexes[nominal]] for nominal in parameters['nominal_diameters']]
+    flows = np.array(parameters['flows'], dtype=float)
+    nominal_column = [nominal for nominal in parameters['nominal_diameters'] for _ in parameters['flows']]
+    flow_column = parameters['flows'] * len(selected)
+    for temperature in parameters['temperatures']:
+        with stage_timer('fluid_parameters'):
+            fluid = fluid_params(req['fluid'], temperature)
+        for roughness in parameters['roughnesses']:
+            counts, timings = {}, {}
+            velocities, losses = headloss_grid(
+                internals[selected],
+                internals_m[selected],
+                areas[selected],
+                flows,
+                req['flow_unit'],
+                fluid['density'],
+                fluid['kinematic_viscosity'],
+                roughness,
+                req.get('length', 1),
+                headloss_unit,
+                friction_model,
+                rounded,
+                counts,
+                timings,
+            )
+            record_calculation(counts, timings)
+            if not rounded:
+                velocities, losses = round_units_list(velocities, 3), round_units_list(losses, 5)
+            yield {
+                'temperature': [temperature] * len(flow_column),
+                'roughness': [roughness] * len(flow_column),
+                'nominal_diameter': nominal_column,
+                'flow': flow_column,
+                'velocity': velocities,
+                'headloss': losses,
+            }
+
+
+@api.route('/jobs', methods=['POST'])
+@json_validate(job_schema)
+def create_job(req):
+    """Queue calculation in background process, responds 202 with id of job (also in Location header).
+
+    :param req: request.get_json() flask's method to get json from user
+    """
+    try:
+        job_id = JOB_QUEUE.submit(req['endpoint'], req['request'])
+    except QueueFull as exc:
+        response = error_response(503, str(exc))
+        response.headers['Retry-After'] = '1'
+        return response
+    response = api_response({'id': job_id, 'status': 'queued'})
+    response.status_code = 202
+    response.headers['Location'] = url_for('api.job_status', job_id=job_id)
+    return response
+
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status and progress of job, finished job has status code and json response of endpoint as result.
+
+    :param job_id: id of job
+    """
+    job = JOB_QUEUE.store.get(job_id)
+    if job is None:
+        return error_response(404, 'Job not found or expired.')
+    body = job.pop('body', None)
+    if body is None:
+        return api_response(job)
+    # saved json response is added without parsing as the last key
+    return Response(dumps(job, compact=True)[:-1] + b',"result":' + body + b'}\n', mimetype='application/json')
 
 
 @api.route('/calculate/gravity_flow', methods=['POST'])
@@ -129,3 +353,7 @@ def not_found(e):
 @api.app_errorhandler(405)
 def wrong_method(e):
     return error_response(405, 'wrong method')
+
+
+# endpoints are wrapped with profiler (only if it's enabled in configuration) after all routes are defined
+init_profiling(api)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Heavy calculations (e.g. big batches or sweeps) calculated in background by local process pool.
+
+Job is a request to calculation endpoint sent later by process of pool to the application, so it's validated
+and calculated exactly like the synchronous one. Request worker only queues it and responds with id of job,
+status and result are saved in JobStore shared by all processes on host. Settings are taken from optional
+JOBS class in configuration: WORKERS (processes of pool in every gunicorn worker, default number of cores
+divided by number of gunicorn workers, so all pools together don't use more processes than cores),
+MAX_QUEUE (maximum number of unfinished jobs of gunicorn worker), TIMEOUT [s] of calculation,
+TTL [s] of finished job and PATH of sqlite file.
+
+Processes of pool are forked by forkserver: single-threaded process which imported application before any request,
+so they don't inherit locks held by threads of gunicorn worker (logging, result cache, queue) during fork.
+Requests of jobs are marked in environ (JOB_ENVIRON_KEY), so they aren't counted in request metrics.
+"""
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+from jobs.job_store import JobStore
+from monitoring.metrics import JOB_ENVIRON_KEY
+
+JOBS_CONFIG = getattr(config, 'JOBS', None)
+# minimum time between saves of progress [s]
+PROGRESS_INTERVAL = 0.5
+
+
+class QueueFull(Exception):
+    pass
+
+
+def default_workers():
+    """Returns number of processes of pool of one gunicorn worker: cores divided by gunicorn workers, at least 1.
+
+    Number of gunicorn workers is set in GUNICORN_WORKERS environment variable by gunicorn.conf (1 without it).
+    """
+    gunicorn_workers = max(1, int(os.environ.get('GUNICORN_WORKERS', 1)))
+    return max(1, (os.cpu_count() or 1) // gunicorn_workers)
+
+
+class JobTimeout(BaseException):
+    """Raised by alarm when calculation exceeds time limit.
+
+    It isn't subclass of Exception, so it isn't caught by error handling of endpoints (e.g. streamed responses).
+    """
+
+
+def raise_timeout(signum, frame):
+    raise JobTimeout()
+
+
+def init_worker():
+    """Restore default signal handlers inherited from parent in process of pool."""
+    for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGQUIT, signal.SIGUSR1, signal.SIGABRT):
+        signal.signal(signum, signal.SIG_DFL)
+
+
+def run_job(store_path, ttl, job_id, endpoint, req, timeout):
+    """Calculate job in process of pool and save its result, runs in main thread of process.
+
+    Number of results of streamed responses is saved as progress during calculation.
+    :param store_path: path of JobStore database
+    :param ttl: lifetime of finished job in seconds
+    :param job_id: id of job
+    :param endpoint: path of calculation endpoint
+    :param req: json sent to endpoint
+    :param timeout: time limit of calculation in seconds
+    """
+    # application is already imported by forkserver before fork
+    from main import app
+
+    store = JobStore(store_path, ttl)
+    store.start(job_id, timeout)
+    previous_handler = signal.signal(signal.SIGALRM, raise_timeout)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        response = app.test_client().post(
+            endpoint,
+            json=req,
+            headers={'Accept': 'application/json'},
+            environ_overrides={JOB_ENVIRON_KEY: job_id},
+            buffered=False,
+        )
+        chunks = []
+        saved = time.monotonic()
+        for chunk in response.response:
+            chunks.append(chunk)
+            if time.monotonic() - saved > PROGRESS_INTERVAL:
+                # the first chunk opens json
+                store.set_progress(job_id, len(chunks) - 1)
+                saved = time.monotonic()
+        response.close()
+    except JobTimeout:
+        store.fail(job_id, f'Calculation exceeded time limit of {timeout} s.')
+        return
+    except Exception as exc:
+        store.fail(job_id, str(exc) or exc.__class__.__name__)
+        return
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+    if response.mimetype != 'application/json':
+        store.fail(job_id, f'Calculation failed with status {response.status_code}.')
+        return
+    # streamed json has opening and closing chunks around results
+    progress = max(len(chunks) - 2, 0) if response.is_streamed else 0
+    store.finish(job_id, response.status_code, b''.join(chunks).rstrip(), progress)
+
+
+class JobQueue:
+    """Queue of jobs calculated by process pool of current process, it's created on first job.
+
+    :param store: JobStore with status of jobs
+    :param workers: number of processes of pool, None for default_workers() when pool is created
+    :param max_queue: maximum number of unfinished jobs, QueueFull is raised for the next one
+    :param timeout: time limit of calculation in seconds
+    """
+
+    def __init__(self, store, workers=None, max_queue=16, timeout=300):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.executor = None
+        self.executor_pid = None
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def pool(self):
+        """Returns process pool of current process, new one is created after fork or if it's broken."""
+        if self.executor is None or self.executor_pid != os.getpid():
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['main'])
+            self.executor = ProcessPoolExecutor(self.pool_size(), mp_context=context, initializer=init_worker)
+            self.executor_pid = os.getpid()
+            self.pending = set()
+        return self.executor
+
+    def pool_size(self):
+        """Returns number of processes of pool."""
+        return self.workers or default_workers()
+
+    def submit(self, endpoint, req):
+        """Queue calculation of request and returns id of job.
+
+        :param endpoint: path of calculation endpoint
+        :param req: json sent to endpoint
+        """
+        with self.lock:
+            executor = self.pool()
+            if len(self.pending) >= self.max_queue:
+                raise QueueFull(f'Too many queued jobs, limit is {self.max_queue}.')
+            job_id = uuid.uuid4().hex
+            self.store.create(job_id, endpoint)
+            future = executor.submit(run_job, self.store.path, self.store.ttl, job_id, endpoint, req, self.timeout)
+            self.pending.add(future)
+        future.add_done_callback(lambda future: self.done(job_id, executor, future))
+        return job_id
+
+    def done(self, job_id, executor, future):
+        """Remove finished job from queue, job is marked as failed if its process was killed.
+
+        :param job_id: id of job
+        :param executor: process pool which calculated job, it's replaced by new one if it's broken
+        :param future: future of finished job
+        """
+        exc = None if future.cancelled() else future.exception()
+        with self.lock:
+            self.pending.discard(future)
+            if isinstance(exc, BrokenProcessPool) and self.executor is executor:
+                self.executor = None
+        if exc is not None:
+            self.store.fail(job_id, str(exc) or exc.__class__.__name__)
+
+    def stats(self):
+        """Returns number of unfinished jobs of current process and limits as dict."""
+        with self.lock:
+            return {'pending': len(self.pending), 'max_queue': self.max_queue, 'workers': self.pool_size()}
+
+
+def create_queue(jobs_config):
+    """Returns queue of jobs with settings from configuration.
+
+    :param jobs_config: JOBS class from configuration or None for defaults
+    """
+    path = getattr(jobs_config, 'PATH', None)
+    if not path:
+        path = os.path.join(tempfile.gettempdir(), 'fluid_mechanics_api_jobs.sqlite3')
+    store = JobStore(path, getattr(jobs_config, 'TTL', 3600))
+    return JobQueue(
+        store,
+        getattr(jobs_config, 'WORKERS', None),
+        getattr(jobs_config, 'MAX_QUEUE', 16),
+        getattr(jobs_config, 'TIMEOUT', 300),
+    )
+
+
+JOB_QUEUE = create_queue(JOBS_CONFIG)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""State and results of jobs kept in local SQLite database in WAL mode.
+
+Job is queued by one gunicorn worker, calculated in its process pool and its status can be read by every
+worker on host. Expired jobs are removed when new one is created.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+CREATE_TABLE = (
+    'CREATE TABLE IF NOT EXISTS jobs ('
+    'id TEXT PRIMARY KEY, endpoint TEXT, status TEXT, progress INTEGER, created REAL, expiration REAL, '
+    'status_code INTEGER, message TEXT, body BLOB)'
+)
+
+
+class JobStore:
+    """Jobs with status: queued, running, finished (with response of endpoint) or failed (with message).
+
+    Every thread of every process has own connection.
+    :param path: path of database file, it's created if it doesn't exist
+    :param ttl: lifetime of job in seconds after it's finished, running job expires after ttl + its timeout
+    :param clock: function returning current time in seconds, the same for all processes
+    """
+
+    def __init__(self, path, ttl=3600, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.local = threading.local()
+
+    def connection(self):
+        """Returns connection of current thread, new one is opened after fork."""
+        if getattr(self.local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(CREATE_TABLE)
+            self.local.connection, self.local.pid = connection, os.getpid()
+        return self.local.connection
+
+    def create(self, job_id, endpoint):
+        """Save new queued job and remove expired ones.
+
+        :param job_id: unique id of job
+        :param endpoint: path of calculated endpoint
+        """
+        now = self.clock()
+        with self.connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM jobs WHERE expiration <= ?', (now,))
+            connection.execute(
+                'INSERT INTO jobs VALUES (?, ?, ?, 0, ?, ?, NULL, NULL, NULL)',
+                (job_id, endpoint, 'queued', now, now + self.ttl),
+            )
+
+    def start(self, job_id, timeout):
+        """Mark job as running.
+
+        :param job_id: id of job
+        :param timeout: time limit of calculation in seconds
+        """
+        self.update(job_id, status='running', expiration=self.clock() + timeout + self.ttl)
+
+    def set_progress(self, job_id, progress):
+        """Save number of calculated results of running job.
+
+        :param job_id: id of job
+        :param progress: number of results
+        """
+        self.update(job_id, progress=progress)
+
+    def finish(self, job_id, status_code, body, progress):
+        """Save response of endpoint as result of job.
+
+        :param job_id: id of job
+        :param status_code: status code of response
+        :param body: json body of response as bytes
+        :param progress: number of calculated results
+        """
+        self.update(
+            job_id,
+            status='finished',
+            status_code=status_code,
+            body=body,
+            progress=progress,
+            expiration=self.clock() + self.ttl,
+        )
+
+    def fail(self, job_id, message):
+        """Mark job as failed.
+
+        :param job_id: id of job
+        :param message: reason of failure
+        """
+        self.update(job_id, status='failed', message=message, expiration=self.clock() + self.ttl)
+
+    def update(self, job_id, **columns):
+        """Set values of columns of job.
+
+        :param job_id: id of job
+        :param columns: values of columns by name
+        """
+        assignments = ', '.join(f'{column} = ?' for column in columns)
+        self.connection().execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*columns.values(), job_id))
+
+    def get(self, job_id):
+        """Returns job as dict or None if it's missing or expired, body of response is under 'body' key.
+
+        :param job_id: id of job
+        """
+        cursor = self.connection().execute(
+            'SELECT id, endpoint, status, progress, created, status_code, message, body FROM jobs '
+            'WHERE id = ? AND expiration > ?',
+            (job_id, self.clock()),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        job = dict(zip((column for column, *_ in cursor.description), row))
+        return {key: value for key, value in job.items() if value is not None}
+
+    def clear(self):
+        """Remove all jobs."""
+        self.connection().execute('DELETE FROM jobs')
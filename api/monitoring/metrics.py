@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Prometheus metrics of API: latency of requests and their stages per route, results of cache.
+
+Metrics are observed when request is finished (also after the last chunk of streamed response). Gunicorn workers
+save metrics in files of directory from PROMETHEUS_MULTIPROC_DIR environment variable (set in gunicorn.conf),
+then every worker serves metrics of all workers. Without it metrics of current process are served.
+Internal requests of background jobs (JOB_ENVIRON_KEY in environ) aren't observed.
+"""
+import os
+
+from flask import Response, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+from monitoring.stages import request_duration, request_stages, start_request_timer
+
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+REQUEST_LATENCY = Histogram(
+    'fluid_api_request_duration_seconds',
+    'Time of request from start to the last byte of response.',
+    ['route', 'method', 'status'],
+    buckets=REQUEST_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    'fluid_api_stage_duration_seconds',
+    'Total time of stage in one request.',
+    ['route', 'stage'],
+    buckets=STAGE_BUCKETS,
+)
+CACHE_REQUESTS = Counter('fluid_api_cache_requests_total', 'Requests to result cache.', ['route', 'result'])
+# key of environ with id of background job which sent request
+JOB_ENVIRON_KEY = 'fluid_api.job_id'
+
+
+def request_route():
+    """Returns route of current request (e.g. /jobs/<job_id>), 'unmatched' for not found paths."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def save_status(response):
+    g.response_status = response.status_code
+    return response
+
+
+def observe_request(exc):
+    """Observe latency of finished request, its stages and result of cache.
+
+    :param exc: unhandled exception of request or None
+    """
+    duration = request_duration()
+    if duration is None or JOB_ENVIRON_KEY in request.environ:
+        return
+    route = request_route()
+    status = g.get('response_status', 500)
+    REQUEST_LATENCY.labels(route, request.method, str(status)).observe(duration)
+    for stage, seconds in request_stages().items():
+        STAGE_LATENCY.labels(route, stage).observe(seconds)
+    if 'cache_result' in g:
+        CACHE_REQUESTS.labels(route, g.cache_result).inc()
+
+
+def init_metrics(blueprint):
+    """Observe metrics of every request of application with registered blueprint.
+
+    :param blueprint: flask's blueprint
+    """
+    blueprint.before_app_request(start_request_timer)
+    blueprint.after_app_request(save_status)
+    blueprint.teardown_app_request(observe_request)
+
+
+def metrics_response():
+    """Response with metrics in Prometheus text format, metrics of all processes in multiprocess mode."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Profiling of single request with cProfile, e.g. to find why particular payload is slow.
+
+Profiling is turned on with optional PROFILING class in configuration: ENABLED and SECRET are required, then
+every endpoint of blueprint is wrapped and request with header HEADER (default X-Profile) equal to SECRET
+is profiled. Stats are saved as .pstats file in DIRECTORY (name is returned in X-Profile-File header, response
+is unchanged) or without DIRECTORY response is replaced with TOP (default 30) functions sorted by SORT
+(default cumulative) as text, status of original response is in X-Profile-Response-Status header.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import time
+from functools import wraps
+
+from flask import Response, current_app, request
+
+import config
+
+PROFILING_CONFIG = getattr(config, 'PROFILING', None)
+PROFILING_ENABLED = getattr(PROFILING_CONFIG, 'ENABLED', False)
+SECRET = getattr(PROFILING_CONFIG, 'SECRET', None)
+HEADER = getattr(PROFILING_CONFIG, 'HEADER', 'X-Profile')
+DIRECTORY = getattr(PROFILING_CONFIG, 'DIRECTORY', None)
+TOP = getattr(PROFILING_CONFIG, 'TOP', 30)
+SORT = getattr(PROFILING_CONFIG, 'SORT', 'cumulative')
+
+
+def profiling_requested():
+    """Returns True if current request has header with secret."""
+    value = request.headers.get(HEADER)
+    return bool(SECRET and value) and hmac.compare_digest(value.encode(), SECRET.encode())
+
+
+def profile_response(view, *args, **kwargs):
+    """Returns response of view called with profiler, streamed response is read whole by profiler.
+
+    :param view: view function of endpoint
+    :param args: positional arguments of view
+    :param kwargs: keyword arguments of view
+    """
+    profiler = cProfile.Profile()
+    response = current_app.make_response(profiler.runcall(view, *args, **kwargs))
+    if response.is_streamed:
+        response.set_data(profiler.runcall(response.get_data))
+    if DIRECTORY:
+        filename = f'{request.endpoint}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{id(profiler)}.pstats'
+        profiler.dump_stats(os.path.join(DIRECTORY, filename))
+        response.headers['X-Profile-File'] = filename
+        return response
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(SORT).print_stats(TOP)
+    stats_response = Response(stream.getvalue(), mimetype='text/plain')
+    stats_response.headers['X-Profile-Response-Status'] = str(response.status_code)
+    return stats_response
+
+
+def profiled(view):
+    """Profile view function if request has header with secret.
+
+    :param view: view function of endpoint
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not profiling_requested():
+            return view(*args, **kwargs)
+        return profile_response(view, *args, **kwargs)
+
+    return wrapper
+
+
+def init_profiling(blueprint):
+    """Wrap every endpoint of blueprint with profiler when blueprint is registered, if profiling is enabled.
+
+    It has to be called after all routes of blueprint are defined.
+    :param blueprint: flask's blueprint
+    """
+    if not PROFILING_ENABLED or not SECRET:
+        return
+
+    def wrap_views(state):
+        prefix = f'{blueprint.name}.'
+        for endpoint, view in state.app.view_functions.items():
+            if endpoint.startswith(prefix):
+                state.app.view_functions[endpoint] = profiled(view)
+
+    blueprint.record_once(wrap_views)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Server-Timing header of /calculate/* responses with durations of stages of request.
+
+Header is added to every calculation response if ENABLED is set in optional SERVER_TIMING class in configuration,
+otherwise only to requests with header REQUEST_HEADER (default X-Server-Timing, None turns it off), e.g.:
+Server-Timing: json_parse;dur=0.021, json_validate;dur=0.094, ..., colebrook_iterations;desc="3", total;dur=0.412
+Durations are in milliseconds. Streamed results are calculated and serialized after headers are sent, so
+header of streamed response has only stages before the first result.
+"""
+from flask import g, request
+
+import config
+from monitoring.stages import request_counts, request_duration, request_stages
+
+TIMING_CONFIG = getattr(config, 'SERVER_TIMING', None)
+SERVER_TIMING_ENABLED = getattr(TIMING_CONFIG, 'ENABLED', False)
+REQUEST_HEADER = getattr(TIMING_CONFIG, 'REQUEST_HEADER', 'X-Server-Timing')
+# origin allowed to read timings in browser (Resource Timing API), the same as for CORS
+TIMING_ALLOW_ORIGIN = getattr(getattr(config, 'API', None), 'CORS_ORIGIN', None)
+
+
+def server_timing(stages, counts, total=None, cache_result=None):
+    """Returns value of Server-Timing header.
+
+    :param stages: dict {stage: seconds}
+    :param counts: dict {name: count}, e.g. iterations of Colebrook equation
+    :param total: duration of the whole request in seconds
+    :param cache_result: 'hit' or 'miss' of result cache
+    """
+    metrics = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in stages.items()]
+    metrics.extend(f'{name};desc="{count}"' for name, count in counts.items())
+    if cache_result is not None:
+        metrics.append(f'cache;desc="{cache_result}"')
+    if total is not None:
+        metrics.append(f'total;dur={total * 1000:.3f}')
+    return ', '.join(metrics)
+
+
+def add_server_timing(response):
+    """Add Server-Timing header to response of calculation endpoint if it's enabled or requested.
+
+    :param response: flask's response
+    """
+    if not request.path.startswith('/calculate/'):
+        return response
+    if not SERVER_TIMING_ENABLED and not (REQUEST_HEADER and request.headers.get(REQUEST_HEADER)):
+        return response
+    response.headers['Server-Timing'] = server_timing(
+        request_stages(), request_counts(), request_duration(), g.get('cache_result')
+    )
+    if TIMING_ALLOW_ORIGIN:
+        response.headers['Timing-Allow-Origin'] = TIMING_ALLOW_ORIGIN
+    return response
+
+
+def init_server_timing(blueprint):
+    """Add Server-Timing header to responses of application with registered blueprint.
+
+    :param blueprint: flask's blueprint
+    """
+    blueprint.after_app_request(add_server_timing)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Timers of stages of request (e.g. json parsing, validation, fluid lookup, friction factor, serialization).
+
+Durations are summed per stage in flask.g of current request, so stage repeated many times (e.g. for every
+segment of batch) has one total. Counters (e.g. iterations of Colebrook equation) are summed the same way.
+Outside of request context (e.g. in benchmarks) nothing is recorded.
+"""
+from contextlib import contextmanager
+from time import perf_counter
+
+from flask import g, has_request_context
+
+
+def start_request_timer():
+    g.request_start = perf_counter()
+
+
+def request_duration():
+    """Returns time from start of current request in seconds or None if timer wasn't started."""
+    return perf_counter() - g.request_start if 'request_start' in g else None
+
+
+def record_stage(stage, seconds):
+    """Add duration of stage to timings of current request.
+
+    :param stage: name of stage
+    :param seconds: duration of stage
+    """
+    if has_request_context():
+        timings = g.setdefault('stage_timings', {})
+        timings[stage] = timings.get(stage, 0) + seconds
+
+
+def record_count(name, count):
+    """Add count (e.g. number of iterations) to counters of current request.
+
+    :param name: name of counter
+    :param count: number added to counter
+    """
+    if has_request_context():
+        counts = g.setdefault('request_counts', {})
+        counts[name] = counts.get(name, 0) + count
+
+
+def record_calculation(counts, timings=None):
+    """Add counters and durations of stages collected by functions of calculations package to current request.
+
+    :param counts: dict {name: count}, e.g. {'colebrook_iterations': 3}
+    :param timings: dict {stage: seconds}
+    """
+    for name, count in counts.items():
+        record_count(name, count)
+    for stage, seconds in (timings or {}).items():
+        record_stage(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage):
+    """Measure duration of code in with block as stage of current request.
+
+    :param stage: name of stage
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, perf_counter() - start)
+
+
+def request_stages():
+    """Returns dict {stage: seconds} with timings of current request."""
+    return g.get('stage_timings', {})
+
+
+def request_counts():
+    """Returns dict {name: count} with counters of current request."""
+    return g.get('request_counts', {})
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Warm-up of application before gunicorn forks workers (preload_app = True in gunicorn.conf).
+
+Data tables, pipe catalogues and unit registry are loaded on import in compact structures (array('d'), tuples,
+read-only numpy arrays), validators are compiled by decorators, and warm_up runs every endpoint once,
+so workers share all of it copy-on-write and the first request is calculated as fast as the next ones.
+"""
+import math
+
+from caching import result_cache
+from calculations.fluid_parameters import FLUID_TABLES
+from calculations.headloss_equations import FRICTION_MODELS
+from calculations.hydraulic_surfaces import PIPE_CATALOGUES
+from calculations.vectorized import catalogue_arrays
+
+
+def warm_up_requests():
+    """Returns list of (path, json) with requests to every endpoint for every fluid, material and friction model."""
+    requests = [
+        ('/calculate/gravity_flow', {'diameter': 0.2, 'height': 0.1, 'slope': 0.05, 'manning_coefficient': 0.013})
+    ]
+    for fluid, table in FLUID_TABLES.items():
+        # temperature between the first two rows of table, so parameters are interpolated
+        temperature = math.floor(table['temperature'][0]) + 1
+        for material, catalogue in PIPE_CATALOGUES.items():
+            nominal_diameter, _ = catalogue.pipes[0]
+            segment = {
+                'fluid': fluid,
+                'temperature': temperature,
+                'nominal_diameter': nominal_diameter,
+                'material': material,
+                'flow': 1,
+                'flow_unit': 'm3/h',
+                'length': 1,
+            }
+            requests.append(('/calculate/headloss', segment))
+            requests.append(('/calculate/headloss/batch', {'segments': [segment]}))
+            for friction_model in FRICTION_MODELS:
+                requests.append(
+                    (
+                        '/calculate/pipes',
+                        {
+                            'fluid': fluid,
+                            'temperature': temperature,
+                            'material': material,
+                            'flow': 1,
+                            'flow_unit': 'm3/h',
+                            'friction_model': friction_model,
+                        },
+                    )
+                )
+    return requests
+
+
+def warm_up(app):
+    """Prepare arrays of pipe catalogues and send warm-up request to every endpoint.
+
+    Result cache is off during warm-up, so every request is calculated. RuntimeError is raised
+    if any endpoint doesn't respond properly.
+    :param app: flask application
+    """
+    for catalogue in PIPE_CATALOGUES.values():
+        catalogue_arrays(catalogue)
+    client = app.test_client()
+    cache_enabled = result_cache.CACHE_ENABLED
+    result_cache.CACHE_ENABLED = False
+    try:
+        for path, req in warm_up_requests():
+            response = client.post(path, json=req)
+            if response.status_code != 200:
+                raise RuntimeError(f'Warm-up request to {path} failed with status {response.status_code}.')
+    finally:
+        result_cache.CACHE_ENABLED = cache_enabled
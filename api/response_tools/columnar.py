@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Responses with table of results in format selected by Accept header.
+
+Json is the default, binary formats are column oriented and available only if optional package is installed:
+* application/json - rows like in every endpoint: {<metadata>, "results": [{column: value}]}
+* application/msgpack (or application/x-msgpack) - MessagePack map {<metadata>, "columns": {column: [values]}}
+* application/x-npy - NumPy .npy file with structured array (field per column), without metadata
+* application/vnd.apache.arrow.stream - Arrow IPC stream with one record batch, metadata in schema metadata
+"""
+import io
+
+import numpy as np
+from flask import Response, request
+
+from monitoring.stages import stage_timer
+from response_tools.response_tools import api_response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+JSON_MIMETYPE = 'application/json'
+# columns saved as int64 in binary formats, the other ones are float64 (schema doesn't depend on values)
+INTEGER_COLUMNS = {'nominal_diameter'}
+
+
+def column_array(column, values):
+    """Returns column as numpy array, int64 for INTEGER_COLUMNS, otherwise float64.
+
+    :param column: name of column
+    :param values: list or array of numbers
+    """
+    return np.asarray(values, dtype=np.int64 if column in INTEGER_COLUMNS else np.float64)
+
+
+def msgpack_table(metadata, columns):
+    """Returns table serialized with MessagePack.
+
+    :param metadata: dict with other values of response, e.g. units
+    :param columns: dict {column: list of values}
+    """
+    return msgpack.packb({**metadata, 'columns': {column: list(values) for column, values in columns.items()}})
+
+
+def npy_table(metadata, columns):
+    """Returns table as NumPy .npy file with structured array.
+
+    :param metadata: dict with other values of response, it isn't saved in .npy file
+    :param columns: dict {column: list of values}
+    """
+    arrays = {column: column_array(column, values) for column, values in columns.items()}
+    length = len(next(iter(arrays.values()))) if arrays else 0
+    table = np.empty(length, dtype=[(column, array.dtype) for column, array in arrays.items()])
+    for column, array in arrays.items():
+        table[column] = array
+    buffer = io.BytesIO()
+    np.save(buffer, table, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def arrow_table(metadata, columns):
+    """Returns table as Arrow IPC stream.
+
+    :param metadata: dict with other values of response, saved as strings in schema metadata
+    :param columns: dict {column: list of values}
+    """
+    table = pyarrow.table(
+        {column: column_array(column, values) for column, values in columns.items()},
+        metadata={key: str(value) for key, value in metadata.items()},
+    )
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# binary formats of installed packages: {mimetype: function(metadata, columns) returning bytes}
+TABLE_FORMATS = {
+    mimetype: serializer
+    for mimetype, serializer, module in (
+        ('application/msgpack', msgpack_table, msgpack),
+        ('application/x-msgpack', msgpack_table, msgpack),
+        ('application/x-npy', npy_table, np),
+        ('application/vnd.apache.arrow.stream', arrow_table, pyarrow),
+    )
+    if module is not None
+}
+
+
+def response_format():
+    """Returns mimetype of response selected by Accept header from json and TABLE_FORMATS, json is the default."""
+    return request.accept_mimetypes.best_match([JSON_MIMETYPE, *TABLE_FORMATS], default=JSON_MIMETYPE)
+
+
+def table_response(metadata, columns):
+    """API response with table of results in format selected by Accept header.
+
+    :param metadata: dict with other values of response, e.g. units
+    :param columns: dict {column: list of values}, every column has the same length
+    """
+    mimetype = response_format()
+    if mimetype == JSON_MIMETYPE:
+        results = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        response = api_response({**metadata, 'results': results})
+    else:
+        with stage_timer('serialization'):
+            body = TABLE_FORMATS[mimetype](metadata, columns)
+        response = Response(body, mimetype=mimetype)
+    # format depends on Accept header, also when result cache is disabled
+    response.vary.add('Accept')
+    return response
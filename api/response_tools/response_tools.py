@@ -1,10 +1,88 @@
 #!/usr/bin/env python3
-from flask import jsonify
+"""Json responses of API.
+
+Content is serialized by the fastest installed encoder (orjson, ujson or standard json module),
+encoder can be selected with SERIALIZER in optional JSON class in configuration. Responses are compact
+with sorted keys, COMPACT = False in JSON class turns on indentation (e.g. for debugging).
+"""
+import json
+
+from flask import Response, current_app, request, stream_with_context
+
+import config
+from monitoring.stages import stage_timer
+from validations.errors import ParameterError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def json_dumps(content, compact=True):
+    """Serialize content with standard json module, returns bytes.
+
+    :param content: json serializable content
+    :param compact: without whitespaces, False adds indentation
+    """
+    if compact:
+        return json.dumps(content, sort_keys=True, separators=(',', ':')).encode()
+    return json.dumps(content, sort_keys=True, indent=2).encode()
+
+
+def orjson_dumps(content, compact=True):
+    """Serialize content with orjson, returns bytes.
+
+    :param content: json serializable content
+    :param compact: without whitespaces, False adds indentation
+    """
+    options = orjson.OPT_SORT_KEYS if compact else orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2
+    return orjson.dumps(content, option=options)
+
+
+def ujson_dumps(content, compact=True):
+    """Serialize content with ujson, returns bytes.
+
+    :param content: json serializable content
+    :param compact: without whitespaces, False adds indentation
+    """
+    return ujson.dumps(content, sort_keys=True, escape_forward_slashes=False, indent=0 if compact else 2).encode()
+
+
+# available serializers from the fastest one: {name: function(content, compact) returning bytes}
+SERIALIZERS = {
+    name: serializer
+    for name, serializer, module in (
+        ('orjson', orjson_dumps, orjson),
+        ('ujson', ujson_dumps, ujson),
+        ('json', json_dumps, json),
+    )
+    if module is not None
+}
+JSON_CONFIG = getattr(config, 'JSON', None)
+SERIALIZER = SERIALIZERS[getattr(JSON_CONFIG, 'SERIALIZER', None) or next(iter(SERIALIZERS))]
+COMPACT = getattr(JSON_CONFIG, 'COMPACT', True)
+
+
+def dumps(content, compact=None):
+    """Serialize content with selected serializer, returns bytes.
+
+    :param content: json serializable content
+    :param compact: without whitespaces, default is COMPACT from configuration
+    """
+    with stage_timer('serialization'):
+        return SERIALIZER(content, COMPACT if compact is None else compact)
 
 
 def api_response(content):
     """Proper API response as json."""
-    response = jsonify(content)
+    response = Response(dumps(content) + b'\n', mimetype='application/json')
     return response
 
 
@@ -14,6 +92,41 @@ def error_response(status_code, message):
     :param status_code: response status code
     :param message: error message
     """
-    response = jsonify({'status': status_code, 'message': message})
+    response = api_response({'status': status_code, 'message': message})
     response.status_code = status_code
     return response
+
+
+def stream_response(results, metadata=None):
+    """Streamed API response with results from generator, they are sent as soon as they are calculated.
+
+    Response is compact json {<metadata>, "results": [...]} sent in chunks, or one json per line (NDJSON,
+    without metadata) if client sends header "Accept: application/x-ndjson". Error raised by generator is sent
+    as the last result, so received json is always complete: {"status": 400, "message": ...} with message
+    of ParameterError, other errors are logged and sent as {"status": 500, "message": "Internal server error."}.
+    :param results: iterable of json serializable results
+    :param metadata: dict with other values of response, e.g. units
+    """
+    ndjson = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+    def chunks():
+        separator = b'\n' if ndjson else b','
+        if not ndjson:
+            # json object of metadata is opened again to add results as the last key
+            yield dumps(metadata, compact=True)[:-1] + b',"results":[' if metadata else b'{"results":['
+        prefix = b''
+        try:
+            for result in results:
+                yield prefix + dumps(result, compact=True)
+                prefix = separator
+        except ParameterError as exc:
+            yield prefix + dumps({'status': 400, 'message': str(exc)}, compact=True)
+        except Exception:
+            current_app.logger.exception('Error of streamed response.')
+            yield prefix + dumps({'status': 500, 'message': 'Internal server error.'}, compact=True)
+        yield b'\n' if ndjson else b']}\n'
+
+    response = Response(stream_with_context(chunks()), mimetype=NDJSON_MIMETYPE if ndjson else 'application/json')
+    # json or NDJSON is selected by Accept header
+    response.vary.add('Accept')
+    return response
@@ -1,25 +1,163 @@
 #!/usr/bin/env python3
+import math
 from functools import wraps
 
 import jsonschema
 from flask import request
 
 from calculations.fluid_parameters import fluid_params
-from calculations.hydraulic_surfaces import get_internal_diameter
+from calculations.hydraulic_surfaces import PIPE_CATALOGUES, get_internal_diameter
 from calculations.unit_convertion import unit_convertion
+from monitoring.stages import stage_timer
 from response_tools.response_tools import error_response
+from validations.errors import ParameterError  # noqa: F401
+
+# validators of already used schemas: {id(schema): (schema, validator)}
+COMPILED_VALIDATORS = {}
+
+
+def compiled_validator(schema):
+    """Returns validator of json schema, schema is checked and validator is created only once.
+
+    :param schema: validation schema from json_validation_schemas
+    """
+    if id(schema) not in COMPILED_VALIDATORS:
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        # schema is kept with validator, so its id can't be reused by another object
+        COMPILED_VALIDATORS[id(schema)] = (schema, validator_class(schema))
+    return COMPILED_VALIDATORS[id(schema)][1]
+
+
+def validate(req, schema):
+    """Validate json from user, ParameterError with validation message is raised for wrong json.
+
+    Errors are the same as from jsonschema.validate, but validator is compiled only once per schema.
+    :param req: json from user
+    :param schema: validation schema from json_validation_schemas
+    """
+    try:
+        compiled_validator(schema).validate(req)
+    except jsonschema.exceptions.ValidationError as exc:
+        raise ParameterError(exc.message)
+
+
+def pipe_parameters(req):
+    """Returns roughness and internal dimension of pipe from user's request.
+
+    :param req: validated json from user
+    """
+    roughness = req.get('roughness', 1.5)
+    internal_dimension = get_internal_diameter(req['nominal_diameter'], req['material'])
+    if not internal_dimension:
+        raise ParameterError('Wrong pipe diameter value.')
+    if 2 * roughness >= internal_dimension:
+        raise ParameterError('Wrong roughness value.')
+    return roughness, internal_dimension
+
+
+def fluid_parameters(req, lookup=fluid_params):
+    """Update request with fluid parameters in requested temperature.
+
+    :param req: validated json from user
+    :param lookup: function returning fluid parameters from fluid name and temperature
+    """
+    if 'power' in req:
+        req['temperature'] = (req['temperature_supply'] + req['temperature_return']) / 2
+    fluid = lookup(req['fluid'], req['temperature'])
+    req.update(
+        {
+            'density': fluid['density'],
+            'specific_heat': fluid['specific_heat'],
+            'viscosity': fluid['kinematic_viscosity'],
+        }
+    )
+
+
+def flow_from_power(req):
+    """Update request with volume flow rate calculated from power (only if power is send).
+
+    :param req: validated json from user with fluid parameters
+    """
+    if 'power' in req:
+        rounded = not req.get('full_precision', False)
+        power = unit_convertion(req['power'], req['power_unit'], 'W', 'power', rounded)
+        temperature_delta = abs(req['temperature_supply'] - req['temperature_return'])
+        if not temperature_delta:
+            raise ParameterError('Temperature supply and return can not have the same value.')
+        flow = power / (temperature_delta * req['density'] * req['specific_heat'])
+        req.update({'flow': flow, 'flow_unit': 'm3/s'})
+
+
+def sweep_values(value, name, max_count):
+    """Returns list of values from list or range {start, stop, step} (stop is included if it's reached by steps).
+
+    :param value: list of numbers or range from validated json
+    :param name: name of parameter used in error messages
+    :param max_count: maximum number of values
+    """
+    if isinstance(value, list):
+        return value
+    steps = (value['stop'] - value['start']) / value['step']
+    # tiny step or very wide range gives infinite number of steps
+    if not math.isfinite(steps):
+        raise ParameterError(f'Too many values of {name}, limit is {max_count}.')
+    count = math.floor(steps + 1e-9) + 1
+    if count < 1:
+        raise ParameterError(f'Empty range of {name}.')
+    if count > max_count:
+        raise ParameterError(f'Too many values of {name}: {count}, limit is {max_count}.')
+    # rounding removes float errors of steps like 0.1
+    return [round(value['start'] + index * value['step'], 10) for index in range(count)]
+
+
+def sweep_parameters(req, max_grid_size):
+    """Returns parameters of sweep as dict of lists: flows, temperatures, roughnesses, nominal and internal diameters.
+
+    ParameterError is raised for wrong values or if grid of all combinations is bigger than max_grid_size.
+    :param req: validated json from user
+    :param max_grid_size: maximum number of results
+    """
+    flows = sweep_values(req['flow'], 'flow', max_grid_size)
+    temperatures = sweep_values(req['temperature'], 'temperature', max_grid_size)
+    if any(temperature < 0 or temperature > 370 or temperature % 1 for temperature in temperatures):
+        raise ParameterError('Wrong temperature value.')
+    roughnesses = sweep_values(req.get('roughness', [1.5]), 'roughness', max_grid_size)
+    if min(roughnesses) <= 0:
+        raise ParameterError('Wrong roughness value.')
+    catalogue = PIPE_CATALOGUES[req['material']]
+    nominal_diameters = req.get('nominal_diameter', [nominal for nominal, _ in catalogue])
+    internal_diameters = [catalogue.internal_diameter(nominal) for nominal in nominal_diameters]
+    if None in internal_diameters:
+        raise ParameterError('Wrong pipe diameter value.')
+    if 2 * max(roughnesses) >= min(internal_diameters):
+        raise ParameterError('Wrong roughness value.')
+    grid_size = len(flows) * len(temperatures) * len(roughnesses) * len(nominal_diameters)
+    if grid_size > max_grid_size:
+        raise ParameterError(f'Too many results: {grid_size}, limit is {max_grid_size}.')
+    return {
+        'flows': flows,
+        'temperatures': temperatures,
+        'roughnesses': roughnesses,
+        'nominal_diameters': nominal_diameters,
+        'internal_diameters': internal_diameters,
+    }
 
 
 def json_validate(schema):
+    compiled_validator(schema)
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            try:
+            with stage_timer('json_parse'):
                 req = request.get_json()
-                jsonschema.validate(req, schema)
-                return func(*args, req=req, **kwargs)
-            except jsonschema.exceptions.ValidationError as exc:
-                return error_response(400, exc.message)
+            try:
+                with stage_timer('json_validate'):
+                    validate(req, schema)
+            except ParameterError as exc:
+                return error_response(400, str(exc))
+            return func(*args, req=req, **kwargs)
 
         return wrapper
 
@@ -29,12 +167,11 @@ def json_validate(schema):
 def check_pipe_parameters(func):
     @wraps(func)
     def wrapper(req, *args, **kwargs):
-        roughness = req.get('roughness', 1.5)
-        internal_dimension = get_internal_diameter(req['nominal_diameter'], req['material'])
-        if not internal_dimension:
-            return error_response(400, 'Wrong pipe diameter value.')
-        if 2 * roughness >= internal_dimension:
-            return error_response(400, 'Wrong roughness value.')
+        try:
+            with stage_timer('pipe_parameters'):
+                roughness, internal_dimension = pipe_parameters(req)
+        except ParameterError as exc:
+            return error_response(400, str(exc))
         return func(*args, req=req, roughness=roughness, internal_dimension=internal_dimension, **kwargs)
 
     return wrapper
@@ -43,16 +180,8 @@ def check_pipe_parameters(func):
 def get_fluid_parameters(func):
     @wraps(func)
     def wrapper(req, *args, **kwargs):
-        if 'power' in req:
-            req['temperature'] = (req['temperature_supply'] + req['temperature_return']) / 2
-        fluid = fluid_params(req['fluid'], req['temperature'])
-        req.update(
-            {
-                'density': fluid['density'],
-                'specific_heat': fluid['specific_heat'],
-                'viscosity': fluid['kinematic_viscosity'],
-            }
-        )
+        with stage_timer('fluid_parameters'):
+            fluid_parameters(req)
         return func(*args, req=req, **kwargs)
 
     return wrapper
@@ -61,13 +190,11 @@ def get_fluid_parameters(func):
 def power_to_flow(func):
     @wraps(func)
     def wrapper(req, *args, **kwargs):
-        if 'power' in req:
-            power = unit_convertion(req['power'], req['power_unit'], 'W', 'power')
-            temperature_delta = abs(req['temperature_supply'] - req['temperature_return'])
-            if not temperature_delta:
-                return error_response(400, 'Temperature supply and return can not have the same value.')
-            flow = power / (temperature_delta * req['density'] * req['specific_heat'])
-            req.update({'flow': flow, 'flow_unit': 'm3/s'})
+        try:
+            with stage_timer('flow_from_power'):
+                flow_from_power(req)
+        except ParameterError as exc:
+            return error_response(400, str(exc))
         return func(*args, req=req, **kwargs)
 
     return wrapper
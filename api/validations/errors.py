@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+
+
+class ParameterError(Exception):
+    """Wrong value of parameter from user, message is returned to user."""
@@ -16,6 +16,8 @@ properties_power = {
 basic_properties = {
     'fluid': {'type': 'string', 'enum': ['water']},
     'material': {'type': 'string', 'enum': ['steel']},
+    'friction_model': {'type': 'string', 'enum': ['colebrook', 'churchill', 'haaland', 'serghides', 'swamee_jain']},
+    'full_precision': {'type': 'boolean'},
     **properties_flow,
     **properties_power,
 }
@@ -59,6 +61,66 @@ headloss_all_pipes = {
     **power_and_flow_required_fields,
 }
 
+headloss_batch_schema = {
+    'properties': {'segments': {'type': 'array', 'items': {'type': 'object'}, 'minItems': 1, 'maxItems': 1000}},
+    'required': ['segments'],
+    **basic_schema,
+}
+
+sweep_range = {
+    'type': 'object',
+    'properties': {
+        'start': {'type': 'number'},
+        'stop': {'type': 'number'},
+        'step': {'type': 'number', 'minimum': 0, 'exclusiveMinimum': True},
+    },
+    'required': ['start', 'stop', 'step'],
+    'additionalProperties': False,
+}
+
+sweep_schema = {
+    'properties': {
+        'fluid': basic_properties['fluid'],
+        'material': basic_properties['material'],
+        'friction_model': basic_properties['friction_model'],
+        'full_precision': basic_properties['full_precision'],
+        'flow': {'oneOf': [{'type': 'array', 'items': {'type': 'number'}, 'minItems': 1}, sweep_range]},
+        'flow_unit': properties_flow['flow_unit'],
+        'temperature': {
+            'oneOf': [{'type': 'array', 'items': properties_flow['temperature'], 'minItems': 1}, sweep_range]
+        },
+        'roughness': {
+            'oneOf': [
+                {'type': 'array', 'items': headloss_selected_pipe['properties']['roughness'], 'minItems': 1},
+                sweep_range,
+            ]
+        },
+        'nominal_diameter': {'type': 'array', 'items': {'type': 'number'}, 'minItems': 1},
+        'length': headloss_selected_pipe['properties']['length'],
+        'headloss_unit': headloss_selected_pipe['properties']['headloss_unit'],
+    },
+    'required': ['fluid', 'material', 'flow', 'flow_unit', 'temperature'],
+    **basic_schema,
+}
+
+job_schema = {
+    'properties': {
+        'endpoint': {
+            'type': 'string',
+            'enum': [
+                '/calculate/headloss',
+                '/calculate/headloss/batch',
+                '/calculate/pipes',
+                '/calculate/sweep',
+                '/calculate/gravity_flow',
+            ],
+        },
+        'request': {'type': 'object'},
+    },
+    'required': ['endpoint', 'request'],
+    **basic_schema,
+}
+
 manning_schema = {
     'properties': {
         'width': {'type': 'number', 'minimum': 0, 'exclusiveMinimum': True},
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Compare Newton-Raphson colebrook solver with the previous bisection loop.
+
+Run from repository root: python3 benchmarks/bench_colebrook.py
+"""
+import math
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+from calculations.headloss_equations import colebrook_equation, colebrook_solver  # noqa: E402
+
+
+def colebrook_bisection(reynold, rel_roughness):
+    """Previous colebrook_equation implementation (reference), returns not rounded dfc and iterations."""
+    dfc = 20
+    prev_dfc = 0
+    iterations = 0
+    while True:
+        iterations += 1
+        left_side_value = 1 / math.sqrt(dfc)
+        right_side_value = -2 * math.log10((2.51 / (reynold * math.sqrt(dfc)) + (rel_roughness / 3.71)))
+        diff = abs(dfc - prev_dfc) / 2
+        prev_dfc = dfc
+        if left_side_value - right_side_value < -0.001:
+            dfc -= diff
+        elif left_side_value - right_side_value > 0.001:
+            dfc += diff
+        else:
+            return dfc, iterations
+
+
+def logspace(start, stop, count):
+    """Returns count values evenly spaced in log scale between 10^start and 10^stop."""
+    return [math.pow(10, start + (stop - start) * i / (count - 1)) for i in range(count)]
+
+
+def main():
+    reynolds = logspace(math.log10(2100), 8, 60)
+    rel_roughnesses = [0] + logspace(-6, math.log10(0.05), 40)
+    grid = [(reynold, rel_roughness) for reynold in reynolds for rel_roughness in rel_roughnesses]
+
+    max_deviation = max_rounded_deviation = 0
+    rounded_differences = 0
+    worst_case = None
+    bisection_iterations = newton_iterations = 0
+    for reynold, rel_roughness in grid:
+        reference, iterations = colebrook_bisection(reynold, rel_roughness)
+        bisection_iterations += iterations
+        dfc, iterations = colebrook_solver(reynold, rel_roughness)
+        newton_iterations += iterations
+        deviation = abs(dfc - reference) / reference
+        if deviation > max_deviation:
+            max_deviation, worst_case = deviation, (reynold, rel_roughness)
+        rounded_deviation = abs(round(dfc, 3) - round(reference, 3))
+        rounded_differences += rounded_deviation > 0
+        max_rounded_deviation = max(max_rounded_deviation, rounded_deviation)
+
+    def run(solver):
+        for reynold, rel_roughness in grid:
+            solver(reynold, rel_roughness)
+
+    repeat = 5
+    bisection_time = min(timeit.repeat(lambda: run(colebrook_bisection), number=1, repeat=repeat))
+    newton_time = min(timeit.repeat(lambda: run(colebrook_solver), number=1, repeat=repeat))
+    rounded_time = min(timeit.repeat(lambda: run(colebrook_equation), number=1, repeat=repeat))
+
+    print(f'grid: {len(reynolds)} reynolds numbers x {len(rel_roughnesses)} relative roughnesses = {len(grid)} cases')
+    print(f'bisection: {bisection_time / len(grid) * 1e6:.2f} us/call, {bisection_iterations / len(grid):.1f} it/call')
+    print(f'newton:    {newton_time / len(grid) * 1e6:.2f} us/call, {newton_iterations / len(grid):.1f} it/call')
+    print(f'colebrook_equation (rounded): {rounded_time / len(grid) * 1e6:.2f} us/call')
+    print(f'speedup: {bisection_time / newton_time:.1f}x')
+    print(
+        f'max relative deviation from bisection: {max_deviation:.2e} at Re={worst_case[0]:.0f}, e/D={worst_case[1]:.2e}'
+    )
+    print(
+        f'max deviation after rounding to 3 decimals: {max_rounded_deviation:.3f} '
+        f'({rounded_differences} of {len(grid)} cases, bisection stops at |lhs - rhs| < 0.001)'
+    )
+
+
+if __name__ == '__main__':
+    main()
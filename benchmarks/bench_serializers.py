@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Compare time of json serialization of /calculate/pipes response with flask's jsonify and available serializers.
+
+Run from repository root: python3 benchmarks/bench_serializers.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+from flask import jsonify  # noqa: E402
+
+from calculations.hydraulic_surfaces import PIPE_CATALOGUES  # noqa: E402
+from calculations.vectorized import pipes_headloss  # noqa: E402
+from main import app  # noqa: E402
+from response_tools.response_tools import SERIALIZERS, api_response  # noqa: E402
+
+
+def pipes_content():
+    """Returns content of /calculate/pipes response for 10 m3/h of water in steel pipes."""
+    nominal_diameters, velocities, losses = pipes_headloss(
+        PIPE_CATALOGUES['steel'], 10, 'm3/h', 995.6, 0.000000801, 1.5
+    )
+    results = [
+        {'nominal_diameter': nominal_diameter, 'headloss': loss, 'velocity': velocity}
+        for nominal_diameter, velocity, loss in zip(nominal_diameters, velocities, losses)
+    ]
+    return {'headloss_unit': 'Pa/m', 'velocity_unit': 'm/s', 'friction_model': 'colebrook', 'results': results}
+
+
+def per_call(function, number=5000):
+    """Returns the best time of one call in microseconds."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    content = pipes_content()
+    with app.test_request_context():
+        timings = []
+        app.debug = True
+        timings.append(('jsonify (debug, pretty printed)', per_call(lambda: jsonify(content))))
+        app.debug = False
+        timings.append(('jsonify', per_call(lambda: jsonify(content))))
+        for name, serializer in SERIALIZERS.items():
+            timings.append((f'{name} (compact)', per_call(lambda: serializer(content, True))))
+        timings.append(('api_response', per_call(lambda: api_response(content))))
+    print(f'/calculate/pipes response with {len(content["results"])} results')
+    jsonify_time = timings[1][1]
+    for name, timing in timings:
+        print(f'{name:35} {timing:8.2f} us   saving vs jsonify: {jsonify_time - timing:8.2f} us')
+
+
+if __name__ == '__main__':
+    main()
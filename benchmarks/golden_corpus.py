@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""Golden results of endpoints and differential tester of calculation engines.
+
+Run from repository root:
+    python3 benchmarks/golden_corpus.py compare                           # current api against corpus
+    python3 benchmarks/golden_corpus.py compare --engine scalar --tolerance headloss=1e-6
+    python3 benchmarks/golden_corpus.py compare --engine mypackage.fast_engine:engine --json deviations.json
+    python3 benchmarks/golden_corpus.py generate                          # capture corpus again
+    python3 benchmarks/golden_corpus.py accept --reason "new solver"      # accept deviations of current api
+
+Corpus (benchmarks/golden_corpus.json.gz) keeps thousands of random requests of /calculate/headloss (flow
+and power, every friction model, units, roughness, local loss coefficient, full precision),
+/calculate/pipes and /calculate/gravity_flow with status and json response of reference engine, so results
+of requests supported by the original implementation are exactly the same as its results.
+
+Engine is a function engine(endpoint, req) returning tuple (status code, json response). Built-in engines:
+* api: whole pipeline of flask's application (result cache is disabled)
+* scalar: /calculate/pipes calculated pipe by pipe with scalar functions instead of numpy, other endpoints as api
+* reference: api with Colebrook equation solved with bisection loop of the original implementation
+  (colebrook_bisection from bench_colebrook.py)
+Any other engine is imported from 'module:function' (api/ directory is in sys.path), so a new friction solver,
+rounding or whole pipeline can be checked e.g. by engine calling api engine with patched functions.
+
+Every number of response is compared with tolerance of its field (key in json): it matches when
+|actual - expected| <= atol + rtol * |expected|. Other differences (status, text, missing keys) are mismatches.
+Worst relative deviation of every field is reported with case, path in json and request. Exit status is 1
+if any value is out of tolerance.
+
+Accepted deviations are saved in corpus with value of engine and reason, value out of tolerance is accepted
+only if it's exactly the same. Accepted deviations of api: Newton's method solves Colebrook equation much more
+precisely than bisection stopped at residual 0.001, so dfc rounded to 3 decimal places differs for some requests
+and headloss is different by up to ~5% (dfc 0.020 vs 0.021). Velocity and results of other friction models
+and gravity flow are the same.
+"""
+import argparse
+import contextlib
+import copy
+import gzip
+import importlib
+import json
+import math
+import os
+import random
+import sys
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+# message about loaded configuration isn't a part of json output
+with contextlib.redirect_stdout(sys.stderr):
+    import config  # noqa: E402,F401
+
+from bench_colebrook import colebrook_bisection  # noqa: E402
+from caching import result_cache  # noqa: E402
+from calculations import headloss_equations, vectorized  # noqa: E402
+from calculations.hydraulic_surfaces import PIPE_CATALOGUES  # noqa: E402
+from endpoints import calculate_headloss  # noqa: E402
+from main import app  # noqa: E402
+from validations.decorators import ParameterError, flow_from_power, fluid_parameters, validate  # noqa: E402
+from validations.json_validation_schemas import headloss_all_pipes  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'golden_corpus.json.gz')
+# number of generated cases of every endpoint
+CASES = {'/calculate/headloss': 2000, '/calculate/pipes': 1000, '/calculate/gravity_flow': 1000}
+# default tolerance of every number: relative and absolute
+DEFAULT_RTOL = 1e-9
+DEFAULT_ATOL = 0.0
+
+FRICTION_MODELS = ('colebrook', 'churchill', 'haaland', 'serghides', 'swamee_jain')
+FLOW_UNITS = ('m3/h', 'm3/s', 'l/s', 'l/m', 'dm3/h', 'gal/m')
+# m3/h in flow unit
+FLOW_UNIT_FACTORS = {'m3/h': 1, 'm3/s': 1 / 3600, 'l/s': 1 / 3.6, 'l/m': 1000 / 60, 'dm3/h': 1000, 'gal/m': 4.402868}
+POWER_UNITS = {'W': 1000, 'kW': 1, 'kcal/h': 859.845}
+HEADLOSS_UNITS = ('Pa', 'hPa', 'kPa', 'mbar', 'bar', 'mmHg', 'atm')
+
+
+def significant(value, digits=4):
+    """Returns value rounded to significant digits, so requests in corpus are readable.
+
+    :param value: number
+    :param digits: significant digits
+    """
+    return float(f'{value:.{digits}g}')
+
+
+def log_uniform(rng, low, high):
+    return significant(math.exp(rng.uniform(math.log(low), math.log(high))))
+
+
+def flow_fields(rng):
+    """Returns random fields of flow or power, from laminar to highly turbulent flows.
+
+    :param rng: random.Random
+    """
+    if rng.random() < 0.3:
+        temperature_return = rng.randint(0, 330)
+        power_unit = rng.choice(list(POWER_UNITS))
+        return {
+            'temperature_supply': temperature_return + rng.randint(1, 40),
+            'temperature_return': temperature_return,
+            'power': significant(log_uniform(rng, 0.05, 5000) * POWER_UNITS[power_unit]),
+            'power_unit': power_unit,
+        }
+    flow_unit = rng.choice(FLOW_UNITS)
+    return {
+        'temperature': rng.randint(0, 370),
+        'flow': significant(log_uniform(rng, 0.001, 300) * FLOW_UNIT_FACTORS[flow_unit]),
+        'flow_unit': flow_unit,
+    }
+
+
+def common_fields(rng):
+    """Returns random optional fields of headloss and pipes requests.
+
+    :param rng: random.Random
+    """
+    fields = {}
+    if rng.random() < 0.5:
+        fields['friction_model'] = rng.choice(FRICTION_MODELS)
+    if rng.random() < 0.25:
+        fields['full_precision'] = True
+    if rng.random() < 0.3:
+        fields['roughness'] = log_uniform(rng, 0.001, 3)
+    return fields
+
+
+def headloss_request(rng):
+    req = {
+        'fluid': 'water',
+        'material': 'steel',
+        'nominal_diameter': rng.choice(PIPE_CATALOGUES['steel'].pipes)[0],
+        'length': significant(rng.uniform(0.1, 500), 3),
+        **flow_fields(rng),
+        **common_fields(rng),
+    }
+    if rng.random() < 0.3:
+        req['local_loss_coefficient'] = significant(rng.uniform(0, 50), 3)
+    if rng.random() < 0.5:
+        req['headloss_unit'] = rng.choice(HEADLOSS_UNITS)
+    return req
+
+
+def pipes_request(rng):
+    return {'fluid': 'water', 'material': 'steel', **flow_fields(rng), **common_fields(rng)}
+
+
+def gravity_flow_request(rng):
+    req = {'slope': log_uniform(rng, 0.0001, 0.2), 'manning_coefficient': significant(rng.uniform(0.009, 0.035), 3)}
+    if rng.random() < 0.5:
+        req['diameter'] = log_uniform(rng, 0.05, 3)
+        # height a bit higher than diameter is an error
+        req['height'] = significant(req['diameter'] * rng.uniform(0.01, 1.02))
+    else:
+        req['width'] = log_uniform(rng, 0.05, 10)
+        req['height'] = log_uniform(rng, 0.01, 3)
+    return req
+
+
+REQUEST_GENERATORS = {
+    '/calculate/headloss': headloss_request,
+    '/calculate/pipes': pipes_request,
+    '/calculate/gravity_flow': gravity_flow_request,
+}
+
+
+def api_engine(endpoint, req):
+    """Returns status and json response of endpoint of flask's application, result cache is disabled.
+
+    :param endpoint: path of endpoint e.g. /calculate/headloss
+    :param req: json request
+    """
+    cache_enabled = result_cache.CACHE_ENABLED
+    result_cache.CACHE_ENABLED = False
+    try:
+        response = app.test_client().post(endpoint, json=req)
+    finally:
+        result_cache.CACHE_ENABLED = cache_enabled
+    return response.status_code, response.get_json()
+
+
+def scalar_engine(endpoint, req):
+    """Returns status and json response with /calculate/pipes calculated by scalar functions pipe by pipe.
+
+    :param endpoint: path of endpoint e.g. /calculate/headloss
+    :param req: json request
+    """
+    if endpoint != '/calculate/pipes':
+        return api_engine(endpoint, req)
+    req = copy.deepcopy(req)
+    try:
+        validate(req, headloss_all_pipes)
+        fluid_parameters(req)
+        flow_from_power(req)
+    except ParameterError as exc:
+        return 400, {'message': str(exc), 'status': 400}
+    req['length'] = 1
+    results = []
+    for nominal_diameter, internal_dimension in PIPE_CATALOGUES[req['material']].pipes:
+        result = calculate_headloss(req, req.get('roughness', 1.5), internal_dimension)
+        results.append(
+            {'headloss': result['headloss'], 'nominal_diameter': nominal_diameter, 'velocity': result['velocity']}
+        )
+    return 200, {
+        'friction_model': req.get('friction_model', 'colebrook'),
+        'headloss_unit': 'Pa/m',
+        'results': results,
+        'velocity_unit': 'm/s',
+    }
+
+
+def reference_colebrook_equation(reynold, rel_roughness, rounded=True, counts=None):
+    """Colebrook equation solved with bisection loop of the original implementation."""
+    dfc, _ = colebrook_bisection(reynold, rel_roughness)
+    return round(dfc, 3) if rounded else dfc
+
+
+def reference_colebrook_equations(reynolds, rel_roughness, counts=None):
+    """Colebrook equation for arrays solved value by value with bisection loop of the original implementation."""
+    return np.array(
+        [colebrook_bisection(reynold, roughness)[0] for reynold, roughness in zip(reynolds, rel_roughness)]
+    )
+
+
+def reference_engine(endpoint, req):
+    """Returns status and json response of api with Colebrook equation of the original implementation.
+
+    Results of requests supported by the original implementation are the same as its results.
+    :param endpoint: path of endpoint e.g. /calculate/headloss
+    :param req: json request
+    """
+    with mock.patch.object(headloss_equations, 'colebrook_equation', reference_colebrook_equation):
+        with mock.patch.object(vectorized, 'colebrook_equation', reference_colebrook_equations):
+            return api_engine(endpoint, req)
+
+
+ENGINES = {'api': api_engine, 'scalar': scalar_engine, 'reference': reference_engine}
+
+
+def load_engine(name):
+    """Returns built-in engine or function imported from 'module:function'.
+
+    :param name: name of engine from ENGINES or 'module:function'
+    """
+    if name in ENGINES:
+        return ENGINES[name]
+    module, _, function = name.partition(':')
+    if not function:
+        raise argparse.ArgumentTypeError(f'Engine has to be one of {", ".join(ENGINES)} or module:function.')
+    return getattr(importlib.import_module(module), function)
+
+
+def generate_corpus(seed=0, cases=None, engine=reference_engine):
+    """Returns corpus of random requests with responses of engine.
+
+    :param seed: seed of random requests
+    :param cases: dict {endpoint: number of cases}, default CASES
+    :param engine: function returning (status, json) of endpoint and request
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for endpoint, count in (cases or CASES).items():
+        for _ in range(count):
+            req = REQUEST_GENERATORS[endpoint](rng)
+            status, response = engine(endpoint, copy.deepcopy(req))
+            corpus.append({'endpoint': endpoint, 'request': req, 'status': status, 'response': response})
+    return {'seed': seed, 'cases': corpus}
+
+
+def save_corpus(corpus, path=CORPUS_PATH):
+    # mtime=0 gives the same file for the same corpus
+    with gzip.GzipFile(path, 'wb', mtime=0) as corpus_file:
+        corpus_file.write(json.dumps(corpus, sort_keys=True, separators=(',', ':')).encode())
+
+
+def load_corpus(path=CORPUS_PATH):
+    with gzip.open(path, 'rb') as corpus_file:
+        return json.loads(corpus_file.read())
+
+
+def parse_tolerance(text):
+    """Returns tuple (field, rtol, atol) from text like 'headloss=1e-6' or 'velocity=0:0.001'.
+
+    :param text: field=rtol or field=rtol:atol
+    """
+    field, _, values = text.partition('=')
+    rtol, _, atol = values.partition(':')
+    try:
+        return field, float(rtol), float(atol or DEFAULT_ATOL)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Wrong tolerance: {text}, expected field=rtol or field=rtol:atol.')
+
+
+def relative_deviation(actual, expected):
+    if actual == expected:
+        return 0.0
+    if expected == 0:
+        return math.inf
+    return abs(actual - expected) / abs(expected)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def diff_values(actual, expected, path='', field=None):
+    """Yields differences of json values as tuples (path, field, actual, expected).
+
+    Numbers are yielded always (also equal ones) to be checked with tolerance of field, other values
+    only when they are different.
+    :param actual: json value of tested engine
+    :param expected: json value from corpus
+    :param path: location of values in json e.g. results[3].headloss
+    :param field: the last key of path
+    """
+    if is_number(actual) and is_number(expected):
+        yield path, field, actual, expected
+    elif isinstance(actual, dict) and isinstance(expected, dict):
+        for key in sorted(set(actual) | set(expected)):
+            key_path = f'{path}.{key}' if path else key
+            if key not in actual or key not in expected:
+                yield key_path, key, actual.get(key), expected.get(key)
+            else:
+                yield from diff_values(actual[key], expected[key], key_path, key)
+    elif isinstance(actual, list) and isinstance(expected, list) and len(actual) == len(expected):
+        for index, (actual_item, expected_item) in enumerate(zip(actual, expected)):
+            yield from diff_values(actual_item, expected_item, f'{path}[{index}]', field)
+    elif actual != expected:
+        yield path, field, actual, expected
+
+
+def compare(corpus, engine, tolerances=None, default_tolerance=(DEFAULT_RTOL, DEFAULT_ATOL)):
+    """Returns report of engine compared with corpus.
+
+    Report has numbers of cases and failures, 'fields' with number of compared values, failures, accepted
+    deviations and the worst relative deviation of every field (with case, endpoint, path, request, actual
+    and expected value), 'mismatches' with every difference other than number, 'deviations' with every number
+    out of tolerance and 'accepted' with every one of them which is equal to accepted deviation of corpus.
+    :param corpus: corpus from generate_corpus or load_corpus
+    :param engine: function returning (status, json) of endpoint and request
+    :param tolerances: dict {field: (rtol, atol)}
+    :param default_tolerance: (rtol, atol) of fields missing in tolerances
+    """
+    tolerances = tolerances or {}
+    accepted_values = {(item['case'], item['path']): item for item in corpus.get('accepted', [])}
+    fields = {}
+    mismatches = []
+    deviations = []
+    accepted = []
+    failed_cases = set()
+    for index, case in enumerate(corpus['cases']):
+        status, response = engine(case['endpoint'], copy.deepcopy(case['request']))
+        location = {'case': index, 'endpoint': case['endpoint'], 'request': case['request']}
+        if status != case['status']:
+            mismatches.append({**location, 'path': 'status', 'actual': status, 'expected': case['status']})
+            failed_cases.add(index)
+            continue
+        for path, field, actual, expected in diff_values(response, case['response']):
+            if not (is_number(actual) and is_number(expected)):
+                mismatches.append({**location, 'path': path, 'actual': actual, 'expected': expected})
+                failed_cases.add(index)
+                continue
+            rtol, atol = tolerances.get(field, default_tolerance)
+            stats = fields.setdefault(field, {'compared': 0, 'failures': 0, 'accepted': 0, 'worst': None})
+            stats['compared'] += 1
+            if abs(actual - expected) > atol + rtol * abs(expected):
+                deviations.append({'case': index, 'path': path, 'actual': actual, 'expected': expected})
+                accepted_value = accepted_values.get((index, path))
+                if accepted_value is not None and accepted_value['actual'] == actual:
+                    stats['accepted'] += 1
+                    accepted.append(accepted_value)
+                else:
+                    stats['failures'] += 1
+                    failed_cases.add(index)
+            deviation = relative_deviation(actual, expected)
+            if stats['worst'] is None or deviation > stats['worst']['relative_deviation']:
+                stats['worst'] = {
+                    **location,
+                    'path': path,
+                    'actual': actual,
+                    'expected': expected,
+                    'relative_deviation': deviation,
+                    'absolute_deviation': abs(actual - expected),
+                }
+    return {
+        'cases': len(corpus['cases']),
+        'failed_cases': len(failed_cases),
+        'fields': fields,
+        'mismatches': mismatches,
+        'deviations': deviations,
+        'accepted': accepted,
+    }
+
+
+def accept_deviations(corpus, engine, reason, tolerances=None):
+    """Returns corpus with numbers of engine out of tolerance saved as accepted deviations.
+
+    Previous accepted deviations are replaced, status and other mismatches can't be accepted.
+    :param corpus: corpus from generate_corpus or load_corpus
+    :param engine: function returning (status, json) of endpoint and request
+    :param reason: description of deviations e.g. change of solver
+    :param tolerances: dict {field: (rtol, atol)}, DEFAULT_RTOL and DEFAULT_ATOL are used for other fields
+    """
+    report = compare({'cases': corpus['cases']}, engine, tolerances)
+    mismatched_cases = {mismatch['case'] for mismatch in report['mismatches']}
+    accepted = [
+        {**deviation, 'reason': reason}
+        for deviation in report['deviations']
+        if deviation['case'] not in mismatched_cases
+    ]
+    return {**corpus, 'accepted': accepted}
+
+
+def print_report(report, mismatches_limit=10):
+    print(f'{"field":20} {"compared":>9} {"failures":>9} {"accepted":>9} {"worst rel. dev.":>16}  location')
+    for field, stats in sorted(report['fields'].items()):
+        worst = stats['worst']
+        print(
+            f'{field:20} {stats["compared"]:9} {stats["failures"]:9} {stats["accepted"]:9} '
+            f'{worst["relative_deviation"]:16.3e}  case {worst["case"]} {worst["endpoint"]} {worst["path"]}: '
+            f'{worst["actual"]} (expected {worst["expected"]})'
+        )
+        if worst['relative_deviation']:
+            print(f'{"":68}request: {json.dumps(worst["request"], sort_keys=True)}')
+    for mismatch in report['mismatches'][:mismatches_limit]:
+        print(
+            f'mismatch: case {mismatch["case"]} {mismatch["endpoint"]} {mismatch["path"]}: '
+            f'{mismatch["actual"]!r} (expected {mismatch["expected"]!r}), request: {json.dumps(mismatch["request"])}'
+        )
+    if len(report['mismatches']) > mismatches_limit:
+        print(f'... {len(report["mismatches"]) - mismatches_limit} more mismatches')
+    reasons = sorted({item['reason'] for item in report['accepted']})
+    if reasons:
+        print(f'{len(report["accepted"])} accepted deviations: {"; ".join(reasons)}')
+    print(f'{report["failed_cases"]} of {report["cases"]} cases out of tolerance')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    generate_parser = subparsers.add_parser('generate', help='capture corpus with responses of engine')
+    generate_parser.add_argument('--seed', type=int, default=0, help='seed of random requests')
+    compare_parser = subparsers.add_parser('compare', help='compare engine with corpus')
+    compare_parser.add_argument('--json', help='save report as json in this path')
+    accept_parser = subparsers.add_parser('accept', help='save numbers of engine out of tolerance as accepted')
+    accept_parser.add_argument('--reason', required=True, help='description of accepted deviations')
+    for subparser in (compare_parser, accept_parser):
+        subparser.add_argument(
+            '--tolerance',
+            type=parse_tolerance,
+            action='append',
+            default=[],
+            help=f'field=rtol[:atol], e.g. headloss=1e-6, default {DEFAULT_RTOL}:{DEFAULT_ATOL} for every field',
+        )
+    for subparser, engine in ((generate_parser, 'reference'), (compare_parser, 'api'), (accept_parser, 'api')):
+        subparser.add_argument(
+            '--engine',
+            type=load_engine,
+            default=engine,
+            help=f'api, scalar, reference or module:function (default {engine})',
+        )
+        subparser.add_argument('--corpus', default=CORPUS_PATH, help='path of corpus')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        corpus = generate_corpus(args.seed, engine=args.engine)
+        save_corpus(corpus, args.corpus)
+        print(f'saved {len(corpus["cases"])} cases in {args.corpus}')
+        return
+    tolerances = {field: (rtol, atol) for field, rtol, atol in args.tolerance}
+    if args.command == 'accept':
+        corpus = accept_deviations(load_corpus(args.corpus), args.engine, args.reason, tolerances)
+        save_corpus(corpus, args.corpus)
+        print(f'saved {len(corpus["accepted"])} accepted deviations in {args.corpus}')
+        return
+    report = compare(load_corpus(args.corpus), args.engine, tolerances)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(report, json_file, indent=2)
+    sys.exit(1 if report['failed_cases'] else 0)
+
+
+if __name__ == '__main__':
+    main()
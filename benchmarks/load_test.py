@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Load test of API under gunicorn with production-like mix of requests.
+
+Run from repository root:
+    python3 benchmarks/load_test.py
+    python3 benchmarks/load_test.py --workers 1,2,4 --worker-class sync,gthread --duration 20 --concurrency 16
+    python3 benchmarks/load_test.py --mix headloss=60,pipes=30,health=10 --json load_test.json
+
+Gunicorn is started with settings from gunicorn.conf for every combination of worker count and worker class,
+then client processes send requests from the mix (each one waits for response before the next request)
+for given time. Throughput and p50/p95/p99 latency are reported for every kind of request.
+Payloads are random (flow, power, temperature, diameter), so most of them aren't served from result cache.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+REPOSITORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+NOMINAL_DIAMETERS = (8, 10, 15, 20, 25, 32, 40, 50, 65, 80, 100, 125, 150)
+# default share of every kind of request in percents
+DEFAULT_MIX = {
+    'headloss': 35,
+    'headloss_power': 15,
+    'pipes': 20,
+    'pipes_power': 10,
+    'gravity_flow': 15,
+    'health': 5,
+}
+
+
+def headloss_payload(rng):
+    return {
+        'fluid': 'water',
+        'temperature': rng.randint(5, 90),
+        'nominal_diameter': rng.choice(NOMINAL_DIAMETERS),
+        'material': 'steel',
+        'flow': round(rng.uniform(0.1, 20), 2),
+        'flow_unit': 'm3/h',
+        'length': rng.randint(1, 100),
+    }
+
+
+def pipes_payload(rng):
+    payload = headloss_payload(rng)
+    del payload['nominal_diameter'], payload['length']
+    return payload
+
+
+def power_payload(rng):
+    temperature_return = rng.randint(20, 60)
+    return {
+        'fluid': 'water',
+        'temperature_supply': temperature_return + rng.randint(5, 30),
+        'temperature_return': temperature_return,
+        'material': 'steel',
+        'power': round(rng.uniform(1, 200), 1),
+        'power_unit': 'kW',
+    }
+
+
+def gravity_flow_payload(rng):
+    if rng.random() < 0.5:
+        diameter = rng.choice((0.1, 0.15, 0.2, 0.3))
+        shape = {'diameter': diameter, 'height': round(diameter * rng.uniform(0.1, 0.9), 3)}
+    else:
+        shape = {'width': round(rng.uniform(0.2, 2), 2), 'height': round(rng.uniform(0.05, 0.5), 2)}
+    return {**shape, 'slope': round(rng.uniform(0.001, 0.05), 4), 'manning_coefficient': 0.013}
+
+
+# kinds of requests: {name: (method, path, function returning random json or None)}
+REQUESTS = {
+    'headloss': ('POST', '/calculate/headloss', headloss_payload),
+    'headloss_power': (
+        'POST',
+        '/calculate/headloss',
+        lambda rng: {**power_payload(rng), 'nominal_diameter': rng.choice(NOMINAL_DIAMETERS), 'length': 10},
+    ),
+    'pipes': ('POST', '/calculate/pipes', pipes_payload),
+    'pipes_power': ('POST', '/calculate/pipes', power_payload),
+    'gravity_flow': ('POST', '/calculate/gravity_flow', gravity_flow_payload),
+    'health': ('GET', '/health', None),
+}
+
+
+def parse_mix(text):
+    """Returns dict {kind of request: weight} from text like 'headloss=60,pipes=30,health=10'.
+
+    :param text: comma separated pairs kind=weight
+    """
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        if name not in REQUESTS:
+            raise argparse.ArgumentTypeError(f'Unknown kind of request: {name}, available: {", ".join(REQUESTS)}.')
+        mix[name] = float(weight)
+    return mix
+
+
+def send_request(port, method, path, payload):
+    """Returns status code of request sent with new connection.
+
+    :param port: port of API on localhost
+    :param method: http method
+    :param path: path of endpoint
+    :param payload: json or None
+    """
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        body = None if payload is None else json.dumps(payload)
+        connection.request(method, path, body, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def run_client(port, mix, duration, seed):
+    """Send requests from mix one by one for duration seconds, returns list of (kind, latency [s], status).
+
+    :param port: port of API on localhost
+    :param mix: dict {kind of request: weight}
+    :param duration: time of test in seconds
+    :param seed: seed of random payloads
+    """
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        method, path, payload = REQUESTS[kind]
+        req = payload(rng) if payload else None
+        start = time.perf_counter()
+        try:
+            status = send_request(port, method, path, req)
+        except OSError:
+            status = 0
+        samples.append((kind, time.perf_counter() - start, status))
+    return samples
+
+
+def percentile(sorted_values, percent):
+    """Returns percentile with nearest-rank method.
+
+    :param sorted_values: sorted list of numbers
+    :param percent: percentile e.g. 99
+    """
+    index = max(0, min(len(sorted_values) - 1, int(-(-len(sorted_values) * percent // 100)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, duration):
+    """Returns statistics of samples for every kind of request and all of them (key 'all').
+
+    :param samples: list of (kind, latency [s], status)
+    :param duration: time of test in seconds
+    """
+    groups = {}
+    for kind, latency, status in samples:
+        groups.setdefault(kind, []).append((latency, status))
+        groups.setdefault('all', []).append((latency, status))
+    summary = {}
+    for kind, values in groups.items():
+        latencies = sorted(latency for latency, _ in values)
+        summary[kind] = {
+            'requests': len(values),
+            'errors': sum(1 for _, status in values if status != 200),
+            'throughput': len(values) / duration,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+        }
+    return summary
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(gunicorn, port, workers, worker_class, threads):
+    """Start gunicorn with settings from gunicorn.conf and wait until API responds, returns process.
+
+    :param gunicorn: path of gunicorn executable
+    :param port: port of API on localhost
+    :param workers: number of workers
+    :param worker_class: gunicorn worker class e.g. sync, gthread
+    :param threads: number of threads of gthread worker
+    """
+    command = [
+        gunicorn,
+        '-c',
+        'gunicorn.conf',
+        '--chdir',
+        'api',
+        '--bind',
+        f'127.0.0.1:{port}',
+        '--workers',
+        str(workers),
+        '--worker-class',
+        worker_class,
+        '--threads',
+        str(threads),
+        '--access-logfile',
+        os.devnull,
+        'main:app',
+    ]
+    process = subprocess.Popen(command, cwd=REPOSITORY, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited: {process.stderr.read().decode()[-2000:]}')
+        try:
+            if send_request(port, 'GET', '/health', None) == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not start in 60 s.')
+
+
+def run_configuration(args, workers, worker_class):
+    """Returns statistics of load test of one gunicorn configuration.
+
+    :param args: parsed arguments of command line
+    :param workers: number of workers
+    :param worker_class: gunicorn worker class
+    """
+    port = free_port()
+    process = start_gunicorn(args.gunicorn, port, workers, worker_class, args.threads)
+    try:
+        with multiprocessing.Pool(args.concurrency) as pool:
+            if args.warm_up:
+                pool.starmap(run_client, [(port, args.mix, args.warm_up, -seed) for seed in range(args.concurrency)])
+            results = pool.starmap(
+                run_client, [(port, args.mix, args.duration, args.seed + seed) for seed in range(args.concurrency)]
+            )
+    finally:
+        process.terminate()
+        process.wait(30)
+    return summarize([sample for samples in results for sample in samples], args.duration)
+
+
+def print_report(report):
+    print(
+        f'{"configuration":22} {"request":16} {"requests":>9} {"errors":>7} {"req/s":>9} '
+        f'{"p50 [ms]":>9} {"p95 [ms]":>9} {"p99 [ms]":>9}'
+    )
+    for configuration in report['configurations']:
+        name = f'{configuration["workers"]} x {configuration["worker_class"]}'
+        for kind, stats in sorted(configuration['routes'].items(), key=lambda item: item[0] == 'all'):
+            print(
+                f'{name:22} {kind:16} {stats["requests"]:9} {stats["errors"]:7} {stats["throughput"]:9.1f} '
+                f'{stats["p50_ms"]:9.2f} {stats["p95_ms"]:9.2f} {stats["p99_ms"]:9.2f}'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='4', help='comma separated numbers of workers, default 4')
+    parser.add_argument('--worker-class', default='sync', help='comma separated gunicorn worker classes')
+    parser.add_argument('--threads', type=int, default=4, help='threads of gthread workers, default 4')
+    parser.add_argument('--concurrency', type=int, default=8, help='number of client processes, default 8')
+    parser.add_argument('--duration', type=float, default=10, help='time of test of every configuration [s]')
+    parser.add_argument('--warm-up', type=float, default=2, help='time of requests before test [s]')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help='e.g. headloss=60,pipes=30,health=10')
+    parser.add_argument('--seed', type=int, default=0, help='seed of random payloads')
+    parser.add_argument('--gunicorn', default=shutil.which('gunicorn'), help='path of gunicorn executable')
+    parser.add_argument('--json', help='save results as json in this path')
+    args = parser.parse_args()
+    if not args.gunicorn:
+        parser.error('gunicorn executable not found, use --gunicorn')
+
+    report = {'mix': args.mix, 'concurrency': args.concurrency, 'duration': args.duration, 'configurations': []}
+    for worker_class in args.worker_class.split(','):
+        for workers in map(int, args.workers.split(',')):
+            print(f'testing {workers} x {worker_class} ...', file=sys.stderr)
+            routes = run_configuration(args, workers, worker_class)
+            report['configurations'].append({'workers': workers, 'worker_class': worker_class, 'routes': routes})
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(report, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Microbenchmarks of calculation functions and endpoints compared with stored baseline.
+
+Run from repository root:
+    python3 benchmarks/run_benchmarks.py                      # compare with benchmarks/baseline.json
+    python3 benchmarks/run_benchmarks.py --save-baseline      # save results as new baseline
+    python3 benchmarks/run_benchmarks.py --filter endpoint --json results.json
+
+Time of benchmark is the best time of one call from repeated runs (in microseconds). Benchmark slower than
+baseline by more than threshold is a regression and exit status is 1. Baseline depends on machine, so it has
+to be saved again on machine where benchmarks are compared.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+# message about loaded configuration isn't a part of json output
+with contextlib.redirect_stdout(sys.stderr):
+    import config  # noqa: E402,F401
+
+from caching import result_cache  # noqa: E402
+from calculations.flow_equations import manning_equation, velocity_equation  # noqa: E402
+from calculations.fluid_parameters import fluid_params  # noqa: E402
+from calculations.headloss_equations import (  # noqa: E402
+    FRICTION_MODELS,
+    colebrook_equation,
+    darcy_friction_coefficient,
+    darcy_weisbach_equation,
+    reynolds_equation,
+)
+from calculations.hydraulic_surfaces import (  # noqa: E402
+    PIPE_CATALOGUES,
+    angle_in_partial_filled_pipe,
+    circular_pipe,
+    circular_water_cross_sectional_area,
+    circular_wetted_perimeter,
+    get_internal_diameter,
+    get_internal_diameters,
+    hydraulic_radius,
+    rectangular_dict,
+    rectangular_wetted_perimeter,
+)
+from calculations.unit_convertion import round_units, unit_convertion  # noqa: E402
+from calculations.vectorized import pipes_headloss  # noqa: E402
+from main import app  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# calls of reference workload measured around every run (about 1 ms)
+REFERENCE_NUMBER = 20
+
+HEADLOSS_REQUEST = {
+    'fluid': 'water',
+    'temperature': 30,
+    'nominal_diameter': 25,
+    'material': 'steel',
+    'flow': 1,
+    'flow_unit': 'm3/h',
+    'length': 10,
+}
+HEADLOSS_POWER_REQUEST = {
+    'fluid': 'water',
+    'temperature_supply': 80,
+    'temperature_return': 50,
+    'nominal_diameter': 25,
+    'material': 'steel',
+    'power': 10,
+    'power_unit': 'kW',
+    'length': 10,
+    'local_loss_coefficient': 15,
+}
+PIPES_REQUEST = {'fluid': 'water', 'temperature': 30, 'material': 'steel', 'flow': 10, 'flow_unit': 'm3/h'}
+SWEEP_REQUEST = {
+    'fluid': 'water',
+    'material': 'steel',
+    'flow': {'start': 0.5, 'stop': 10, 'step': 0.5},
+    'flow_unit': 'm3/h',
+    'temperature': {'start': 10, 'stop': 50, 'step': 10},
+    'roughness': [0.05, 1.5],
+}
+# endpoint benchmarks: {name: (method, path, json, headers)}
+ENDPOINT_REQUESTS = {
+    'endpoint.health': ('GET', '/health', None, None),
+    'endpoint.headloss': ('POST', '/calculate/headloss', HEADLOSS_REQUEST, None),
+    'endpoint.headloss.power': ('POST', '/calculate/headloss', HEADLOSS_POWER_REQUEST, None),
+    'endpoint.headloss.full_precision': (
+        'POST',
+        '/calculate/headloss',
+        {**HEADLOSS_REQUEST, 'full_precision': True},
+        None,
+    ),
+    'endpoint.headloss_batch.100': (
+        'POST',
+        '/calculate/headloss/batch',
+        {'segments': [HEADLOSS_REQUEST] * 100},
+        None,
+    ),
+    'endpoint.pipes': ('POST', '/calculate/pipes', PIPES_REQUEST, None),
+    'endpoint.pipes.npy': ('POST', '/calculate/pipes', PIPES_REQUEST, {'Accept': 'application/x-npy'}),
+    'endpoint.sweep.2600': ('POST', '/calculate/sweep', SWEEP_REQUEST, None),
+    'endpoint.gravity_flow.diameter': (
+        'POST',
+        '/calculate/gravity_flow',
+        {'diameter': 0.1, 'height': 0.05, 'slope': 0.05, 'manning_coefficient': 0.013},
+        None,
+    ),
+    'endpoint.gravity_flow.width': (
+        'POST',
+        '/calculate/gravity_flow',
+        {'width': 0.5, 'height': 0.2, 'slope': 0.01, 'manning_coefficient': 0.013},
+        None,
+    ),
+}
+
+
+def calculation_benchmarks():
+    """Returns dict {name: function without arguments} with benchmarks of calculation functions."""
+    steel = PIPE_CATALOGUES['steel']
+    benchmarks = {
+        'unit_convertion.lenght': lambda: unit_convertion(27.3, 'mm', 'm', 'lenght'),
+        'unit_convertion.pressure': lambda: unit_convertion(3136.5, 'Pa', 'kPa', 'pressure'),
+        'unit_convertion.full_precision': lambda: unit_convertion(10, 'kW', 'W', 'power', False),
+        'round_units.small': lambda: round_units(0.000123456, 3),
+        'round_units.large': lambda: round_units(163837.45, 5),
+        'fluid_params.table_row': lambda: fluid_params('water', 30),
+        'fluid_params.interpolated': lambda: fluid_params('water', 33),
+        'colebrook_equation.smooth': lambda: colebrook_equation(100000, 0.00001),
+        'colebrook_equation.rough': lambda: colebrook_equation(10000000, 0.05),
+        'colebrook_equation.full_precision': lambda: colebrook_equation(100000, 0.001, False),
+        'darcy_friction_coefficient.laminar': lambda: darcy_friction_coefficient(1500, 27.3, 1.5),
+        'reynolds_equation': lambda: reynolds_equation(0.478, 27.3, 0.000000801),
+        'darcy_weisbach_equation': lambda: darcy_weisbach_equation(0.058, 0, 10, 0.0273, 995.6, 0.478),
+        'velocity_equation': lambda: velocity_equation(1, 'm3/h', 0.000585),
+        'manning_equation': lambda: manning_equation(0.025, 0.013, 0.05),
+        'circular_pipe': lambda: circular_pipe(27.3, 'mm'),
+        'get_internal_diameter': lambda: get_internal_diameter(25, 'steel'),
+        'get_internal_diameters': lambda: get_internal_diameters('steel'),
+        'rectangular_dict': lambda: rectangular_dict(0.5, 0.2, 'm'),
+        'angle_in_partial_filled_pipe': lambda: angle_in_partial_filled_pipe(0.1, 0.05),
+        'circular_water_cross_sectional_area': lambda: circular_water_cross_sectional_area(3.14159, 0.1, 0.05),
+        'circular_wetted_perimeter': lambda: circular_wetted_perimeter(3.14159, 0.1),
+        'rectangular_wetted_perimeter': lambda: rectangular_wetted_perimeter(0.5, 0.2),
+        'hydraulic_radius': lambda: hydraulic_radius(0.1, 0.9),
+        'pipes_headloss': lambda: pipes_headloss(steel, 10, 'm3/h', 995.6, 0.000000801, 1.5),
+    }
+    for friction_model in FRICTION_MODELS:
+        benchmarks[f'darcy_friction_coefficient.{friction_model}'] = (
+            lambda friction_model=friction_model: darcy_friction_coefficient(100000, 27.3, 0.05, friction_model)
+        )
+    return benchmarks
+
+
+def endpoint_benchmarks(client):
+    """Returns dict {name: function without arguments} with benchmarks of endpoints called by flask's test client.
+
+    Results are calculated in every call, except 'cached' benchmark (result cache is disabled by run_benchmark).
+    :param client: flask's test client
+    """
+
+    def call(method, path, req, headers):
+        response = client.open(path, method=method, json=req, headers=headers)
+        response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f'{method} {path} responded with status {response.status_code}.')
+
+    benchmarks = {name: lambda request=request: call(*request) for name, request in ENDPOINT_REQUESTS.items()}
+    benchmarks['endpoint.headloss.cached'] = lambda: call(*ENDPOINT_REQUESTS['endpoint.headloss'])
+    return benchmarks
+
+
+def reference_workload():
+    """Fixed pure python work, its time measures current speed of machine."""
+    total = 0
+    for number in range(1000):
+        total += number * number % 7
+    return total
+
+
+def timed_run(function, number):
+    """Returns time of one call of function in seconds, measured from number of calls.
+
+    :param function: function without arguments
+    :param number: number of calls
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        function()
+    return (time.perf_counter() - start) / number
+
+
+def measure(function, min_time=0.02, repeat=15):
+    """Returns timings of function as dict, number of calls in one run is chosen to last at least min_time.
+
+    Speed of machine changes (e.g. frequency of CPU, other processes), so every run is compared
+    with reference workload measured just before and after it. Score is median of these ratios,
+    it's time of function in units of reference workload and it's compared with baseline.
+    :param function: function without arguments
+    :param min_time: minimum time of one run in seconds
+    :param repeat: number of runs
+    """
+    number = 1
+    while timed_run(function, number) * number < min_time:
+        number *= 2
+    times = []
+    scores = []
+    for _ in range(repeat):
+        reference_before = timed_run(reference_workload, REFERENCE_NUMBER)
+        run_time = timed_run(function, number)
+        reference_after = timed_run(reference_workload, REFERENCE_NUMBER)
+        times.append(run_time * 1e6)
+        scores.append(run_time / ((reference_before + reference_after) / 2))
+    return {
+        'best_us': min(times),
+        'median_us': statistics.median(times),
+        'score': statistics.median(scores),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def run_benchmark(name, function, min_time, repeat):
+    """Returns timings of benchmark, result cache is enabled only for cached benchmarks.
+
+    :param name: name of benchmark
+    :param function: function without arguments
+    :param min_time: minimum time of one run in seconds
+    :param repeat: number of runs
+    """
+    cache_enabled = result_cache.CACHE_ENABLED
+    result_cache.CACHE_ENABLED = name.endswith('.cached')
+    try:
+        return measure(function, min_time, repeat)
+    finally:
+        result_cache.CACHE_ENABLED = cache_enabled
+
+
+def compare(results, baseline, threshold):
+    """Add baseline time and relative change of score to results, returns names of regressions.
+
+    :param results: dict {name: timings}
+    :param baseline: results of baseline
+    :param threshold: allowed relative slowdown, e.g. 0.25 for 25 %
+    """
+    regressions = []
+    for name, timings in results.items():
+        if name not in baseline:
+            continue
+        timings['baseline_us'] = baseline[name]['best_us']
+        timings['change'] = timings['score'] / baseline[name]['score'] - 1
+        if timings['change'] > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', default='', help='run only benchmarks with this text in name')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='path of baseline json')
+    parser.add_argument('--save-baseline', action='store_true', help='save results as baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, default 0.25 (25 %%)')
+    parser.add_argument('--json', help='save results as json in this path, - prints json instead of table')
+    parser.add_argument('--min-time', type=float, default=0.02, help='minimum time of one run [s]')
+    parser.add_argument('--repeat', type=int, default=15, help='number of runs')
+    args = parser.parse_args()
+
+    benchmarks = {**calculation_benchmarks(), **endpoint_benchmarks(app.test_client())}
+    results = {
+        name: run_benchmark(name, function, args.min_time, args.repeat)
+        for name, function in benchmarks.items()
+        if args.filter in name
+    }
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        regressions = []
+    else:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        report.update({'threshold': args.threshold, 'regressions': regressions})
+    if args.json and args.json != '-':
+        with open(args.json, 'w') as json_file:
+            json.dump(report, json_file, indent=2, sort_keys=True)
+    if args.json == '-':
+        print(json.dumps(report, indent=2, sort_keys=True))
+    else:
+        print(f'{"benchmark":45} {"best [us]":>12} {"median [us]":>12} {"baseline [us]":>14} {"change":>8}')
+        for name, timings in results.items():
+            baseline_time = f'{timings["baseline_us"]:14.2f}' if 'baseline_us' in timings else f'{"-":>14}'
+            change = f'{timings["change"]:+8.1%}' if 'change' in timings else f'{"-":>8}'
+            flag = '  REGRESSION' if name in regressions else ''
+            print(f'{name:45} {timings["best_us"]:12.2f} {timings["median_us"]:12.2f} {baseline_time} {change}{flag}')
+        if regressions:
+            print(f'{len(regressions)} regressions slower than baseline by more than {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
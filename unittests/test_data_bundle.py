@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import os
+import shutil
+
+import pytest
+
+from calculations import unit_convertion
+from calculations.data_bundle import CSV_DIR, build_bundle, bundle_tables, open_bundle
+from calculations.fluid_parameters import load_fluid
+from calculations.hydraulic_surfaces import PipeCatalogue
+from calculations.unit_convertion import load_units
+
+
+@pytest.fixture()
+def csv_dir(tmp_path):
+    csv_dir = str(tmp_path / 'csv_data')
+    shutil.copytree(CSV_DIR, csv_dir, ignore=shutil.ignore_patterns('*.bin'))
+    yield csv_dir
+
+
+def test_open_bundle(csv_dir):
+    path = os.path.join(csv_dir, 'data_bundle.bin')
+    build_bundle(path, csv_dir)
+    tables = open_bundle(path, csv_dir)
+    assert set(tables) == {
+        'fluids/water',
+        'pipes/steel',
+        'unit_convertion/lenght',
+        'unit_convertion/power',
+        'unit_convertion/pressure',
+        'unit_convertion/time',
+        'unit_convertion/volume',
+    }
+    water = tables['fluids/water']
+    assert list(water) == ['temperature', 'density', 'specific_heat', 'kinematic_viscosity']
+    assert {column: list(values) for column, values in water.items()} == {
+        column: list(values) for column, values in load_fluid('water').items()
+    }
+    with pytest.raises(TypeError):
+        water['density'][0] = 0
+    steel = tables['pipes/steel']
+    assert tuple(zip(map(int, steel['DN']), steel['internal'])) == PipeCatalogue('steel').pipes
+    assert steel['NPS'][0] == "1/4''"
+    time = tables['unit_convertion/time']
+    assert dict(zip(time['unit'], time['converter'])) == load_units('time')
+    assert time['unit_name'] == ['second', 'minute', 'hour']
+
+
+def test_open_bundle_outdated(csv_dir):
+    path = os.path.join(csv_dir, 'data_bundle.bin')
+    assert open_bundle(path, csv_dir) is None
+    build_bundle(path, csv_dir)
+    with open(os.path.join(csv_dir, 'unit_convertion', 'time.csv'), 'a') as csv_file:
+        csv_file.write('day,d,86400\n')
+    assert open_bundle(path, csv_dir) is None
+    build_bundle(path, csv_dir)
+    assert open_bundle(path, csv_dir)['unit_convertion/time']['unit'] == ['s', 'm', 'h', 'd']
+    os.remove(os.path.join(csv_dir, 'unit_convertion', 'time.csv'))
+    assert open_bundle(path, csv_dir) is None
+
+
+def test_open_bundle_wrong_file(csv_dir):
+    path = os.path.join(csv_dir, 'data_bundle.bin')
+    with open(path, 'wb') as bundle_file:
+        bundle_file.write(b'not a bundle')
+    assert open_bundle(path, csv_dir) is None
+
+
+@pytest.mark.parametrize('cut', ('{"tabl', 'header', 'data'))
+def test_open_bundle_truncated(tmp_path, monkeypatch, cut):
+    path = str(tmp_path / 'data_bundle.bin')
+    build_bundle(path)
+    with open(path, 'rb') as bundle_file:
+        content = bundle_file.read()
+    size = {
+        '{"tabl': content.index(b'"tables"') + 6,
+        'header': content.index(b'}}}') + 3,
+        'data': len(content) - 12,
+    }[cut]
+    with open(path, 'wb') as bundle_file:
+        bundle_file.write(content[:size])
+    assert open_bundle(path) is None
+    # csv files are loaded instead of corrupted bundle
+    monkeypatch.setattr(unit_convertion, 'bundle_tables', lambda directory: bundle_tables(directory, path))
+    monkeypatch.setattr(unit_convertion, 'UNIT_REGISTRY', {})
+    unit_convertion.reload_units()
+    assert unit_convertion.UNIT_REGISTRY['time'] == load_units('time')
+
+
+def test_bundle_tables(tmp_path):
+    path = str(tmp_path / 'data_bundle.bin')
+    assert bundle_tables('fluids', path) is None
+    build_bundle(path)
+    assert set(bundle_tables('unit_convertion', path)) == {'lenght', 'power', 'pressure', 'time', 'volume'}
+    assert list(bundle_tables('pipes', path)) == ['steel']
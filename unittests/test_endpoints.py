@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
+import io
+import json
+
+import numpy as np
 import pytest
 
+import endpoints
+from caching import result_cache
 from main import app
+from response_tools.columnar import TABLE_FORMATS
 
 
 @pytest.fixture()
 def app_fixture():
     app.config['TESTING'] = True
+    result_cache.RESULT_CACHE.clear()
     client = app.test_client()
     yield client
 
@@ -31,7 +39,13 @@ def test_health_endpoint(app_fixture):
                 'flow_unit': 'm3/h',
                 'length': 10,
             },
-            {'velocity': 0.478, 'velocity_unit': 'm/s', 'headloss': 3136.5, 'headloss_unit': 'Pa'},
+            {
+                'velocity': 0.478,
+                'velocity_unit': 'm/s',
+                'headloss': 3136.5,
+                'headloss_unit': 'Pa',
+                'friction_model': 'colebrook',
+            },
         ),
         (
             {
@@ -44,7 +58,13 @@ def test_health_endpoint(app_fixture):
                 'length': 10,
                 'headloss_unit': 'kPa',
             },
-            {'velocity': 0.478, 'velocity_unit': 'm/s', 'headloss': 3.1365, 'headloss_unit': 'kPa'},
+            {
+                'velocity': 0.478,
+                'velocity_unit': 'm/s',
+                'headloss': 3.1365,
+                'headloss_unit': 'kPa',
+                'friction_model': 'colebrook',
+            },
         ),
         (
             {
@@ -58,7 +78,13 @@ def test_health_endpoint(app_fixture):
                 'local_loss_coefficient': 15,
                 'headloss_unit': 'kPa',
             },
-            {'velocity': 0.478, 'velocity_unit': 'm/s', 'headloss': 4.8428, 'headloss_unit': 'kPa'},
+            {
+                'velocity': 0.478,
+                'velocity_unit': 'm/s',
+                'headloss': 4.8428,
+                'headloss_unit': 'kPa',
+                'friction_model': 'colebrook',
+            },
         ),
         (
             {
@@ -73,7 +99,13 @@ def test_health_endpoint(app_fixture):
                 'local_loss_coefficient': 15,
                 'headloss_unit': 'kPa',
             },
-            {'velocity': 0.478, 'velocity_unit': 'm/s', 'headloss': 4.2991, 'headloss_unit': 'kPa'},
+            {
+                'velocity': 0.478,
+                'velocity_unit': 'm/s',
+                'headloss': 4.2991,
+                'headloss_unit': 'kPa',
+                'friction_model': 'colebrook',
+            },
         ),
         (
             {
@@ -87,7 +119,13 @@ def test_health_endpoint(app_fixture):
                 'length': 10,
                 'headloss_unit': 'kPa',
             },
-            {'headloss': 1.0536, 'headloss_unit': 'kPa', 'velocity': 0.453, 'velocity_unit': 'm/s'},
+            {
+                'headloss': 1.0536,
+                'headloss_unit': 'kPa',
+                'velocity': 0.453,
+                'velocity_unit': 'm/s',
+                'friction_model': 'colebrook',
+            },
         ),
         (
             {
@@ -101,7 +139,13 @@ def test_health_endpoint(app_fixture):
                 'length': 10,
                 'headloss_unit': 'kPa',
             },
-            {'headloss': 1.0536, 'headloss_unit': 'kPa', 'velocity': 0.453, 'velocity_unit': 'm/s'},
+            {
+                'headloss': 1.0536,
+                'headloss_unit': 'kPa',
+                'velocity': 0.453,
+                'velocity_unit': 'm/s',
+                'friction_model': 'colebrook',
+            },
         ),
         (
             {
@@ -113,7 +157,13 @@ def test_health_endpoint(app_fixture):
                 'flow_unit': 'm3/h',
                 'length': 10,
             },
-            {'velocity': 0, 'velocity_unit': 'm/s', 'headloss': 0, 'headloss_unit': 'Pa'},
+            {
+                'velocity': 0,
+                'velocity_unit': 'm/s',
+                'headloss': 0,
+                'headloss_unit': 'Pa',
+                'friction_model': 'colebrook',
+            },
         ),
     ),
 )
@@ -122,6 +172,76 @@ def test_headloss_endpoint(app_fixture, req_json, expected_resp):
     assert resp.get_json() == expected_resp
 
 
+@pytest.mark.parametrize(
+    'friction_model, flow, expected_headloss',
+    (('churchill', 1, 3136.5), ('haaland', 1, 3136.5), ('churchill', 0.05, 7.8413), ('colebrook', 0.05, 7.8413)),
+)
+def test_headloss_endpoint_friction_model(app_fixture, friction_model, flow, expected_headloss):
+    req_json = {
+        'fluid': 'water',
+        'temperature': 30,
+        'nominal_diameter': 25,
+        'material': 'steel',
+        'flow': flow,
+        'flow_unit': 'm3/h',
+        'length': 10,
+        'friction_model': friction_model,
+    }
+    resp = app_fixture.post('/calculate/headloss', json=req_json)
+    assert resp.get_json()['headloss'] == expected_headloss
+    assert resp.get_json()['friction_model'] == friction_model
+
+
+@pytest.mark.parametrize(
+    'req_json, expected_resp',
+    (
+        (
+            {
+                'fluid': 'water',
+                'temperature': 30,
+                'nominal_diameter': 25,
+                'material': 'steel',
+                'flow': 1,
+                'flow_unit': 'm3/h',
+                'length': 10,
+                'full_precision': True,
+            },
+            {
+                'velocity': 0.478,
+                'velocity_unit': 'm/s',
+                'headloss': 3129.9,
+                'headloss_unit': 'Pa',
+                'friction_model': 'colebrook',
+            },
+        ),
+        (
+            {
+                'fluid': 'water',
+                'temperature_supply': 90,
+                'temperature_return': 70,
+                'nominal_diameter': 50,
+                'material': 'steel',
+                'power': 81.53402,
+                'power_unit': 'kW',
+                'length': 10,
+                'headloss_unit': 'kPa',
+                'full_precision': True,
+            },
+            {
+                'headloss': 1.0502,
+                'headloss_unit': 'kPa',
+                'velocity': 0.453,
+                'velocity_unit': 'm/s',
+                'friction_model': 'colebrook',
+            },
+        ),
+    ),
+)
+def test_headloss_endpoint_full_precision(app_fixture, req_json, expected_resp):
+    resp = app_fixture.post('/calculate/headloss', json=req_json)
+    assert resp.get_json() == expected_resp
+
+
 @pytest.mark.parametrize(
     'req_json',
     (
@@ -186,6 +306,7 @@ def test_headloss_endpoint_failed(app_fixture, req_json):
             },
             {
                 'headloss_unit': 'Pa/m',
+                'friction_model': 'colebrook',
                 'velocity_unit': 'm/s',
                 'results': [
                     {'nominal_diameter': 8, 'headloss': 16583000, 'velocity': 45.7},
@@ -216,6 +337,7 @@ def test_headloss_endpoint_failed(app_fixture, req_json):
             },
             {
                 'headloss_unit': 'Pa/m',
+                'friction_model': 'colebrook',
                 'results': [
                     {'headloss': 270970, 'nominal_diameter': 8, 'velocity': 6.68},
                     {'headloss': 38673, 'nominal_diameter': 10, 'velocity': 3.31},
@@ -241,6 +363,23 @@ def test_selecting_optimum_pipe_size(app_fixture, req_json, expected_resp):
     assert resp.get_json() == expected_resp
 
 
+def test_selecting_optimum_pipe_size_full_precision(app_fixture):
+    req_json = {
+        'fluid': 'water',
+        'temperature': 20,
+        'material': 'steel',
+        'roughness': 1.5,
+        'flow': 10,
+        'flow_unit': 'm3/h',
+        'full_precision': True,
+    }
+    resp = app_fixture.post('/calculate/pipes', json=req_json)
+    results = resp.get_json()['results']
+    assert results[0] == {'nominal_diameter': 8, 'headloss': 16526000, 'velocity': 45.7}
+    assert results[4] == {'nominal_diameter': 25, 'headloss': 31377, 'velocity': 4.78}
+    assert results[-1] == {'nominal_diameter': 150, 'headloss': 2.578, 'velocity': 0.146}
+
+
 @pytest.mark.parametrize(
     'req_json',
     (
@@ -304,7 +443,361 @@ def test_not_found(app_fixture):
     assert resp.status_code == 404
 
 
-@pytest.mark.parametrize('path', ('/calculate/headloss', '/calculate/pipes', '/calculate/gravity_flow'))
+@pytest.mark.parametrize(
+    'path',
+    (
+        '/calculate/headloss',
+        '/calculate/headloss/batch',
+        '/calculate/pipes',
+        '/calculate/sweep',
+        '/calculate/gravity_flow',
+    ),
+)
 def test_wrong_method(app_fixture, path):
     resp = app_fixture.get(path)
     assert resp.status_code == 405
+
+
+def test_headloss_batch_endpoint(app_fixture):
+    segment = {
+        'fluid': 'water',
+        'temperature': 30,
+        'nominal_diameter': 25,
+        'material': 'steel',
+        'flow': 1,
+        'flow_unit': 'm3/h',
+        'length': 10,
+    }
+    power_segment = {
+        'fluid': 'water',
+        'temperature_supply': 90,
+        'temperature_return': 70,
+        'nominal_diameter': 50,
+        'material': 'steel',
+        'power': 81.53402,
+        'power_unit': 'kW',
+        'length': 10,
+        'headloss_unit': 'kPa',
+    }
+    req_json = {
+        'segments': [
+            segment,
+            {**segment, 'length': -1},
+            {**segment, 'nominal_diameter': 24},
+            power_segment,
+            {**power_segment, 'temperature_return': 90},
+            {**segment, 'roughness': 20},
+            segment,
+        ]
+    }
+    resp = app_fixture.post('/calculate/headloss/batch', json=req_json)
+    assert resp.status_code == 200
+    expected_result = {
+        'velocity': 0.478,
+        'velocity_unit': 'm/s',
+        'headloss': 3136.5,
+        'headloss_unit': 'Pa',
+        'friction_model': 'colebrook',
+    }
+    assert resp.get_json() == {
+        'results': [
+            expected_result,
+            {'status': 400, 'message': '-1 is less than the minimum of 0'},
+            {'status': 400, 'message': 'Wrong pipe diameter value.'},
+            {
+                'headloss': 1.0536,
+                'headloss_unit': 'kPa',
+                'velocity': 0.453,
+                'velocity_unit': 'm/s',
+                'friction_model': 'colebrook',
+            },
+            {'status': 400, 'message': 'Temperature supply and return can not have the same value.'},
+            {'status': 400, 'message': 'Wrong roughness value.'},
+            expected_result,
+        ]
+    }
+
+
+def test_headloss_batch_endpoint_ndjson(app_fixture):
+    segment = {
+        'fluid': 'water',
+        'temperature': 30,
+        'nominal_diameter': 25,
+        'material': 'steel',
+        'flow': 1,
+        'flow_unit': 'm3/h',
+        'length': 10,
+    }
+    req_json = {'segments': [segment, {**segment, 'nominal_diameter': 24}]}
+    resp = app_fixture.post('/calculate/headloss/batch', json=req_json, headers={'Accept': 'application/x-ndjson'})
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/x-ndjson'
+    assert resp.get_data(as_text=True) == (
+        '{"friction_model":"colebrook","headloss":3136.5,"headloss_unit":"Pa",'
+        '"velocity":0.478,"velocity_unit":"m/s"}\n'
+        '{"message":"Wrong pipe diameter value.","status":400}\n'
+    )
+
+
+@pytest.mark.parametrize(
+    'req_json', (None, {}, {'segments': []}, {'segments': [1]}, {'segments': {}}, {'segments': [{}], 'fluid': 'water'})
+)
+def test_headloss_batch_endpoint_failed(app_fixture, req_json):
+    resp = app_fixture.post('/calculate/headloss/batch', json=req_json)
+    assert resp.status_code == 400
+
+
+def test_cached_result(app_fixture):
+    req_json = {
+        'fluid': 'water',
+        'temperature': 30,
+        'nominal_diameter': 25,
+        'material': 'steel',
+        'flow': 1,
+        'flow_unit': 'm3/h',
+        'length': 10,
+    }
+    resp = app_fixture.post('/calculate/headloss', json=req_json)
+    etag = resp.headers['ETag']
+    # the same request with different order of keys and numbers as floats
+    cached_resp = app_fixture.post('/calculate/headloss', json={**dict(reversed(req_json.items())), 'flow': 1.0})
+    assert cached_resp.get_data() == resp.get_data()
+    assert cached_resp.headers['ETag'] == etag
+    assert result_cache.RESULT_CACHE.stats() == {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 1024}
+    not_modified_resp = app_fixture.post('/calculate/headloss', json=req_json, headers={'If-None-Match': etag})
+    assert not_modified_resp.status_code == 304
+    assert not_modified_resp.get_data() == b''
+    other_resp = app_fixture.post('/calculate/headloss', json={**req_json, 'flow': 2}, headers={'If-None-Match': etag})
+    assert other_resp.status_code == 200
+    assert other_resp.headers['ETag'] != etag
+
+
+def test_cached_result_failed_request(app_fixture):
+    req_json = {
+        'fluid': 'water',
+        'temperature_supply': 90,
+        'temperature_return': 90,
+        'material': 'steel',
+        'power': 10,
+        'power_unit': 'kW',
+    }
+    for _ in range(2):
+        resp = app_fixture.post('/calculate/pipes', json=req_json)
+        assert resp.status_code == 400
+        assert 'ETag' not in resp.headers
+    assert result_cache.RESULT_CACHE.stats()['size'] == 0
+
+
+def test_cached_result_disabled_endpoint(app_fixture, monkeypatch):
+    monkeypatch.setattr(result_cache, 'DISABLED_ENDPOINTS', {'selecting_optimum_pipe_size'})
+    req_json = {'fluid': 'water', 'temperature': 30, 'material': 'steel', 'flow': 1, 'flow_unit': 'm3/h'}
+    for _ in range(2):
+        resp = app_fixture.post('/calculate/pipes', json=req_json)
+        assert resp.status_code == 200
+        assert 'ETag' not in resp.headers
+    assert result_cache.RESULT_CACHE.stats() == {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 1024}
+
+
+PIPES_REQUEST = {'fluid': 'water', 'temperature': 30, 'material': 'steel', 'flow': 10, 'flow_unit': 'm3/h'}
+
+
+def test_selecting_optimum_pipe_size_npy(app_fixture):
+    json_resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST)
+    resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST, headers={'Accept': 'application/x-npy'})
+    assert resp.mimetype == 'application/x-npy'
+    assert resp.headers['Vary'] == 'Accept'
+    table = np.load(io.BytesIO(resp.get_data()), allow_pickle=False)
+    assert table.dtype.names == ('nominal_diameter', 'headloss', 'velocity')
+    assert table['nominal_diameter'].dtype == np.int64
+    assert [dict(zip(table.dtype.names, row)) for row in table.tolist()] == json_resp.get_json()['results']
+    # json and npy results are cached separately
+    assert result_cache.RESULT_CACHE.stats()['size'] == 2
+    cached_resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST, headers={'Accept': 'application/x-npy'})
+    assert cached_resp.get_data() == resp.get_data()
+    assert cached_resp.mimetype == 'application/x-npy'
+
+
+@pytest.mark.parametrize('accept', ('application/x-npy', 'application/vnd.apache.arrow.stream'))
+@pytest.mark.parametrize('flow', (0, 10, 500000))
+def test_selecting_optimum_pipe_size_binary_dtypes(app_fixture, accept, flow):
+    if accept not in TABLE_FORMATS:
+        pytest.skip(f'{accept} is not available')
+    req = {**PIPES_REQUEST, 'flow': flow}
+    resp = app_fixture.post('/calculate/pipes', json=req, headers={'Accept': accept})
+    assert resp.status_code == 200
+    if accept == 'application/x-npy':
+        dtypes = np.load(io.BytesIO(resp.get_data()), allow_pickle=False).dtype
+        assert [str(dtypes[column]) for column in dtypes.names] == ['int64', 'float64', 'float64']
+    else:
+        import pyarrow.ipc
+
+        schema = pyarrow.ipc.open_stream(resp.get_data()).schema
+        assert [str(field.type) for field in schema] == ['int64', 'double', 'double']
+
+
+def test_selecting_optimum_pipe_size_msgpack(app_fixture):
+    msgpack = pytest.importorskip('msgpack')
+    json_resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST).get_json()
+    resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST, headers={'Accept': 'application/msgpack'})
+    assert resp.mimetype == 'application/msgpack'
+    content = msgpack.unpackb(resp.get_data())
+    assert content == {
+        'headloss_unit': 'Pa/m',
+        'velocity_unit': 'm/s',
+        'friction_model': 'colebrook',
+        'columns': {
+            column: [result[column] for result in json_resp['results']]
+            for column in ('nominal_diameter', 'headloss', 'velocity')
+        },
+    }
+
+
+def test_selecting_optimum_pipe_size_arrow(app_fixture):
+    pyarrow = pytest.importorskip('pyarrow')
+    json_resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST).get_json()
+    accept = 'application/vnd.apache.arrow.stream'
+    resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST, headers={'Accept': accept})
+    assert resp.mimetype == accept
+    table = pyarrow.ipc.open_stream(resp.get_data()).read_all()
+    assert table.schema.metadata == {
+        b'headloss_unit': b'Pa/m',
+        b'velocity_unit': b'm/s',
+        b'friction_model': b'colebrook',
+    }
+    assert table.to_pylist() == json_resp['results']
+
+
+@pytest.mark.parametrize('accept', ('*/*', 'text/html', 'application/json, application/x-npy;q=0.5'))
+def test_selecting_optimum_pipe_size_default_json(app_fixture, accept):
+    resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST, headers={'Accept': accept})
+    assert resp.mimetype == 'application/json'
+    assert len(resp.get_json()['results']) == 13
+
+
+@pytest.mark.parametrize('accept', ('application/json', 'application/x-npy'))
+def test_selecting_optimum_pipe_size_vary_without_cache(app_fixture, monkeypatch, accept):
+    monkeypatch.setattr(result_cache, 'CACHE_ENABLED', False)
+    resp = app_fixture.post('/calculate/pipes', json=PIPES_REQUEST, headers={'Accept': accept})
+    assert resp.mimetype == accept
+    assert resp.headers['Vary'] == 'Accept'
+
+
+SWEEP_REQUEST = {
+    'fluid': 'water',
+    'material': 'steel',
+    'flow': [1, 2.5],
+    'flow_unit': 'm3/h',
+    'temperature': {'start': 20, 'stop': 30, 'step': 10},
+    'nominal_diameter': [25, 50],
+    'length': 10,
+}
+
+
+@pytest.mark.parametrize('full_precision', (False, True))
+def test_sweep(app_fixture, full_precision):
+    resp = app_fixture.post('/calculate/sweep', json={**SWEEP_REQUEST, 'full_precision': full_precision})
+    assert resp.status_code == 200
+    content = resp.get_json()
+    assert {key: value for key, value in content.items() if key != 'results'} == {
+        'flow_unit': 'm3/h',
+        'velocity_unit': 'm/s',
+        'headloss_unit': 'Pa',
+        'friction_model': 'colebrook',
+    }
+    assert len(content['results']) == 8
+    # every result is the same as result of /calculate/headloss
+    for result in content['results']:
+        headloss_req = {
+            'fluid': 'water',
+            'material': 'steel',
+            'flow_unit': 'm3/h',
+            'length': 10,
+            'full_precision': full_precision,
+            **{key: result[key] for key in ('temperature', 'roughness', 'nominal_diameter', 'flow')},
+        }
+        expected = app_fixture.post('/calculate/headloss', json=headloss_req).get_json()
+        assert (result['velocity'], result['headloss']) == (expected['velocity'], expected['headloss'])
+    assert [(result['temperature'], result['nominal_diameter'], result['flow']) for result in content['results']] == [
+        (20, 25, 1),
+        (20, 25, 2.5),
+        (20, 50, 1),
+        (20, 50, 2.5),
+        (30, 25, 1),
+        (30, 25, 2.5),
+        (30, 50, 1),
+        (30, 50, 2.5),
+    ]
+
+
+def test_sweep_ranges(app_fixture):
+    req_json = {
+        'fluid': 'water',
+        'material': 'steel',
+        'flow': {'start': 0.1, 'stop': 0.5, 'step': 0.1},
+        'flow_unit': 'l/s',
+        'temperature': [10],
+        'roughness': {'start': 0.5, 'stop': 1.6, 'step': 0.5},
+        'headloss_unit': 'kPa',
+        'friction_model': 'haaland',
+    }
+    content = app_fixture.post('/calculate/sweep', json=req_json).get_json()
+    assert content['headloss_unit'] == 'kPa'
+    assert content['friction_model'] == 'haaland'
+    assert len(content['results']) == 5 * 3 * 13
+    assert sorted({result['flow'] for result in content['results']}) == [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert sorted({result['roughness'] for result in content['results']}) == [0.5, 1, 1.5]
+
+
+def test_sweep_ndjson(app_fixture):
+    req_json = {**SWEEP_REQUEST, 'temperature': [20]}
+    json_results = app_fixture.post('/calculate/sweep', json=req_json).get_json()['results']
+    resp = app_fixture.post('/calculate/sweep', json=req_json, headers={'Accept': 'application/x-ndjson'})
+    assert resp.mimetype == 'application/x-ndjson'
+    assert [json.loads(line) for line in resp.get_data(as_text=True).splitlines()] == json_results
+
+
+def test_sweep_npy(app_fixture):
+    json_results = app_fixture.post('/calculate/sweep', json=SWEEP_REQUEST).get_json()['results']
+    resp = app_fixture.post('/calculate/sweep', json=SWEEP_REQUEST, headers={'Accept': 'application/x-npy'})
+    assert resp.mimetype == 'application/x-npy'
+    table = np.load(io.BytesIO(resp.get_data()), allow_pickle=False)
+    assert table.dtype.names == ('temperature', 'roughness', 'nominal_diameter', 'flow', 'velocity', 'headloss')
+    assert [dict(zip(table.dtype.names, row)) for row in table.tolist()] == json_results
+
+
+@pytest.mark.parametrize(
+    'req_json, message',
+    (
+        ({'nominal_diameter': [25, 24]}, 'Wrong pipe diameter value.'),
+        ({'temperature': {'start': 20, 'stop': 22, 'step': 0.5}}, 'Wrong temperature value.'),
+        ({'roughness': [1.5, 20]}, 'Wrong roughness value.'),
+        ({'roughness': {'start': -1, 'stop': 1, 'step': 1}}, 'Wrong roughness value.'),
+        ({'flow': {'start': 2, 'stop': 1, 'step': 1}}, 'Empty range of flow.'),
+        ({'flow': {'start': 0, 'stop': 10, 'step': 1}}, 'Too many values of flow: 11, limit is 10.'),
+        ({'flow': {'start': 0, 'stop': 1, 'step': 1e-320}}, 'Too many values of flow, limit is 10.'),
+        ({'flow': {'start': -1e308, 'stop': 1e308, 'step': 1}}, 'Too many values of flow, limit is 10.'),
+        ({'flow': {'start': 1, 'stop': 3, 'step': 1}}, 'Too many results: 12, limit is 10.'),
+    ),
+)
+def test_sweep_wrong_parameters(app_fixture, monkeypatch, req_json, message):
+    monkeypatch.setattr(endpoints, 'MAX_SWEEP_SIZE', 10)
+    resp = app_fixture.post('/calculate/sweep', json={**SWEEP_REQUEST, **req_json})
+    assert resp.status_code == 400
+    assert resp.get_json() == {'status': 400, 'message': message}
+
+
+@pytest.mark.parametrize(
+    'req_json',
+    (
+        {'flow': []},
+        {'flow': 1},
+        {'flow': {'start': 1, 'stop': 2}},
+        {'flow': {'start': 1, 'stop': 2, 'step': 0}},
+        {'temperature': [400]},
+        {'nominal_diameter': 25},
+        {'power': 10},
+    ),
+)
+def test_sweep_failed(app_fixture, req_json):
+    resp = app_fixture.post('/calculate/sweep', json={**SWEEP_REQUEST, **req_json})
+    assert resp.status_code == 400
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import pytest
 
-from calculations.fluid_parameters import fluid_params
+from calculations.fluid_parameters import FLUID_TABLES, fluid_params, reload_fluids
 
 
 @pytest.mark.parametrize(
@@ -33,3 +33,16 @@ from calculations.fluid_parameters import fluid_params
 )
 def test_fluid_params(fluid, temperature, expected_params):
     assert fluid_params(fluid, temperature) == expected_params
+
+
+@pytest.mark.parametrize('fluid, temperature', (('water', 371), ('water', 1000)))
+def test_fluid_params_out_of_table(fluid, temperature):
+    assert fluid_params(fluid, temperature) is None
+
+
+def test_reload_fluids():
+    FLUID_TABLES['water'] = {}
+    reload_fluids()
+    assert set(FLUID_TABLES) == {'water'}
+    assert list(FLUID_TABLES['water']) == ['temperature', 'density', 'specific_heat', 'kinematic_viscosity']
+    assert FLUID_TABLES['water']['density'][0] == 999.9
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import argparse
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import golden_corpus  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return golden_corpus.load_corpus()
+
+
+def corpus_of(corpus, endpoint, step=1):
+    indexes = [index for index, case in enumerate(corpus['cases']) if case['endpoint'] == endpoint][::step]
+    positions = {index: position for position, index in enumerate(indexes)}
+    return {
+        'cases': [corpus['cases'][index] for index in indexes],
+        'accepted': [
+            {**item, 'case': positions[item['case']]} for item in corpus['accepted'] if item['case'] in positions
+        ],
+    }
+
+
+def test_corpus_cases(corpus):
+    endpoints = [case['endpoint'] for case in corpus['cases']]
+    for endpoint, count in golden_corpus.CASES.items():
+        assert endpoints.count(endpoint) == count
+    assert sum(case['status'] == 200 for case in corpus['cases']) > 0.99 * len(corpus['cases'])
+
+
+def test_generate_corpus_is_repeatable(corpus):
+    cases = {endpoint: 5 for endpoint in golden_corpus.CASES}
+    generated = golden_corpus.generate_corpus(corpus['seed'], cases)
+    assert generated == golden_corpus.generate_corpus(corpus['seed'], cases)
+    assert [case['endpoint'] for case in generated['cases']] == [endpoint for endpoint in cases for _ in range(5)]
+
+
+@pytest.mark.parametrize('endpoint', list(golden_corpus.CASES))
+def test_api_engine_matches_corpus(corpus, endpoint):
+    endpoint_corpus = corpus_of(corpus, endpoint)
+    report = golden_corpus.compare(endpoint_corpus, golden_corpus.api_engine, default_tolerance=(1e-12, 0))
+    assert report['failed_cases'] == 0
+    assert report['mismatches'] == []
+    assert len(report['accepted']) == len(endpoint_corpus['accepted'])
+    assert all(field == 'headloss' or stats['accepted'] == 0 for field, stats in report['fields'].items())
+
+
+def test_scalar_engine_matches_corpus(corpus):
+    report = golden_corpus.compare(corpus_of(corpus, '/calculate/pipes', 4), golden_corpus.scalar_engine)
+    assert report['failed_cases'] == 0
+    assert report['fields']['headloss']['compared'] == 250 * 13
+
+
+@pytest.mark.parametrize('endpoint', list(golden_corpus.CASES))
+def test_reference_engine_matches_corpus(corpus, endpoint):
+    report = golden_corpus.compare(
+        {'cases': corpus_of(corpus, endpoint, 10)['cases']}, golden_corpus.reference_engine, default_tolerance=(0, 0)
+    )
+    assert report['failed_cases'] == 0
+    assert report['deviations'] == []
+
+
+def test_compare_reports_worst_deviation():
+    corpus = {
+        'cases': [
+            {'endpoint': '/a', 'request': {'x': 1}, 'status': 200, 'response': {'v': 1.0, 'results': [{'h': 10}]}},
+            {'endpoint': '/a', 'request': {'x': 2}, 'status': 200, 'response': {'v': 2.0, 'results': [{'h': 20}]}},
+            {'endpoint': '/b', 'request': {'x': 3}, 'status': 200, 'response': {'v': 0, 'unit': 'm'}},
+        ]
+    }
+    responses = {
+        1: {'v': 1.0, 'results': [{'h': 10.5}]},
+        2: {'v': 2.001, 'results': [{'h': 20.2}]},
+        3: {'v': 0, 'unit': 'm'},
+    }
+    report = golden_corpus.compare(corpus, lambda endpoint, req: (200, responses[req['x']]), {'h': (0.02, 0)})
+    assert report['cases'] == 3
+    assert report['failed_cases'] == 2
+    assert report['mismatches'] == []
+    worst_h = report['fields']['h']
+    assert (worst_h['compared'], worst_h['failures']) == (2, 1)
+    assert worst_h['worst']['case'] == 0
+    assert worst_h['worst']['path'] == 'results[0].h'
+    assert worst_h['worst']['request'] == {'x': 1}
+    assert worst_h['worst']['relative_deviation'] == pytest.approx(0.05)
+    worst_v = report['fields']['v']
+    assert (worst_v['compared'], worst_v['failures']) == (3, 1)
+    assert (worst_v['worst']['case'], worst_v['worst']['endpoint']) == (1, '/a')
+    assert worst_v['worst']['absolute_deviation'] == pytest.approx(0.001)
+
+
+def test_compare_accepted_deviations():
+    corpus = {
+        'cases': [
+            {'endpoint': '/a', 'request': {'x': 1}, 'status': 200, 'response': {'v': 1.0}},
+            {'endpoint': '/a', 'request': {'x': 2}, 'status': 200, 'response': {'v': 2.0}},
+            {'endpoint': '/a', 'request': {'x': 3}, 'status': 200, 'response': {'v': 3.0}},
+        ]
+    }
+    responses = {1: {'v': 1.5}, 2: {'v': 2.5}, 3: (400, {'v': 'error'})}
+
+    def engine(endpoint, req):
+        response = responses[req['x']]
+        return response if isinstance(response, tuple) else (200, response)
+
+    accepted_corpus = golden_corpus.accept_deviations(corpus, engine, 'new solver')
+    assert accepted_corpus['accepted'] == [
+        {'case': 0, 'path': 'v', 'actual': 1.5, 'expected': 1.0, 'reason': 'new solver'},
+        {'case': 1, 'path': 'v', 'actual': 2.5, 'expected': 2.0, 'reason': 'new solver'},
+    ]
+    assert accepted_corpus['cases'] == corpus['cases']
+    responses[2] = {'v': 2.6}
+    report = golden_corpus.compare(accepted_corpus, engine)
+    assert report['failed_cases'] == 2
+    assert report['accepted'] == [accepted_corpus['accepted'][0]]
+    assert [(deviation['case'], deviation['actual']) for deviation in report['deviations']] == [(0, 1.5), (1, 2.6)]
+    assert (report['fields']['v']['failures'], report['fields']['v']['accepted']) == (1, 1)
+    assert [mismatch['case'] for mismatch in report['mismatches']] == [2]
+
+
+def test_compare_mismatches():
+    corpus = {
+        'cases': [
+            {'endpoint': '/a', 'request': {}, 'status': 200, 'response': {'v': 1, 'unit': 'm', 'r': [1, 2]}},
+            {'endpoint': '/a', 'request': {}, 'status': 200, 'response': {'v': 1}},
+        ]
+    }
+    answers = iter([(200, {'v': 1, 'unit': 'mm', 'r': [1], 'extra': True}), (400, {'message': 'error'})])
+    report = golden_corpus.compare(corpus, lambda endpoint, req: next(answers))
+    assert report['failed_cases'] == 2
+    assert [(mismatch['case'], mismatch['path']) for mismatch in report['mismatches']] == [
+        (0, 'extra'),
+        (0, 'r'),
+        (0, 'unit'),
+        (1, 'status'),
+    ]
+    assert report['fields']['v']['failures'] == 0
+
+
+@pytest.mark.parametrize(
+    'actual, expected, deviation', [(1, 1, 0), (0, 0, 0), (1.1, 1, 0.1), (-3, -2, 0.5), (1e-9, 0, math.inf)]
+)
+def test_relative_deviation(actual, expected, deviation):
+    assert golden_corpus.relative_deviation(actual, expected) == pytest.approx(deviation)
+
+
+def test_parse_tolerance():
+    assert golden_corpus.parse_tolerance('headloss=1e-6') == ('headloss', 1e-6, golden_corpus.DEFAULT_ATOL)
+    assert golden_corpus.parse_tolerance('velocity=0:0.001') == ('velocity', 0, 0.001)
+    with pytest.raises(argparse.ArgumentTypeError, match='Wrong tolerance'):
+        golden_corpus.parse_tolerance('velocity=abc')
+
+
+def test_load_engine():
+    assert golden_corpus.load_engine('api') is golden_corpus.api_engine
+    assert golden_corpus.load_engine('golden_corpus:scalar_engine') is golden_corpus.scalar_engine
+    with pytest.raises(argparse.ArgumentTypeError, match='module:function'):
+        golden_corpus.load_engine('fast')
@@ -1,16 +1,25 @@
 #!/usr/bin/env python3
 import math
+import os
+import subprocess
+import sys
 
 import pytest
 
 
 from calculations.headloss_equations import (
+    FRICTION_MODELS,
+    churchill_equation,
     colebrook_equation,
+    colebrook_solver,
     darcy_friction_coefficient,
     darcy_weisbach_equation,
+    haaland_equation,
     hagen_poiseuille_equation,
     relative_roughness,
     reynolds_equation,
+    serghides_equation,
+    swamee_jain_equation,
 )
 
 
@@ -28,6 +37,25 @@ def test_colebrook_equation(reynold, rel_roughness, expected_dfc):
     assert colebrook_equation(reynold, rel_roughness) == expected_dfc
 
 
+def test_colebrook_iterations_counts():
+    counts = {}
+    _, iterations = colebrook_solver(100000, 0.001)
+    colebrook_equation(100000, 0.001, counts=counts)
+    assert counts == {'colebrook_iterations': iterations}
+    darcy_friction_coefficient(100000, 27.3, 0.0273, counts=counts)
+    assert counts == {'colebrook_iterations': 2 * iterations}
+    darcy_friction_coefficient(100000, 27.3, 0.0273, 'haaland', counts=counts)
+    darcy_friction_coefficient(1000, 27.3, 0.0273, counts=counts)
+    assert counts == {'colebrook_iterations': 2 * iterations}
+
+
+def test_calculations_without_flask():
+    api_dir = os.path.join(os.path.dirname(__file__), '..', 'api')
+    code = 'import sys, calculations.headloss_equations, calculations.vectorized; print("flask" in sys.modules)'
+    output = subprocess.run([sys.executable, '-c', code], cwd=api_dir, capture_output=True, check=True, text=True)
+    assert output.stdout.strip() == 'False'
+
+
 @pytest.mark.parametrize(
     'reynolds, internal_dimension, roughness, expected_dfc',
     ((2000, 100, 1.5, 0.032), (20000, 100, 1.5, 0.046), (0, 100, 1.5, 0)),
@@ -36,6 +64,36 @@ def test_darcy_friction_coefficient(reynolds, internal_dimension, roughness, exp
     assert darcy_friction_coefficient(reynolds, internal_dimension, roughness) == expected_dfc
 
 
+@pytest.mark.parametrize('friction_model', tuple(FRICTION_MODELS))
+@pytest.mark.parametrize(
+    'reynolds, internal_dimension, roughness, expected_dfc', ((2000, 100, 1.5, 0.032), (0, 100, 1.5, 0))
+)
+def test_darcy_friction_coefficient_models(reynolds, internal_dimension, roughness, friction_model, expected_dfc):
+    assert darcy_friction_coefficient(reynolds, internal_dimension, roughness, friction_model) == expected_dfc
+
+
+@pytest.mark.parametrize(
+    'equation, reynold, rel_roughness, expected_dfc',
+    (
+        (churchill_equation, 10000, 0.04, 0.068),
+        (churchill_equation, 1000000, 0.001, 0.02),
+        (haaland_equation, 10000, 0.04, 0.067),
+        (haaland_equation, 1000000, 0.001, 0.02),
+        (serghides_equation, 10000, 0.04, 0.067),
+        (serghides_equation, 1000000, 0.001, 0.02),
+        (swamee_jain_equation, 10000, 0.04, 0.068),
+        (swamee_jain_equation, 1000000, 0.001, 0.02),
+    ),
+)
+def test_explicit_friction_equations(equation, reynold, rel_roughness, expected_dfc):
+    assert equation(reynold, rel_roughness) == expected_dfc
+
+
+@pytest.mark.parametrize('reynold', (1, 64, 1000))
+def test_churchill_equation_laminar(reynold):
+    assert churchill_equation(reynold, 0.01) == hagen_poiseuille_equation(reynold)
+
+
 @pytest.mark.parametrize(
     'dfc, llc, length, diameter, density, velocity, expected_headloss',
     (
@@ -79,3 +137,45 @@ def test_relative_roughness(roughness, diameter, expected_output):
 )
 def test_reynolds_equation(velocity, diameter, viscosity, expected_reynolds):
     assert reynolds_equation(velocity, diameter, viscosity) == expected_reynolds
+
+
+@pytest.mark.parametrize(
+    'reynold, rel_roughness, expected_dfc',
+    (
+        (10000, 0.04, 0.06712),
+        (10000, 0, 0.03088),
+        (100000, 0.001, 0.02217),
+        (10000000, 0.00001, 0.00899),
+    ),
+)
+def test_colebrook_solver(reynold, rel_roughness, expected_dfc):
+    dfc, iterations = colebrook_solver(reynold, rel_roughness)
+    assert round(dfc, 5) == expected_dfc
+    assert 1 <= iterations <= 5
+    x = 1 / math.sqrt(dfc)
+    assert abs(x + 2 * math.log10(rel_roughness / 3.71 + 2.51 * x / reynold)) < 1e-9
+
+
+def test_colebrook_solver_max_iterations():
+    dfc, iterations = colebrook_solver(10000, 0.04, tolerance=0, max_iterations=2)
+    assert iterations == 2
+    assert round(dfc, 3) == 0.067
+    # without iterations swamee-jain approximation is returned
+    dfc, iterations = colebrook_solver(10000, 0.04, max_iterations=0)
+    assert iterations == 0
+    assert dfc == pytest.approx(swamee_jain_equation(10000, 0.04, rounded=False), rel=1e-12)
+
+
+@pytest.mark.parametrize(
+    'equation, args, expected_value',
+    (
+        (colebrook_equation, (10000, 0.04), 0.0671198),
+        (hagen_poiseuille_equation, (2099,), 0.0304907),
+        (relative_roughness, (1, 3), 0.3333333),
+        (reynolds_equation, (0.5, 0.02, 0.3643 * math.pow(10, -6)), 27449.9039253),
+        (darcy_weisbach_equation, (0.015, 13.5, 97, 0.05, 971.83, 1.5), 46574.95275),
+    ),
+)
+def test_equations_full_precision(equation, args, expected_value):
+    assert equation(*args, rounded=False) == pytest.approx(expected_value, abs=1e-7)
+    assert equation(*args, rounded=False) != equation(*args)
@@ -4,11 +4,13 @@ import math
 import pytest
 
 from calculations.hydraulic_surfaces import (
+    PIPE_CATALOGUES,
     angle_in_partial_filled_pipe,
     circular_pipe,
     circular_water_cross_sectional_area,
     circular_wetted_perimeter,
     get_internal_diameter,
+    get_internal_diameters,
     hydraulic_radius,
     rectangular_dict,
     rectangular_wetted_perimeter,
@@ -43,7 +45,8 @@ def test_circular_pipe(diameter, unit, expected_area):
 
 
 @pytest.mark.parametrize(
-    'nominal, material, expected_diameter', ((25, 'steel', 27.2), (150, 'steel', 155.4), (155, 'steel', None))
+    'nominal, material, expected_diameter',
+    ((25, 'steel', 27.2), (25.0, 'steel', 27.2), (150, 'steel', 155.4), (155, 'steel', None)),
 )
 def test_get_internal_diameter(nominal, material, expected_diameter):
     assert get_internal_diameter(nominal, material) == expected_diameter
@@ -64,3 +67,23 @@ def test_rectangular_dict(width, height, unit, expected_area):
 @pytest.mark.parametrize('width, height, expected_perimeter', ((1, 1, 3), (2, 1, 4), (0.5, 1, 2.5)))
 def test_rectangular_wetted_perimeter(width, height, expected_perimeter):
     assert rectangular_wetted_perimeter(width, height) == expected_perimeter
+
+
+def test_get_internal_diameters():
+    pipes = get_internal_diameters('steel')
+    assert len(pipes) == 13
+    assert pipes[0] == (8, 8.8)
+    assert pipes[-1] == (150, 155.4)
+
+
+@pytest.mark.parametrize(
+    'internal, expected_pipe',
+    ((1, (8, 8.8)), (27.2, (25, 27.2)), (30, (25, 27.2)), (33, (32, 35.9)), (200, (150, 155.4))),
+)
+def test_pipe_catalogue_nearest(internal, expected_pipe):
+    assert PIPE_CATALOGUES['steel'].nearest(internal) == expected_pipe
+
+
+@pytest.mark.parametrize('internal, expected_pipe', ((1, (8, 8.8)), (27.2, (25, 27.2)), (30, (32, 35.9)), (200, None)))
+def test_pipe_catalogue_smallest_fitting(internal, expected_pipe):
+    assert PIPE_CATALOGUES['steel'].smallest_fitting(internal) == expected_pipe
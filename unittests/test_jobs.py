@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from jobs import job_queue
+from jobs.job_store import JobStore
+from main import app
+
+HEADLOSS_REQUEST = {
+    'fluid': 'water',
+    'temperature': 30,
+    'nominal_diameter': 25,
+    'material': 'steel',
+    'flow': 1,
+    'flow_unit': 'm3/h',
+    'length': 10,
+}
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+@pytest.fixture
+def app_fixture(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue.JOB_QUEUE, 'store', JobStore(str(tmp_path / 'jobs.sqlite3')))
+    with app.test_client() as c:
+        yield c
+
+
+def wait_for_job(client, location):
+    for _ in range(200):
+        job = client.get(location).get_json()
+        if job['status'] in ('finished', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError('job is not finished')
+
+
+def test_job_store(tmp_path):
+    clock = Clock()
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'), ttl=10, clock=clock)
+    store.create('a', '/calculate/pipes')
+    clock.time = 1
+    assert store.get('a') == {
+        'id': 'a',
+        'endpoint': '/calculate/pipes',
+        'status': 'queued',
+        'progress': 0,
+        'created': 0,
+    }
+    store.start('a', timeout=100)
+    store.set_progress('a', 5)
+    # running job expires after timeout and ttl
+    clock.time = 50
+    assert store.get('a')['status'] == 'running'
+    assert store.get('a')['progress'] == 5
+    store.finish('a', 200, b'{"results":[]}', 7)
+    assert store.get('a') == {
+        'id': 'a',
+        'endpoint': '/calculate/pipes',
+        'status': 'finished',
+        'progress': 7,
+        'created': 0,
+        'status_code': 200,
+        'body': b'{"results":[]}',
+    }
+    clock.time = 60
+    assert store.get('a') is None
+    store.create('b', '/calculate/sweep')
+    store.fail('b', 'calculation failed')
+    assert store.get('b')['status'] == 'failed'
+    assert store.get('b')['message'] == 'calculation failed'
+    # expired jobs are removed when new one is created
+    assert store.connection().execute('SELECT id FROM jobs').fetchall() == [('b',)]
+    store.clear()
+    assert store.get('b') is None
+
+
+@pytest.mark.parametrize(
+    'cpu_count, gunicorn_workers, expected_workers',
+    ((8, None, 8), (8, '4', 2), (8, '3', 2), (2, '4', 1), (None, '4', 1)),
+)
+def test_default_workers(monkeypatch, cpu_count, gunicorn_workers, expected_workers):
+    monkeypatch.setattr(job_queue.os, 'cpu_count', lambda: cpu_count)
+    if gunicorn_workers is None:
+        monkeypatch.delenv('GUNICORN_WORKERS', raising=False)
+    else:
+        monkeypatch.setenv('GUNICORN_WORKERS', gunicorn_workers)
+    assert job_queue.default_workers() == expected_workers
+    queue = job_queue.JobQueue(None)
+    assert queue.pool_size() == expected_workers
+    assert job_queue.JobQueue(None, workers=3).pool_size() == 3
+
+
+def test_job_pool_forkserver():
+    queue = job_queue.JobQueue(None, workers=1)
+    assert queue.pool()._mp_context.get_start_method() == 'forkserver'
+    queue.pool().shutdown()
+
+
+def test_run_job_not_in_request_metrics(tmp_path):
+    labels = {'route': '/calculate/headloss', 'method': 'POST', 'status': '200'}
+    count = REGISTRY.get_sample_value('fluid_api_request_duration_seconds_count', labels) or 0
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    store.create('a', '/calculate/headloss')
+    job_queue.run_job(store.path, store.ttl, 'a', '/calculate/headloss', HEADLOSS_REQUEST, 10)
+    assert store.get('a')['status_code'] == 200
+    assert (REGISTRY.get_sample_value('fluid_api_request_duration_seconds_count', labels) or 0) == count
+
+
+def test_jobs_endpoint(app_fixture):
+    expected_result = app_fixture.post('/calculate/headloss', json=HEADLOSS_REQUEST).get_json()
+    resp = app_fixture.post('/jobs', json={'endpoint': '/calculate/headloss', 'request': HEADLOSS_REQUEST})
+    assert resp.status_code == 202
+    job_id = resp.get_json()['id']
+    assert resp.get_json() == {'id': job_id, 'status': 'queued'}
+    assert resp.headers['Location'].endswith(f'/jobs/{job_id}')
+    job = wait_for_job(app_fixture, resp.headers['Location'])
+    assert job.pop('created') > 0
+    assert job == {
+        'id': job_id,
+        'endpoint': '/calculate/headloss',
+        'status': 'finished',
+        'progress': 0,
+        'status_code': 200,
+        'result': expected_result,
+    }
+
+
+def test_jobs_endpoint_streamed_result(app_fixture):
+    segments = [HEADLOSS_REQUEST, {**HEADLOSS_REQUEST, 'nominal_diameter': 24}, {**HEADLOSS_REQUEST, 'flow': 2}]
+    req_json = {'segments': segments}
+    expected_result = app_fixture.post('/calculate/headloss/batch', json=req_json).get_json()
+    resp = app_fixture.post('/jobs', json={'endpoint': '/calculate/headloss/batch', 'request': req_json})
+    job = wait_for_job(app_fixture, resp.headers['Location'])
+    assert job['status'] == 'finished'
+    assert job['progress'] == 3
+    assert job['result'] == expected_result
+
+
+def test_jobs_endpoint_wrong_request(app_fixture):
+    resp = app_fixture.post('/jobs', json={'endpoint': '/calculate/headloss', 'request': {'fluid': 'water'}})
+    job = wait_for_job(app_fixture, resp.headers['Location'])
+    assert job['status'] == 'finished'
+    assert job['status_code'] == 400
+    assert job['result'] == {'status': 400, 'message': "'nominal_diameter' is a required property"}
+
+
+def test_jobs_endpoint_timeout(app_fixture, monkeypatch):
+    monkeypatch.setattr(job_queue.JOB_QUEUE, 'timeout', 0.000001)
+    resp = app_fixture.post('/jobs', json={'endpoint': '/calculate/headloss', 'request': HEADLOSS_REQUEST})
+    job = wait_for_job(app_fixture, resp.headers['Location'])
+    assert job['status'] == 'failed'
+    assert job['message'] == 'Calculation exceeded time limit of 1e-06 s.'
+    assert 'result' not in job
+
+
+def test_jobs_endpoint_full_queue(app_fixture, monkeypatch):
+    monkeypatch.setattr(job_queue.JOB_QUEUE, 'max_queue', 0)
+    resp = app_fixture.post('/jobs', json={'endpoint': '/calculate/headloss', 'request': HEADLOSS_REQUEST})
+    assert resp.status_code == 503
+    assert resp.headers['Retry-After'] == '1'
+    assert resp.get_json() == {'status': 503, 'message': 'Too many queued jobs, limit is 0.'}
+
+
+@pytest.mark.parametrize(
+    'req_json',
+    (
+        None,
+        {},
+        {'endpoint': '/calculate/headloss'},
+        {'endpoint': '/health', 'request': {}},
+        {'endpoint': '/calculate/headloss', 'request': []},
+        {'endpoint': '/calculate/headloss', 'request': {}, 'timeout': 10},
+    ),
+)
+def test_jobs_endpoint_failed(app_fixture, req_json):
+    resp = app_fixture.post('/jobs', json=req_json)
+    assert resp.status_code == 400
+
+
+def test_job_status_not_found(app_fixture):
+    resp = app_fixture.get('/jobs/missing')
+    assert resp.status_code == 404
+    assert resp.get_json() == {'status': 404, 'message': 'Job not found or expired.'}
@@ -2,6 +2,7 @@
 import jsonschema
 import pytest
 
+from validations.decorators import ParameterError, compiled_validator, validate
 from validations.json_validation_schemas import headloss_all_pipes, headloss_selected_pipe, manning_schema
 
 
@@ -47,6 +48,15 @@ def test_headloss_all_pipes(json_from_user):
         {'fluid': 'water', 'temperature': 20, 'material': 'steel', 'flow': 10, 'flow_unit': 'm3/hz'},
         # wrong roughness value
         {'fluid': 'water', 'temperature': 20, 'material': 'steel', 'flow': 10, 'flow_unit': 'm3/h', 'roughness': 10},
+        # wrong friction_model value
+        {
+            'fluid': 'water',
+            'temperature': 20,
+            'material': 'steel',
+            'flow': 10,
+            'flow_unit': 'm3/h',
+            'friction_model': 'x',
+        },
         # missing fluid parameter
         {'temperature': 20, 'material': 'steel', 'flow': 10, 'flow_unit': 'm3/h'},
         # missing temperature parameter
@@ -406,6 +416,17 @@ def test_headloss_json_from_user(json_from_user):
             'length': 10,
             'headloss_unit': 'atm1',
         },
+        # wrong friction_model value
+        {
+            'fluid': 'water',
+            'temperature': 30,
+            'nominal_diameter': 25,
+            'material': 'steel',
+            'flow': 10,
+            'flow_unit': 'm3/h',
+            'length': 10,
+            'friction_model': 'moody',
+        },
         # missing fluid parameter
         {
             'temperature': 30,
@@ -654,3 +675,29 @@ def test_manning_schema(json_from_user):
 def test_manning_schema_failed(json_from_user):
     with pytest.raises(jsonschema.exceptions.ValidationError):
         jsonschema.validate(json_from_user, manning_schema)
+
+
+@pytest.mark.parametrize(
+    'json_from_user, schema',
+    (
+        ({'fluid': 'water123', 'temperature': 20, 'material': 'steel', 'flow': 10}, headloss_all_pipes),
+        (
+            {'fluid': 'water', 'temperature': 20.5, 'material': 'steel', 'flow': 1, 'flow_unit': 'l/s'},
+            headloss_all_pipes,
+        ),
+        ({'fluid': 'water', 'nominal_diameter': 25, 'material': 'steel', 'length': -1}, headloss_selected_pipe),
+        ({'width': 1, 'diameter': 0.1, 'height': 1, 'slope': 0.01, 'manning_coefficient': 0.013}, manning_schema),
+        (None, manning_schema),
+    ),
+)
+def test_compiled_validator_messages(json_from_user, schema):
+    with pytest.raises(jsonschema.exceptions.ValidationError) as expected_exc:
+        jsonschema.validate(json_from_user, schema)
+    with pytest.raises(ParameterError) as exc:
+        validate(json_from_user, schema)
+    assert str(exc.value) == expected_exc.value.message
+
+
+def test_compiled_validator_created_once():
+    assert compiled_validator(headloss_all_pipes) is compiled_validator(headloss_all_pipes)
+    assert compiled_validator(headloss_all_pipes) is not compiled_validator(headloss_selected_pipe)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import pytest
+from prometheus_client import REGISTRY
+
+from caching import result_cache
+from main import app
+from monitoring.stages import record_stage, request_stages, stage_timer
+
+HEADLOSS_REQUEST = {
+    'fluid': 'water',
+    'temperature': 30,
+    'nominal_diameter': 25,
+    'material': 'steel',
+    'flow': 1,
+    'flow_unit': 'm3/h',
+    'length': 10,
+}
+
+
+@pytest.fixture
+def app_fixture():
+    result_cache.RESULT_CACHE.clear()
+    with app.test_client() as c:
+        yield c
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_stage_timer():
+    with app.test_request_context():
+        with stage_timer('friction_factor'):
+            pass
+        record_stage('friction_factor', 0.5)
+        record_stage('serialization', 0.25)
+        timings = request_stages()
+        assert set(timings) == {'friction_factor', 'serialization'}
+        assert 0.5 <= timings['friction_factor'] < 0.6
+        assert timings['serialization'] == 0.25
+    # outside of request nothing is recorded
+    with stage_timer('friction_factor'):
+        pass
+
+
+def test_request_metrics(app_fixture):
+    labels = {'route': '/calculate/headloss', 'method': 'POST', 'status': '200'}
+    count = sample('fluid_api_request_duration_seconds_count', **labels)
+    errors = sample('fluid_api_request_duration_seconds_count', **{**labels, 'status': '400'})
+    hits = sample('fluid_api_cache_requests_total', route='/calculate/headloss', result='hit')
+    misses = sample('fluid_api_cache_requests_total', route='/calculate/headloss', result='miss')
+    stages = {
+        stage: sample('fluid_api_stage_duration_seconds_count', route='/calculate/headloss', stage=stage)
+        for stage in ('json_parse', 'json_validate', 'fluid_parameters', 'friction_factor', 'serialization')
+    }
+    for _ in range(3):
+        app_fixture.post('/calculate/headloss', json=HEADLOSS_REQUEST)
+    app_fixture.post('/calculate/headloss', json={**HEADLOSS_REQUEST, 'nominal_diameter': 24})
+    assert sample('fluid_api_request_duration_seconds_count', **labels) == count + 3
+    assert sample('fluid_api_request_duration_seconds_count', **{**labels, 'status': '400'}) == errors + 1
+    assert sample('fluid_api_cache_requests_total', route='/calculate/headloss', result='hit') == hits + 2
+    assert sample('fluid_api_cache_requests_total', route='/calculate/headloss', result='miss') == misses + 2
+    # stages of calculation are observed only for not cached results
+    assert stages['json_parse'] + 4 == sample(
+        'fluid_api_stage_duration_seconds_count', route='/calculate/headloss', stage='json_parse'
+    )
+    assert stages['friction_factor'] + 1 == sample(
+        'fluid_api_stage_duration_seconds_count', route='/calculate/headloss', stage='friction_factor'
+    )
+
+
+def test_streamed_request_metrics():
+    labels = {'route': '/calculate/headloss/batch', 'stage': 'serialization'}
+    count = sample('fluid_api_stage_duration_seconds_count', **labels)
+    resp = app.test_client().post('/calculate/headloss/batch', json={'segments': [HEADLOSS_REQUEST] * 3})
+    assert resp.status_code == 200
+    assert sample('fluid_api_stage_duration_seconds_count', **labels) == count
+    resp.get_data()
+    resp.close()
+    # serialization of streamed results is observed after the last chunk
+    assert sample('fluid_api_stage_duration_seconds_count', **labels) == count + 1
+
+
+def test_metrics_endpoint(app_fixture):
+    app_fixture.get('/health')
+    app_fixture.get('/not_existing_path')
+    resp = app_fixture.get('/metrics')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/plain'
+    body = resp.get_data(as_text=True)
+    assert 'fluid_api_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert 'fluid_api_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in body
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+from caching import result_cache
+from main import app
+from preload import warm_up, warm_up_requests
+
+
+def test_warm_up_requests():
+    paths = {path for path, _ in warm_up_requests()}
+    assert paths == {'/calculate/gravity_flow', '/calculate/headloss', '/calculate/headloss/batch', '/calculate/pipes'}
+
+
+def test_warm_up():
+    result_cache.RESULT_CACHE.clear()
+    warm_up(app)
+    assert result_cache.CACHE_ENABLED
+    assert result_cache.RESULT_CACHE.stats()['size'] == 0
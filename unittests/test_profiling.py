@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import os
+import pstats
+
+import pytest
+from flask import Blueprint, Flask
+
+from monitoring import profiling
+from response_tools.response_tools import api_response, stream_response
+
+
+def create_app():
+    blueprint = Blueprint('profiled', __name__)
+
+    @blueprint.route('/square/<int:number>')
+    def square(number):
+        return api_response({'square': number * number})
+
+    @blueprint.route('/squares/<int:count>')
+    def squares(count):
+        return stream_response({'square': number * number} for number in range(count))
+
+    profiling.init_profiling(blueprint)
+    app = Flask(__name__)
+    app.register_blueprint(blueprint)
+    return app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(profiling, 'SECRET', 's3cret')
+    return create_app().test_client()
+
+
+def test_not_profiled_request(client):
+    assert client.get('/square/3').get_json() == {'square': 9}
+    resp = client.get('/square/3', headers={'X-Profile': 'wrong'})
+    assert resp.get_json() == {'square': 9}
+    assert 'X-Profile-File' not in resp.headers
+
+
+def test_profiled_request(client):
+    resp = client.get('/square/3', headers={'X-Profile': 's3cret'})
+    assert resp.mimetype == 'text/plain'
+    assert resp.headers['X-Profile-Response-Status'] == '200'
+    stats = resp.get_data(as_text=True)
+    assert 'Ordered by: cumulative time' in stats
+    assert '(square)' in stats
+
+
+def test_profiled_streamed_request(client, monkeypatch):
+    monkeypatch.setattr(profiling, 'TOP', 1000)
+    resp = client.get('/squares/5', headers={'X-Profile': 's3cret'})
+    # results are calculated by generator during streaming
+    assert '(<genexpr>)' in resp.get_data(as_text=True)
+
+
+def test_profiled_request_saved_in_directory(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'DIRECTORY', str(tmp_path))
+    resp = client.get('/square/3', headers={'X-Profile': 's3cret'})
+    assert resp.get_json() == {'square': 9}
+    filename = resp.headers['X-Profile-File']
+    assert filename.startswith('profiled.square-')
+    assert os.listdir(tmp_path) == [filename]
+    stats = pstats.Stats(str(tmp_path / filename))
+    assert any(function == 'square' for _, _, function in stats.stats)
+
+
+@pytest.mark.parametrize('enabled, secret', ((False, 's3cret'), (True, None), (True, '')))
+def test_profiling_disabled(monkeypatch, enabled, secret):
+    monkeypatch.setattr(profiling, 'PROFILING_ENABLED', enabled)
+    monkeypatch.setattr(profiling, 'SECRET', secret)
+    app = create_app()
+    assert not hasattr(app.view_functions['profiled.square'], '__wrapped__')
+    resp = app.test_client().get('/square/3', headers={'X-Profile': 's3cret'})
+    assert resp.get_json() == {'square': 9}
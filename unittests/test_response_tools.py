@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import io
+import json
+
+import numpy as np
+import pytest
+
+from main import app
+from response_tools.columnar import column_array, npy_table
+from response_tools.response_tools import SERIALIZERS, api_response, error_response, stream_response
+from validations.errors import ParameterError
+
+CONTENT = {'velocity_unit': 'm/s', 'results': [{'velocity': 0.478, 'headloss': 31377, 'nominal_diameter': 25}]}
+
+
+@pytest.mark.parametrize('name', tuple(SERIALIZERS))
+def test_serializers(name):
+    body = SERIALIZERS[name](CONTENT, True)
+    assert body == b'{"results":[{"headloss":31377,"nominal_diameter":25,"velocity":0.478}],"velocity_unit":"m/s"}'
+    pretty_body = SERIALIZERS[name](CONTENT, False)
+    assert b'\n  "results": [' in pretty_body
+    assert json.loads(pretty_body) == CONTENT
+
+
+def test_json_serializer_is_available():
+    assert 'json' in SERIALIZERS
+
+
+def test_api_response():
+    with app.test_request_context():
+        response = api_response(CONTENT)
+        assert response.mimetype == 'application/json'
+        assert response.get_data().endswith(b'}\n')
+        assert response.get_json() == CONTENT
+        response = error_response(400, 'Wrong pipe diameter value.')
+        assert response.status_code == 400
+        assert response.get_json() == {'status': 400, 'message': 'Wrong pipe diameter value.'}
+
+
+def results(count, error=None):
+    for number in range(count):
+        yield {'number': number, 'square': number * number}
+    if error:
+        raise error
+
+
+@pytest.mark.parametrize('count', (0, 1, 3))
+def test_stream_response(count):
+    with app.test_request_context():
+        expected_body = api_response({'results': list(results(count))}).get_data()
+        response = stream_response(results(count))
+        assert response.mimetype == 'application/json'
+        assert response.is_streamed
+        assert response.get_data() == expected_body
+
+
+def test_stream_response_metadata():
+    metadata = {'velocity_unit': 'm/s', 'headloss_unit': 'Pa'}
+    with app.test_request_context():
+        body = stream_response(results(2), metadata).get_data()
+        assert body.startswith(b'{"headloss_unit":"Pa","velocity_unit":"m/s","results":[')
+        assert json.loads(body) == {**metadata, 'results': list(results(2))}
+    with app.test_request_context(headers={'Accept': 'application/x-ndjson'}):
+        lines = stream_response(results(2), metadata).get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == list(results(2))
+
+
+def test_stream_response_ndjson():
+    with app.test_request_context(headers={'Accept': 'application/x-ndjson'}):
+        response = stream_response(results(3))
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.headers['Vary'] == 'Accept'
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == list(results(3))
+
+
+def test_stream_response_error(caplog):
+    expected_results = [{'number': 0, 'square': 0}, {'status': 500, 'message': 'Internal server error.'}]
+    with app.test_request_context():
+        body = stream_response(results(1, ValueError('calculation failed'))).get_data(as_text=True)
+        assert json.loads(body) == {'results': expected_results}
+    with app.test_request_context(headers={'Accept': 'application/x-ndjson'}):
+        body = stream_response(results(1, ValueError('calculation failed'))).get_data(as_text=True)
+        assert [json.loads(line) for line in body.splitlines()] == expected_results
+    assert 'calculation failed' in caplog.text
+    assert 'Traceback' in caplog.text
+
+
+def test_stream_response_parameter_error():
+    expected_results = [{'number': 0, 'square': 0}, {'status': 400, 'message': 'Wrong value.'}]
+    with app.test_request_context():
+        body = stream_response(results(1, ParameterError('Wrong value.'))).get_data(as_text=True)
+        assert json.loads(body) == {'results': expected_results}
+
+
+@pytest.mark.parametrize(
+    'column, values, expected_dtype',
+    (
+        ('nominal_diameter', [8, 10], 'int64'),
+        ('nominal_diameter', [], 'int64'),
+        ('headloss', [0, 1], 'float64'),
+        ('headloss', [8, 10.5], 'float64'),
+        ('velocity', [], 'float64'),
+    ),
+)
+def test_column_array(column, values, expected_dtype):
+    array = column_array(column, values)
+    assert array.dtype == expected_dtype
+    assert array.tolist() == values
+
+
+def test_npy_table_empty():
+    table = np.load(io.BytesIO(npy_table({}, {'nominal_diameter': [], 'headloss': []})))
+    assert table.dtype.names == ('nominal_diameter', 'headloss')
+    assert len(table) == 0
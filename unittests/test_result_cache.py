@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+import sqlite3
+
+import pytest
+
+from caching.result_cache import (
+    RESULTS_VERSION,
+    ResultCache,
+    canonical,
+    create_cache,
+    request_key,
+    results_version,
+)
+from caching.sqlite_cache import SQLiteCache
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+def test_result_cache():
+    cache = ResultCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    # b is the least recently used
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2, 'max_size': 2}
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 2}
+
+
+def test_result_cache_ttl():
+    clock = Clock()
+    cache = ResultCache(ttl=10, clock=clock)
+    cache.set('a', 1)
+    clock.time = 9
+    assert cache.get('a') == 1
+    clock.time = 10
+    assert cache.get('a') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 0, 'max_size': 1024}
+
+
+def test_sqlite_cache(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    clock = Clock()
+    cache = SQLiteCache(path, max_size=2, clock=clock)
+    # the other worker uses the same file
+    other_cache = SQLiteCache(path, max_size=2, clock=clock)
+    cache.set('a', (b'{}', 'application/json', 'etag-a'))
+    other_cache.set('b', (b'[]', 'application/json', 'etag-b'))
+    clock.time = 1000
+    assert other_cache.get('a') == (b'{}', 'application/json', 'etag-a')
+    cache.set('c', (b'1', 'application/json', 'etag-c'))
+    # b is the least recently used
+    assert cache.get('b') is None
+    assert cache.get('a') == (b'{}', 'application/json', 'etag-a')
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 2, 'max_size': 2}
+    assert other_cache.stats() == {'hits': 1, 'misses': 0, 'size': 2, 'max_size': 2}
+    other_cache.clear()
+    assert cache.get('a') is None
+
+
+def test_sqlite_cache_used(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    clock = Clock()
+    cache = SQLiteCache(path, ttl=100, clock=clock, timeout=0.01)
+    cache.set('a', (b'{}', 'application/json', 'etag'))
+
+    def used():
+        return cache.connection().execute("SELECT used FROM results WHERE key = 'a'").fetchone()[0]
+
+    # time of the last use isn't saved more often than every 10% of ttl
+    clock.time = 9
+    assert cache.get('a') == (b'{}', 'application/json', 'etag')
+    assert used() == 0
+    clock.time = 10
+    assert cache.get('a') == (b'{}', 'application/json', 'etag')
+    assert used() == 10
+    # hit isn't lost when database is locked by other writer
+    other_connection = sqlite3.connect(path, isolation_level=None)
+    other_connection.execute('BEGIN IMMEDIATE')
+    clock.time = 30
+    assert cache.get('a') == (b'{}', 'application/json', 'etag')
+    other_connection.execute('ROLLBACK')
+    assert used() == 10
+    assert cache.stats()['hits'] == 3
+
+
+def test_sqlite_cache_ttl(tmp_path):
+    clock = Clock()
+    cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'), ttl=10, clock=clock)
+    cache.set('a', (b'{}', 'application/json', 'etag'))
+    clock.time = 9
+    assert cache.get('a') == (b'{}', 'application/json', 'etag')
+    clock.time = 10
+    assert cache.get('a') is None
+    cache.set('b', (b'{}', 'application/json', 'etag'))
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 1024}
+
+
+def test_sqlite_cache_database_error(tmp_path):
+    cache = SQLiteCache(str(tmp_path))
+    cache.set('a', (b'{}', 'application/json', 'etag'))
+    assert cache.get('a') is None
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'size': None, 'max_size': 1024}
+
+
+def test_create_cache(tmp_path):
+    class CACHE:
+        BACKEND = 'sqlite'
+        PATH = str(tmp_path / 'cache.sqlite3')
+        MAX_SIZE = 10
+
+    cache = create_cache(CACHE)
+    assert isinstance(cache, SQLiteCache)
+    assert (cache.path, cache.max_size, cache.ttl) == (CACHE.PATH, 10, 3600)
+    assert isinstance(create_cache(None), ResultCache)
+    CACHE.BACKEND = 'redis'
+    with pytest.raises(ValueError):
+        create_cache(CACHE)
+
+
+@pytest.mark.parametrize(
+    'value, expected_value',
+    (
+        ({'b': 1, 'a': [2, 0.5]}, {'b': 1.0, 'a': [2.0, 0.5]}),
+        ({'full_precision': True, 'fluid': 'water'}, {'full_precision': True, 'fluid': 'water'}),
+    ),
+)
+def test_canonical(value, expected_value):
+    result = canonical(value)
+    assert result == expected_value
+    assert [type(item) for item in result.values()] == [type(item) for item in expected_value.values()]
+
+
+def test_request_key():
+    key = request_key('headloss', {'flow': 1, 'fluid': 'water'})
+    assert key == request_key('headloss', {'fluid': 'water', 'flow': 1.0})
+    assert key != request_key('selecting_optimum_pipe_size', {'flow': 1, 'fluid': 'water'})
+    assert key != request_key('headloss', {'flow': 1.5, 'fluid': 'water'})
+    assert key == request_key('headloss', {'flow': 1, 'fluid': 'water'}, version=RESULTS_VERSION)
+    assert key != request_key('headloss', {'flow': 1, 'fluid': 'water'}, version='previous')
+
+
+def test_results_version(tmp_path):
+    (tmp_path / 'calculations').mkdir()
+    (tmp_path / 'csv_data' / 'fluids').mkdir(parents=True)
+    (tmp_path / 'calculations' / 'equations.py').write_text('x = 1')
+    (tmp_path / 'csv_data' / 'fluids' / 'water.csv').write_text('temperature,density')
+    (tmp_path / 'endpoints.py').write_text('')
+    version = results_version(str(tmp_path))
+    assert version == results_version(str(tmp_path))
+    assert version != results_version(str(tmp_path), 'release-2')
+    # generated files don't change version
+    (tmp_path / 'csv_data' / 'data_bundle.bin').write_bytes(b'bundle')
+    assert version == results_version(str(tmp_path))
+    (tmp_path / 'csv_data' / 'fluids' / 'water.csv').write_text('temperature,density\n0,999.9')
+    csv_version = results_version(str(tmp_path))
+    assert csv_version != version
+    (tmp_path / 'calculations' / 'equations.py').write_text('x = 2')
+    assert results_version(str(tmp_path)) not in (version, csv_version)
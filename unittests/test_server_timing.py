@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import pytest
+
+from caching import result_cache
+from main import app
+from monitoring import server_timing
+
+HEADLOSS_REQUEST = {
+    'fluid': 'water',
+    'temperature': 30,
+    'nominal_diameter': 25,
+    'material': 'steel',
+    'flow': 1,
+    'flow_unit': 'm3/h',
+    'length': 10,
+}
+
+
+@pytest.fixture
+def app_fixture():
+    result_cache.RESULT_CACHE.clear()
+    with app.test_client() as c:
+        yield c
+
+
+def timing_names(header):
+    return [metric.split(';')[0] for metric in header.split(', ')]
+
+
+def test_server_timing():
+    header = server_timing.server_timing(
+        {'json_parse': 0.0001234, 'calculation': 0.002}, {'colebrook_iterations': 3}, 0.0031, 'miss'
+    )
+    assert header == (
+        'json_parse;dur=0.123, calculation;dur=2.000, colebrook_iterations;desc="3", cache;desc="miss", '
+        'total;dur=3.100'
+    )
+    assert server_timing.server_timing({}, {}) == ''
+
+
+def test_server_timing_header(app_fixture):
+    req_json = {**HEADLOSS_REQUEST, 'flow': 10}
+    resp = app_fixture.post('/calculate/headloss', json=req_json, headers={'X-Server-Timing': '1'})
+    assert timing_names(resp.headers['Server-Timing']) == [
+        'json_parse',
+        'json_validate',
+        'pipe_parameters',
+        'fluid_parameters',
+        'flow_from_power',
+        'friction_factor',
+        'calculation',
+        'serialization',
+        'colebrook_iterations',
+        'cache',
+        'total',
+    ]
+    assert 'cache;desc="miss"' in resp.headers['Server-Timing']
+    cached_resp = app_fixture.post('/calculate/headloss', json=req_json, headers={'X-Server-Timing': '1'})
+    assert timing_names(cached_resp.headers['Server-Timing']) == ['json_parse', 'json_validate', 'cache', 'total']
+    assert 'cache;desc="hit"' in cached_resp.headers['Server-Timing']
+
+
+def test_server_timing_colebrook_iterations(app_fixture):
+    resp = app_fixture.post(
+        '/calculate/pipes',
+        json={'fluid': 'water', 'temperature': 30, 'material': 'steel', 'flow': 10, 'flow_unit': 'm3/h'},
+        headers={'X-Server-Timing': '1'},
+    )
+    assert 'friction_factor;dur=' in resp.headers['Server-Timing']
+    assert 'colebrook_iterations;desc="' in resp.headers['Server-Timing']
+    resp = app_fixture.post(
+        '/calculate/headloss',
+        json={**HEADLOSS_REQUEST, 'friction_model': 'haaland'},
+        headers={'X-Server-Timing': '1'},
+    )
+    assert 'colebrook_iterations' not in resp.headers['Server-Timing']
+
+
+def test_server_timing_not_requested(app_fixture):
+    resp = app_fixture.post('/calculate/headloss', json=HEADLOSS_REQUEST)
+    assert 'Server-Timing' not in resp.headers
+    resp = app_fixture.get('/health', headers={'X-Server-Timing': '1'})
+    assert 'Server-Timing' not in resp.headers
+
+
+def test_server_timing_enabled(app_fixture, monkeypatch):
+    monkeypatch.setattr(server_timing, 'SERVER_TIMING_ENABLED', True)
+    monkeypatch.setattr(server_timing, 'TIMING_ALLOW_ORIGIN', 'https://example.com')
+    resp = app_fixture.post('/calculate/headloss', json=HEADLOSS_REQUEST)
+    assert timing_names(resp.headers['Server-Timing'])[-1] == 'total'
+    assert resp.headers['Timing-Allow-Origin'] == 'https://example.com'
+    resp = app_fixture.post('/calculate/headloss', json={'fluid': 'water'})
+    assert resp.status_code == 400
+    assert timing_names(resp.headers['Server-Timing']) == ['json_parse', 'json_validate', 'serialization', 'total']
+
+
+def test_server_timing_request_header_disabled(app_fixture, monkeypatch):
+    monkeypatch.setattr(server_timing, 'REQUEST_HEADER', None)
+    resp = app_fixture.post('/calculate/headloss', json=HEADLOSS_REQUEST, headers={'X-Server-Timing': '1'})
+    assert 'Server-Timing' not in resp.headers
@@ -1,12 +1,23 @@
 #!/usr/bin.env python3
 import pytest
 
-from calculations.unit_convertion import round_units, unit_convertion
+from calculations.unit_convertion import UNIT_REGISTRY, load_units, reload_units, round_units, unit_convertion
 
 
 @pytest.mark.parametrize(
     'number, significant, expected_value',
-    ((1234, 2, 1200), (1234.56, 5, 1234.6), (0.000123456, 2, 0.00012), (0, 10, 0)),
+    (
+        (1234, 2, 1200),
+        (1234.56, 5, 1234.6),
+        (0.000123456, 2, 0.00012),
+        (0, 10, 0),
+        (999.96, 4, 1000.0),
+        (0.025, 1, 0.03),
+        (1000, 1, 1000),
+        (10 ** 15 - 1, 3, 1000000000000000),
+        (-1.25, 2, -1.25),
+        (-7, 3, -7),
+    ),
 )
 def test_round_units(number, significant, expected_value):
     assert round_units(number, significant) == expected_value
@@ -48,3 +59,14 @@ def test_unit_convertion(value, unit_from, unit_to, data_type, expected_value):
 )
 def test_unit_convertion_failed(value, unit_from, unit_to, data_type, expected_message):
     assert unit_convertion(value, unit_from, unit_to, data_type) == expected_message
+
+
+def test_load_units():
+    assert load_units('time') == {'s': 1, 'm': 60, 'h': 3600}
+
+
+def test_reload_units():
+    UNIT_REGISTRY['time']['s'] = 2
+    reload_units()
+    assert set(UNIT_REGISTRY) == {'lenght', 'power', 'pressure', 'time', 'volume'}
+    assert UNIT_REGISTRY['time']['s'] == 1
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+import numpy as np
+import pytest
+
+from calculations import headloss_equations
+from calculations.flow_equations import velocity_equation
+from calculations.fluid_parameters import fluid_params
+from calculations.hydraulic_surfaces import PIPE_CATALOGUES, circular_pipe
+from calculations.unit_convertion import round_units as scalar_round_units
+from calculations.unit_convertion import unit_convertion
+from calculations.vectorized import (
+    FRICTION_MODELS,
+    catalogue_arrays,
+    colebrook_solver,
+    darcy_friction_coefficients,
+    headloss_grid,
+    pipes_headloss,
+    round_units,
+    round_units_list,
+)
+
+REYNOLDS = np.array([2200, 4000, 10000, 100000, 1000000, 10000000])
+REL_ROUGHNESS = np.array([0, 0.00001, 0.001, 0.01, 0.04, 0.05])
+
+
+ROUNDED_VALUES = np.array(
+    [0, 0.025, 0.000123456, 4.5e-05, 0.99996, 1.5, 999.96, 1234.56, 163837, 10 ** 15 - 1, 2.5e15, -1.25, -7]
+)
+
+
+def internals_of(material):
+    return [internal for _, internal in PIPE_CATALOGUES[material]]
+
+
+def test_colebrook_solver():
+    dfc, iterations = colebrook_solver(REYNOLDS, REL_ROUGHNESS)
+    assert 1 <= iterations <= 5
+    for reynold, rel_roughness, value in zip(REYNOLDS, REL_ROUGHNESS, dfc):
+        expected_dfc, _ = headloss_equations.colebrook_solver(reynold, rel_roughness)
+        assert value == pytest.approx(expected_dfc, rel=1e-12)
+    dfc, iterations = colebrook_solver(REYNOLDS, REL_ROUGHNESS, max_iterations=0)
+    assert iterations == 0
+    for reynold, rel_roughness, value in zip(REYNOLDS, REL_ROUGHNESS, dfc):
+        expected_dfc, _ = headloss_equations.colebrook_solver(reynold, rel_roughness, max_iterations=0)
+        assert value == pytest.approx(expected_dfc, rel=1e-12)
+
+
+def test_colebrook_iterations_counts():
+    _, iterations = colebrook_solver(REYNOLDS, REL_ROUGHNESS)
+    counts, timings = {}, {}
+    darcy_friction_coefficients(REYNOLDS, 100, REL_ROUGHNESS * 100, counts=counts)
+    assert counts == {'colebrook_iterations': iterations}
+    pipes_headloss(PIPE_CATALOGUES['steel'], 10, 'm3/h', 995.6, 0.000000801, 1.5, counts=counts, timings=timings)
+    assert counts['colebrook_iterations'] > iterations
+    assert set(timings) == {'friction_factor'}
+    counts = {}
+    darcy_friction_coefficients(REYNOLDS, 100, 1.5, 'haaland', counts=counts)
+    assert counts == {}
+
+
+@pytest.mark.parametrize('friction_model', tuple(FRICTION_MODELS))
+def test_friction_models(friction_model):
+    dfc = FRICTION_MODELS[friction_model](REYNOLDS, REL_ROUGHNESS)
+    for reynold, rel_roughness, value in zip(REYNOLDS, REL_ROUGHNESS, dfc):
+        assert round(value, 3) == headloss_equations.FRICTION_MODELS[friction_model](reynold, rel_roughness)
+
+
+@pytest.mark.parametrize('friction_model', tuple(FRICTION_MODELS))
+def test_darcy_friction_coefficients(friction_model):
+    reynolds = np.array([0, 1, 2000, 2100, 2101, 20000, 1000000])
+    dfc = darcy_friction_coefficients(reynolds, 100, 1.5, friction_model)
+    assert dfc.tolist() == [
+        headloss_equations.darcy_friction_coefficient(reynold, 100, 1.5, friction_model) for reynold in reynolds
+    ]
+
+
+def test_catalogue_arrays():
+    nominals, internals, internals_m, areas = catalogue_arrays(PIPE_CATALOGUES['steel'])
+    assert nominals.tolist() == [nominal for nominal, _ in PIPE_CATALOGUES['steel']]
+    assert internals.tolist() == [internal for _, internal in PIPE_CATALOGUES['steel']]
+    assert internals_m.tolist() == [unit_convertion(internal, 'mm', 'm', 'lenght') for internal in internals]
+    assert areas.tolist() == [circular_pipe(internal, 'mm') for internal in internals]
+    assert catalogue_arrays(PIPE_CATALOGUES['steel']) is catalogue_arrays(PIPE_CATALOGUES['steel'])
+
+
+@pytest.mark.parametrize('friction_model', tuple(FRICTION_MODELS))
+@pytest.mark.parametrize(
+    'flow, flow_unit, density, viscosity, roughness',
+    (
+        (10, 'm3/h', 998.2, 0.000001006, 1.5),
+        (0.5, 'l/s', 983.2, 0.000000478, 0.05),
+        (0, 'm3/h', 998.2, 0.000001006, 1.5),
+        (-1, 'm3/s', 998.2, 0.000001006, 1),
+    ),
+)
+def test_pipes_headloss(flow, flow_unit, density, viscosity, roughness, friction_model):
+    nominals, velocities, losses = pipes_headloss(
+        PIPE_CATALOGUES['steel'], flow, flow_unit, density, viscosity, roughness, friction_model
+    )
+    assert nominals == [nominal for nominal, _ in PIPE_CATALOGUES['steel']]
+    for internal, velocity, loss in zip(internals_of('steel'), velocities, losses):
+        expected_velocity = velocity_equation(flow, flow_unit, circular_pipe(internal, 'mm'))
+        reynolds = headloss_equations.reynolds_equation(expected_velocity, internal, viscosity)
+        dfc = headloss_equations.darcy_friction_coefficient(reynolds, internal, roughness, friction_model)
+        expected_loss = headloss_equations.darcy_weisbach_equation(
+            dfc, 0, 1, unit_convertion(internal, 'mm', 'm', 'lenght'), density, expected_velocity
+        )
+        assert velocity == expected_velocity
+        assert loss == expected_loss
+
+
+@pytest.mark.parametrize('friction_model', tuple(FRICTION_MODELS))
+@pytest.mark.parametrize('flow, flow_unit', ((10, 'm3/h'), (0.5, 'l/s'), (0, 'm3/h')))
+def test_pipes_headloss_full_precision(flow, flow_unit, friction_model):
+    density, viscosity, roughness = 998.2, 0.000001006, 1.5
+    nominals, velocities, losses = pipes_headloss(
+        PIPE_CATALOGUES['steel'], flow, flow_unit, density, viscosity, roughness, friction_model, rounded=False
+    )
+    for internal, velocity, loss in zip(internals_of('steel'), velocities, losses):
+        expected_velocity = velocity_equation(flow, flow_unit, circular_pipe(internal, 'mm', False), False)
+        reynolds = headloss_equations.reynolds_equation(expected_velocity, internal, viscosity, False)
+        dfc = headloss_equations.darcy_friction_coefficient(reynolds, internal, roughness, friction_model, False)
+        expected_loss = headloss_equations.darcy_weisbach_equation(
+            dfc, 0, 1, unit_convertion(internal, 'mm', 'm', 'lenght', False), density, expected_velocity, False
+        )
+        assert velocity == pytest.approx(expected_velocity, rel=1e-12)
+        assert loss == pytest.approx(expected_loss, rel=1e-12)
+
+
+@pytest.mark.parametrize('significant', (1, 3, 5, 10))
+def test_round_units(significant):
+    expected = [scalar_round_units(value, significant) for value in ROUNDED_VALUES.tolist()]
+    assert round_units(ROUNDED_VALUES, significant).tolist() == expected
+    values = round_units_list(ROUNDED_VALUES, significant)
+    assert values == expected
+    assert [type(value) for value in values] == [type(value) for value in expected]
+
+
+def test_round_units_zeros_and_negative_integers():
+    values = np.array([0, -0.0, -1, -7, -1000, -(10.0 ** 300)])
+    with np.errstate(all='raise'):
+        assert round_units(values, 3).tolist() == values.tolist()
+        assert round_units_list(values, 3) == [scalar_round_units(value, 3) for value in values.tolist()]
+
+
+@pytest.mark.parametrize('headloss_unit', (None, 'Pa', 'kPa', 'mmHg'))
+def test_headloss_grid(headloss_unit):
+    _, internals, internals_m, areas = catalogue_arrays(PIPE_CATALOGUES['steel'])
+    flows = [0.5, 2, 10]
+    fluid = fluid_params('water', 40)
+    velocities, losses = headloss_grid(
+        internals[:, None],
+        internals_m[:, None],
+        areas[:, None],
+        np.array(flows),
+        'm3/h',
+        fluid['density'],
+        fluid['kinematic_viscosity'],
+        0.2,
+        25,
+        headloss_unit,
+    )
+    assert len(velocities) == len(losses) == len(internals) * len(flows)
+    expected_velocities, expected_losses = [], []
+    for internal in internals_of('steel'):
+        for flow in flows:
+            velocity = velocity_equation(flow, 'm3/h', circular_pipe(internal, 'mm'))
+            reynolds = headloss_equations.reynolds_equation(velocity, internal, fluid['kinematic_viscosity'])
+            dfc = headloss_equations.darcy_friction_coefficient(reynolds, internal, 0.2, 'colebrook')
+            loss = headloss_equations.darcy_weisbach_equation(
+                dfc, 0, 25, unit_convertion(internal, 'mm', 'm', 'lenght'), fluid['density'], velocity
+            )
+            expected_velocities.append(velocity)
+            expected_losses.append(unit_convertion(loss, 'Pa', headloss_unit, 'pressure') if headloss_unit else loss)
+    assert velocities == expected_velocities
+    assert losses == expected_losses